@@ -0,0 +1,383 @@
+#!/usr/bin/env python3
+"""
+Benchmark the Reading Text OCR equipment.
+
+Synthetic printed and photographed text images are generated locally with a
+fixed seed. Every configuration runs in its own process so peak RSS is
+measured per configuration, and reports latency percentiles, throughput and
+character error rate (CER). Results are written as JSON; pass a previous
+results file with ``--baseline`` to print the change against it.
+"""
+
+import argparse
+import json
+import multiprocessing
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+from PIL import Image, ImageDraw, ImageFilter
+
+WORDS = [
+    "the",
+    "quick",
+    "brown",
+    "fox",
+    "jumps",
+    "over",
+    "lazy",
+    "dog",
+    "invoice",
+    "total",
+    "due",
+    "receipt",
+    "order",
+    "number",
+    "date",
+    "amount",
+    "paid",
+    "balance",
+    "street",
+    "avenue",
+    "open",
+    "daily",
+    "from",
+    "until",
+    "station",
+    "platform",
+    "exit",
+    "entrance",
+    "warning",
+    "caution",
+    "please",
+    "thank",
+    "you",
+]
+
+CONFIGURATIONS = {
+    "tesseract": {"engine": "tesseract"},
+    "tesseract+preprocessing": {"engine": "tesseract", "preprocessing": True},
+    "easyocr": {"engine": "easyocr"},
+    "easyocr+preprocessing": {"engine": "easyocr", "preprocessing": True},
+    "easyocr+cpu-quantized": {"engine": "easyocr", "cpu_backend": "quantized"},
+    "easyocr+cpu-onnx": {"engine": "easyocr", "cpu_backend": "onnx"},
+    "auto": {"engine": "auto"},
+}
+
+PERCENTILES = (50, 90, 95, 99)
+
+
+def make_printed_sample(rng: random.Random) -> tuple[Image.Image, str]:
+    """Render a clean page of printed text lines."""
+    lines = [
+        " ".join(rng.choice(WORDS) for _ in range(rng.randint(4, 7)))
+        for _ in range(rng.randint(3, 8))
+    ]
+    font_size = rng.choice((24, 32, 40))
+    image = Image.new("L", (1600, 2 * font_size * len(lines) + 80), 255)
+    draw = ImageDraw.Draw(image)
+    for index, line in enumerate(lines):
+        draw.text((60, 40 + 2 * font_size * index), line, fill=0, font_size=font_size)
+    return image, "\n".join(lines)
+
+
+def make_photo_sample(rng: random.Random) -> tuple[Image.Image, str]:
+    """Render a short colored sign on a noisy background, rotated and blurred."""
+    text = " ".join(rng.choice(WORDS) for _ in range(rng.randint(1, 3))).upper()
+    width, height = 1280, 960
+    background = Image.effect_noise((width, height), rng.uniform(20, 60))
+    tint = tuple(rng.randint(60, 200) for _ in range(3))
+    image = Image.merge(
+        "RGB",
+        [background.point(lambda value, c=c: (value + c) // 2) for c in tint],
+    )
+    draw = ImageDraw.Draw(image)
+    box = (200, 380, 1080, 580)
+    draw.rectangle(box, fill=tuple(255 - c for c in tint))
+    draw.text((240, 430), text, fill=tint, font_size=rng.choice((64, 80)))
+    image = image.rotate(rng.uniform(-8, 8), Image.Resampling.BICUBIC)
+    image = image.filter(ImageFilter.GaussianBlur(rng.uniform(0.5, 1.5)))
+    return image, text
+
+
+def generate_samples(
+    directory: Path,
+    samples_per_kind: int,
+    seed: int,
+) -> list[dict[str, str]]:
+    """Write the synthetic samples to a directory."""
+    rng = random.Random(seed)
+    samples = []
+    for kind, make in (("printed", make_printed_sample), ("photo", make_photo_sample)):
+        for index in range(samples_per_kind):
+            image, text = make(rng)
+            # Photos are stored the way cameras deliver them, scans losslessly
+            if kind == "photo":
+                path = directory / f"{kind}_{index:03d}.jpg"
+                image.save(path, quality=85)
+            else:
+                path = directory / f"{kind}_{index:03d}.png"
+                image.save(path)
+            samples.append({"kind": kind, "path": str(path), "text": text})
+    return samples
+
+
+def character_error_rate(hypothesis: str, reference: str) -> float:
+    """Edit distance of whitespace-normalized texts over the reference length."""
+    hypothesis = " ".join(hypothesis.lower().split())
+    reference = " ".join(reference.lower().split())
+    if not reference:
+        return float(bool(hypothesis))
+    previous = list(range(len(hypothesis) + 1))
+    for i, ref_char in enumerate(reference, 1):
+        current = [i]
+        for j, hyp_char in enumerate(hypothesis, 1):
+            current.append(
+                min(
+                    previous[j] + 1,
+                    current[j - 1] + 1,
+                    previous[j - 1] + (ref_char != hyp_char),
+                )
+            )
+        previous = current
+    return previous[-1] / len(reference)
+
+
+def peak_rss_bytes() -> Optional[int]:
+    """Peak resident set size of this process, if the platform reports it."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def make_ocr(
+    configuration: dict[str, Any],
+    lang_list: list[str],
+    threads: Optional[int] = None,
+) -> Callable[[str], str]:
+    """Build the function that OCRs one image input for a configuration."""
+    from llarmy.equipment.reading_text_ocr.cpu import (
+        CPUInferenceConfig,
+        get_cpu_reader_pool,
+    )
+    from llarmy.equipment.reading_text_ocr.engines import (
+        easyocr_readtext,
+        tesseract_image_to_string,
+    )
+    from llarmy.equipment.reading_text_ocr.images import load_image_from_input
+    from llarmy.equipment.reading_text_ocr.preprocessing import (
+        PreprocessingConfig,
+        preprocess_image,
+    )
+    from llarmy.equipment.reading_text_ocr.readers import get_reader_pool
+    from llarmy.equipment.reading_text_ocr.routing import (
+        TESSERACT,
+        EngineRouter,
+        to_tesseract_lang,
+    )
+
+    engine = configuration["engine"]
+    preprocessing = (
+        PreprocessingConfig() if configuration.get("preprocessing") else None
+    )
+    tesseract_lang = to_tesseract_lang(lang_list)
+    router = EngineRouter()
+    reader_pool = (
+        get_cpu_reader_pool(
+            CPUInferenceConfig(
+                backend=configuration["cpu_backend"], num_threads=threads
+            )
+        )
+        if configuration.get("cpu_backend")
+        else get_reader_pool()
+    )
+
+    def ocr(image_input: str) -> str:
+        image = load_image_from_input(image_input)
+        image.load()
+        chosen = router.route(image) if engine == "auto" else engine
+        if preprocessing is not None:
+            image = preprocess_image(image, preprocessing)
+        if chosen == TESSERACT:
+            return tesseract_image_to_string(image, lang=tesseract_lang)
+        return easyocr_readtext(reader_pool.get(lang_list), image)
+
+    return ocr
+
+
+def run_configuration(
+    name: str,
+    samples: list[dict[str, str]],
+    lang_list: list[str],
+    warmup: int,
+    threads: Optional[int] = None,
+) -> dict[str, Any]:
+    """Run one configuration over every sample. Runs in a fresh process."""
+    try:
+        ocr = make_ocr(CONFIGURATIONS[name], lang_list, threads)
+        for sample in samples[:warmup]:
+            ocr(sample["path"])
+    except Exception as e:
+        return {"status": "skipped", "reason": f"{type(e).__name__}: {e}"}
+
+    latencies: list[float] = []
+    errors: dict[str, list[float]] = {}
+    failures = 0
+    start = time.perf_counter()
+    for sample in samples:
+        began = time.perf_counter()
+        try:
+            text = ocr(sample["path"])
+        except Exception:
+            failures += 1
+            text = ""
+        latencies.append(time.perf_counter() - began)
+        errors.setdefault(sample["kind"], []).append(
+            character_error_rate(text, sample["text"])
+        )
+    elapsed = time.perf_counter() - start
+
+    ordered = sorted(latencies)
+    return {
+        "status": "ok",
+        "images": len(samples),
+        "failures": failures,
+        "latency_ms": {
+            "mean": 1000 * statistics.mean(latencies),
+            **{
+                f"p{p}": 1000 * ordered[min(len(ordered) - 1, p * len(ordered) // 100)]
+                for p in PERCENTILES
+            },
+        },
+        "throughput_images_per_s": len(samples) / elapsed,
+        "peak_rss_bytes": peak_rss_bytes(),
+        "cer": {
+            "mean": statistics.mean(e for kind in errors.values() for e in kind),
+            **{kind: statistics.mean(values) for kind, values in errors.items()},
+        },
+    }
+
+
+def compare(results: dict[str, Any], baseline: dict[str, Any]) -> None:
+    """Print the change of the headline metrics against a baseline run."""
+    print(f"\n📈 Change against baseline from {baseline['metadata']['timestamp']}:")
+    for name, current in results["configurations"].items():
+        previous = baseline["configurations"].get(name, {})
+        if current["status"] != "ok" or previous.get("status") != "ok":
+            continue
+        metrics = {
+            "p50": (current["latency_ms"]["p50"], previous["latency_ms"]["p50"]),
+            "p95": (current["latency_ms"]["p95"], previous["latency_ms"]["p95"]),
+            "throughput": (
+                current["throughput_images_per_s"],
+                previous["throughput_images_per_s"],
+            ),
+        }
+        changes = "  ".join(
+            f"{metric} {100 * (new - old) / old:+6.1f}%"
+            for metric, (new, old) in metrics.items()
+            if old
+        )
+        cer_change = current["cer"]["mean"] - previous["cer"]["mean"]
+        print(f"   {name:24s} {changes}  CER {cer_change:+.3f}")
+
+
+def main() -> None:
+    """Run the OCR benchmark."""
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--samples", type=int, default=10, help="Images per kind")
+    parser.add_argument(
+        "--configs",
+        nargs="+",
+        choices=sorted(CONFIGURATIONS),
+        default=list(CONFIGURATIONS),
+    )
+    parser.add_argument("--lang", nargs="+", default=["en"])
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--warmup", type=int, default=1)
+    parser.add_argument(
+        "--threads", type=int, help="Intra-op threads of the CPU EasyOCR backends"
+    )
+    parser.add_argument("--output", type=Path, default=Path("benchmark_results.json"))
+    parser.add_argument("--baseline", type=Path, help="Previous results to compare")
+    args = parser.parse_args()
+
+    from llarmy import __version__
+
+    # Read the baseline first, it may be the file about to be overwritten
+    baseline = (
+        None
+        if args.baseline is None
+        else json.loads(args.baseline.read_text(encoding="utf-8"))
+    )
+
+    print("🚀 Benchmarking reading text OCR...\n")
+    results: dict[str, Any] = {
+        "metadata": {
+            "llarmy_version": __version__,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "processor": platform.processor(),
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "samples_per_kind": args.samples,
+            "seed": args.seed,
+            "lang": args.lang,
+            "threads": args.threads,
+        },
+        "configurations": {},
+    }
+
+    with tempfile.TemporaryDirectory(prefix="llarmy_bench_") as tmp_dir:
+        samples = generate_samples(Path(tmp_dir), args.samples, args.seed)
+        for name in args.configs:
+            print(f"🧪 {name}...")
+            # A fresh process per configuration keeps models and peak RSS apart
+            with ProcessPoolExecutor(
+                max_workers=1, mp_context=multiprocessing.get_context("spawn")
+            ) as executor:
+                result = executor.submit(
+                    run_configuration,
+                    name,
+                    samples,
+                    args.lang,
+                    args.warmup,
+                    args.threads,
+                ).result()
+            results["configurations"][name] = result
+
+    for name, result in results["configurations"].items():
+        if result["status"] != "ok":
+            print(f"⚠️  {name:24s} skipped: {result['reason']}")
+            continue
+        latency = result["latency_ms"]
+        rss = result["peak_rss_bytes"]
+        print(
+            f"📊 {name:24s} p50 {latency['p50']:8.1f} ms  "
+            f"p95 {latency['p95']:8.1f} ms  "
+            f"{result['throughput_images_per_s']:6.2f} img/s  "
+            f"RSS {rss / 2**20 if rss else float('nan'):7.1f} MiB  "
+            f"CER {result['cer']['mean']:.3f}"
+        )
+
+    args.output.write_text(json.dumps(results, indent=2) + "\n", encoding="utf-8")
+    print(f"\n✅ Results written to {args.output}")
+
+    if baseline is not None:
+        compare(results, baseline)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""Benchmark the pytesseract and tesserocr backends of llarmy."""
+
+import argparse
+import statistics
+import sys
+import time
+
+from PIL import Image, ImageDraw
+
+from llarmy.equipment.reading_text_ocr.tesseract_backends import (
+    PytesseractBackend,
+    TesseractBackend,
+    TesserocrBackend,
+    is_tesserocr_available,
+)
+
+SAMPLE_TEXT = [
+    "The quick brown fox jumps over the lazy dog.",
+    "Invoice 2024-0153  Total due: 1,284.50 EUR",
+    "Printed material is read by tesseract.",
+]
+
+
+def make_image(line_count: int = 12) -> Image.Image:
+    """Render a synthetic printed page."""
+    image = Image.new("L", (1200, 60 * line_count + 40), "white")
+    draw = ImageDraw.Draw(image)
+    for index in range(line_count):
+        text = SAMPLE_TEXT[index % len(SAMPLE_TEXT)]
+        draw.text((40, 30 + 60 * index), text, fill="black", font_size=32)
+    return image
+
+
+def run(backend: TesseractBackend, image: Image.Image, iterations: int) -> list[float]:
+    """Time single-image calls, after one warm-up call."""
+    backend.image_to_string(image)
+    timings = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        backend.image_to_string(image)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def main() -> None:
+    """Run the tesseract backend benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--iterations", type=int, default=20)
+    args = parser.parse_args()
+
+    print("🚀 Benchmarking tesseract backends...\n")
+    image = make_image()
+    backends: list[TesseractBackend] = [PytesseractBackend()]
+    if is_tesserocr_available():
+        backends.append(TesserocrBackend(max_engines_per_lang=1))
+    else:
+        print("⚠️  tesserocr is not installed; only pytesseract is measured\n")
+
+    results = {}
+    for backend in backends:
+        try:
+            results[backend.name] = run(backend, image, args.iterations)
+        except Exception as e:
+            print(f"❌ {backend.name} failed: {e}")
+            sys.exit(1)
+
+    for name, timings in results.items():
+        ordered = sorted(timings)
+        p95 = ordered[min(len(ordered) - 1, int(0.95 * len(ordered)))]
+        print(
+            f"📊 {name:12s} mean {statistics.mean(timings) * 1000:8.1f} ms  "
+            f"p50 {statistics.median(timings) * 1000:8.1f} ms  "
+            f"p95 {p95 * 1000:8.1f} ms"
+        )
+
+    if len(results) == 2:
+        speedup = statistics.mean(results["pytesseract"]) / statistics.mean(
+            results["tesserocr"]
+        )
+        print(f"\n✅ tesserocr is {speedup:.1f}x faster per call")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,135 @@
-"""Reading Text OCR module."""
+"""
+Reading Text OCR module.
 
-from .reading_text_ocr import ReadingTextOCRToolSpec
+Attributes are imported lazily on first access, so importing the package does
+not load llama-index, NumPy or the OCR engines until they are used. EasyOCR
+(and with it torch) is only imported when the first EasyOCR reader is built.
+"""
 
-__all__ = ["ReadingTextOCRToolSpec"]
+from importlib import import_module
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from .batching import BatchingConfig
+    from .cache import OCRResultCache
+    from .cpu import CPUInferenceConfig
+    from .executors import (
+        OCRBusyError,
+        OCRExecutor,
+        get_ocr_executor,
+        set_ocr_executor,
+    )
+    from .handles import (
+        ImageStore,
+        get_image_store,
+        set_image_store,
+        use_image_store,
+    )
+    from .instrumentation import (
+        OCRStageEvent,
+        OCRStageTimer,
+        OpenTelemetryStageHandler,
+    )
+    from .layout import OCRLayout
+    from .models import EasyOCRModelManager, OCRModelUnavailableError
+    from .pipeline import OCRPipeline
+    from .preprocessing import PreprocessingConfig
+    from .reading_text_ocr import ReadingTextOCRToolSpec
+    from .readers import (
+        EasyOCRReaderPool,
+        OCRMemoryBudgetError,
+        configure_reader_pool,
+        get_reader_pool,
+        set_reader_pool,
+    )
+    from .routing import EngineRouter
+    from .sequences import FrameSequence, FrameSequenceConfig
+    from .service import OCRServer, RemoteReadingTextOCRToolSpec
+    from .text_presence import TextPresenceConfig
+    from .tiling import TilingConfig
+
+# Public attribute to the submodule defining it
+_LAZY_ATTRIBUTES = {
+    "BatchingConfig": ".batching",
+    "CPUInferenceConfig": ".cpu",
+    "EasyOCRModelManager": ".models",
+    "EasyOCRReaderPool": ".readers",
+    "EngineRouter": ".routing",
+    "FrameSequence": ".sequences",
+    "FrameSequenceConfig": ".sequences",
+    "ImageStore": ".handles",
+    "OCRBusyError": ".executors",
+    "OCRExecutor": ".executors",
+    "OCRLayout": ".layout",
+    "OCRMemoryBudgetError": ".readers",
+    "OCRModelUnavailableError": ".models",
+    "OCRPipeline": ".pipeline",
+    "OCRResultCache": ".cache",
+    "OCRServer": ".service",
+    "OCRStageEvent": ".instrumentation",
+    "OCRStageTimer": ".instrumentation",
+    "OpenTelemetryStageHandler": ".instrumentation",
+    "PreprocessingConfig": ".preprocessing",
+    "ReadingTextOCRToolSpec": ".reading_text_ocr",
+    "RemoteReadingTextOCRToolSpec": ".service",
+    "TextPresenceConfig": ".text_presence",
+    "TilingConfig": ".tiling",
+    "configure_reader_pool": ".readers",
+    "get_image_store": ".handles",
+    "get_ocr_executor": ".executors",
+    "get_reader_pool": ".readers",
+    "set_image_store": ".handles",
+    "set_ocr_executor": ".executors",
+    "set_reader_pool": ".readers",
+    "use_image_store": ".handles",
+}
+
+__all__ = [
+    "BatchingConfig",
+    "CPUInferenceConfig",
+    "EasyOCRModelManager",
+    "EasyOCRReaderPool",
+    "EngineRouter",
+    "FrameSequence",
+    "FrameSequenceConfig",
+    "ImageStore",
+    "OCRBusyError",
+    "OCRExecutor",
+    "OCRLayout",
+    "OCRMemoryBudgetError",
+    "OCRModelUnavailableError",
+    "OCRPipeline",
+    "OCRResultCache",
+    "OCRServer",
+    "OCRStageEvent",
+    "OCRStageTimer",
+    "OpenTelemetryStageHandler",
+    "PreprocessingConfig",
+    "ReadingTextOCRToolSpec",
+    "RemoteReadingTextOCRToolSpec",
+    "TextPresenceConfig",
+    "TilingConfig",
+    "configure_reader_pool",
+    "get_image_store",
+    "get_ocr_executor",
+    "get_reader_pool",
+    "set_image_store",
+    "set_ocr_executor",
+    "set_reader_pool",
+    "use_image_store",
+]
+
+
+def __getattr__(name: str) -> Any:
+    """Import public attributes from their submodule on first access."""
+    module_name = _LAZY_ATTRIBUTES.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    """List the lazy attributes alongside the loaded ones."""
+    return sorted([*globals(), *_LAZY_ATTRIBUTES])
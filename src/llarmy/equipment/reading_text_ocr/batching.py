@@ -0,0 +1,200 @@
+"""
+Dynamic micro-batching of concurrent OCR requests.
+
+EasyOCR recognizes a batch of images far more efficiently than the same images
+one by one, but agents call the single-image tools independently. A
+``MicroBatcher`` collects concurrent requests for up to ``max_delay`` seconds
+or ``max_batch_size`` items, groups them by key (e.g. the language set), runs
+one batched engine call per group and fans the results back out to the
+callers' futures.
+"""
+
+import queue
+import threading
+import time
+from collections import Counter, defaultdict
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Generic, Hashable, TypeVar, Union
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+@dataclass(frozen=True)
+class BatchingConfig:
+    """
+    How concurrent requests are batched.
+
+    Attributes:
+        max_batch_size: Requests run in one engine call at most.
+        max_delay: Seconds the first request of a batch waits for others.
+            Requests arriving while the engine is busy are batched regardless.
+        max_workers: Batches running at once.
+    """
+
+    max_batch_size: int = 16
+    max_delay: float = 0.005
+    max_workers: int = 1
+
+    def __post_init__(self) -> None:
+        if self.max_batch_size < 1:
+            raise ValueError("max_batch_size must be at least 1")
+        if self.max_delay < 0:
+            raise ValueError("max_delay must not be negative")
+        if self.max_workers < 1:
+            raise ValueError("max_workers must be at least 1")
+
+
+class MicroBatcher(Generic[T, R]):
+    """
+    Collect concurrent requests and run them as batches.
+
+    ``run_batch`` receives a group key and the items of a batch and returns
+    one result per item, in order; results that are exceptions are raised to
+    their caller only. Batches are collected on a background thread and run
+    on ``max_workers`` threads.
+    """
+
+    def __init__(
+        self,
+        run_batch: Callable[[Hashable, list[T]], list[Union[R, Exception]]],
+        config: BatchingConfig,
+        name: str = "llarmy-ocr-batch",
+    ) -> None:
+        """
+        Initialize the batcher.
+
+        Args:
+            run_batch: Engine call processing one batch.
+            config: Batch size, delay and worker limits.
+            name: Prefix of the batching thread names.
+        """
+        self.run_batch = run_batch
+        self.config = config
+        self._requests: queue.SimpleQueue[Any] = queue.SimpleQueue()
+        self._workers = ThreadPoolExecutor(
+            max_workers=config.max_workers, thread_name_prefix=name
+        )
+        self._batch_sizes: Counter[int] = Counter()
+        self._in_flight = 0
+        self._lock = threading.Lock()
+        self._closed = False
+        self._thread = threading.Thread(
+            target=self._collect, name=f"{name}-collector", daemon=True
+        )
+        self._thread.start()
+
+    def submit(self, key: Hashable, item: T) -> "Future[R]":
+        """
+        Queue an item for batching.
+
+        Args:
+            key: Group key; only items with equal keys are batched together.
+            item: Request passed to ``run_batch``.
+
+        Returns:
+            Future of the item's result.
+
+        Raises:
+            RuntimeError: If the batcher is closed.
+        """
+        future: Future[R] = Future()
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("The batcher is closed")
+            self._requests.put((key, item, future))
+        return future
+
+    def close(self) -> None:
+        """Run the pending batches and stop the batching threads."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._requests.put(None)
+        self._thread.join()
+        self._workers.shutdown(wait=True)
+
+    @property
+    def stats(self) -> dict[str, Any]:
+        """Achieved batch sizes for monitoring."""
+        with self._lock:
+            sizes = dict(sorted(self._batch_sizes.items()))
+        batches = sum(sizes.values())
+        requests = sum(size * count for size, count in sizes.items())
+        return {
+            "batches": batches,
+            "requests": requests,
+            "mean_batch_size": requests / batches if batches else 0.0,
+            "max_batch_size": max(sizes, default=0),
+            "batch_sizes": sizes,
+        }
+
+    def _collect(self) -> None:
+        """
+        Group queued requests and hand groups to the workers.
+
+        A group is handed over once it is full, or once its delay expired and
+        a worker is free; while every worker is busy, groups keep growing.
+        """
+        pending: dict[Hashable, list[tuple[T, Future[R]]]] = defaultdict(list)
+        deadlines: dict[Hashable, float] = {}
+        while True:
+            workers_free = self._in_flight < self.config.max_workers
+            timeout = (
+                max(min(deadlines.values()) - time.monotonic(), 0.0)
+                if deadlines and workers_free
+                else None
+            )
+            try:
+                request = self._requests.get(timeout=timeout)
+            except queue.Empty:
+                request = ()
+            if request is None:
+                for key in list(pending):
+                    self._flush(key, pending, deadlines)
+                return
+            if request:
+                key, item, future = request
+                if key not in pending:
+                    deadlines[key] = time.monotonic() + self.config.max_delay
+                pending[key].append((item, future))
+                if len(pending[key]) >= self.config.max_batch_size:
+                    self._flush(key, pending, deadlines)
+            now = time.monotonic()
+            for key in sorted(deadlines, key=deadlines.__getitem__):
+                if deadlines[key] > now or self._in_flight >= self.config.max_workers:
+                    break
+                self._flush(key, pending, deadlines)
+
+    def _flush(
+        self,
+        key: Hashable,
+        pending: dict[Hashable, list[tuple[T, "Future[R]"]]],
+        deadlines: dict[Hashable, float],
+    ) -> None:
+        """Hand one group of requests to the workers as a batch."""
+        requests = pending.pop(key)
+        deadlines.pop(key)
+        with self._lock:
+            self._batch_sizes[len(requests)] += 1
+            self._in_flight += 1
+        self._workers.submit(self._run, key, requests)
+
+    def _run(self, key: Hashable, requests: list[tuple[T, "Future[R]"]]) -> None:
+        """Run one batch and fan its results out to the callers."""
+        try:
+            results = self.run_batch(key, [item for item, _ in requests])
+        except Exception as e:
+            results = [e] * len(requests)
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+            # Wake the collector: waiting groups can use the free worker
+            self._requests.put(())
+        for (_, future), result in zip(requests, results):
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
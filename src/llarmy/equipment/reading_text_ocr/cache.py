@@ -0,0 +1,193 @@
+"""
+Content-addressed cache for OCR results.
+
+Results are keyed by a hash of the decoded image bytes together with the engine
+and its options, so the same scan uploaded twice, under another name or as
+base64, is only OCRed once. An in-memory LRU tier is backed by an optional
+SQLite tier that survives restarts and is shared between processes.
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Optional, Union
+
+CACHE_VERSION = 1
+
+
+class OCRResultCache:
+    """
+    Two-tier LRU cache of OCR results.
+
+    The memory tier holds up to ``max_entries`` results. When ``disk_path`` is
+    set, results are also written to a SQLite database which is trimmed to
+    ``max_disk_bytes`` by evicting the least recently accessed rows. Hits and
+    misses are counted per tier and exposed through ``stats``.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        disk_path: Optional[Union[str, Path]] = None,
+        max_disk_bytes: int = 256 * 1024 * 1024,
+    ) -> None:
+        """
+        Initialize the OCR result cache.
+
+        Args:
+            max_entries: Maximum number of results kept in memory.
+            disk_path: Optional SQLite database file for the persistent tier.
+            max_disk_bytes: Size budget of the persistent tier.
+        """
+        if max_entries < 1:
+            raise ValueError("max_entries must be at least 1")
+        self.max_entries = max_entries
+        self.max_disk_bytes = max_disk_bytes
+        self.disk_path = Path(disk_path) if disk_path is not None else None
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._memory: OrderedDict[str, Any] = OrderedDict()
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        if self.disk_path is not None:
+            self.disk_path.parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(
+                str(self.disk_path), check_same_thread=False, isolation_level=None
+            )
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS ocr_results ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+                "size INTEGER NOT NULL, accessed REAL NOT NULL)"
+            )
+            self._db.execute(
+                "CREATE INDEX IF NOT EXISTS ocr_results_accessed "
+                "ON ocr_results (accessed)"
+            )
+
+    @staticmethod
+    def make_key(image_digest: str, engine: str, **options: Any) -> str:
+        """
+        Build a cache key for an image and engine configuration.
+
+        Args:
+            image_digest: Hash of the decoded image bytes.
+            engine: Engine name, e.g. ``"easyocr"`` or ``"tesseract"``.
+            **options: Engine options that affect the result (languages, ...).
+
+        Returns:
+            Hex digest identifying the result.
+        """
+        payload = json.dumps(
+            [CACHE_VERSION, image_digest, engine, options],
+            sort_keys=True,
+            default=list,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return the cached result for a key, or ``None`` on a miss."""
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                return self._memory[key]
+            if self._db is not None:
+                row = self._db.execute(
+                    "SELECT value FROM ocr_results WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None:
+                    self._db.execute(
+                        "UPDATE ocr_results SET accessed = ? WHERE key = ?",
+                        (time.time(), key),
+                    )
+                    value = json.loads(row[0])
+                    self._remember(key, value)
+                    self.disk_hits += 1
+                    return value
+            self.misses += 1
+            return None
+
+    def set(self, key: str, value: Any) -> None:
+        """Store a JSON serializable result in every tier."""
+        with self._lock:
+            self._remember(key, value)
+            if self._db is not None:
+                encoded = json.dumps(value)
+                self._db.execute(
+                    "INSERT OR REPLACE INTO ocr_results (key, value, size, accessed) "
+                    "VALUES (?, ?, ?, ?)",
+                    (key, encoded, len(encoded), time.time()),
+                )
+                self._trim_disk()
+
+    def clear(self) -> None:
+        """Drop every cached result, including the persistent tier."""
+        with self._lock:
+            self._memory.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM ocr_results")
+
+    def close(self) -> None:
+        """Close the persistent tier."""
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+    @property
+    def hits(self) -> int:
+        """Hits across all tiers."""
+        return self.memory_hits + self.disk_hits
+
+    @property
+    def stats(self) -> dict[str, int]:
+        """Hit/miss counters and tier sizes for monitoring."""
+        with self._lock:
+            disk_entries, disk_bytes = (
+                self._db.execute(
+                    "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM ocr_results"
+                ).fetchone()
+                if self._db is not None
+                else (0, 0)
+            )
+            return {
+                "hits": self.memory_hits + self.disk_hits,
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "memory_entries": len(self._memory),
+                "disk_entries": disk_entries,
+                "disk_bytes": disk_bytes,
+            }
+
+    def _remember(self, key: str, value: Any) -> None:
+        """Insert into the memory tier, evicting the least recently used."""
+        self._memory[key] = value
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _trim_disk(self) -> None:
+        """Evict least recently accessed rows until the disk tier fits."""
+        assert self._db is not None
+        (total,) = self._db.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM ocr_results"
+        ).fetchone()
+        if total <= self.max_disk_bytes:
+            return
+        rows = self._db.execute(
+            "SELECT key, size FROM ocr_results ORDER BY accessed"
+        ).fetchall()
+        evicted = []
+        for key, size in rows:
+            if total <= self.max_disk_bytes:
+                break
+            evicted.append((key,))
+            total -= size
+        self._db.executemany("DELETE FROM ocr_results WHERE key = ?", evicted)
@@ -0,0 +1,256 @@
+"""
+CPU-optimized EasyOCR inference.
+
+On machines without a GPU, ``easyocr.Reader`` runs its detector and recognizer
+with PyTorch on every core of the machine. On the CPU it already applies
+dynamic int8 quantization to the LSTM and linear layers of its models (its
+``quantize`` argument defaults to true). A ``CPUInferenceConfig`` selects the
+CPU setup of the general purpose tools:
+
+- ``"quantized"``: EasyOCR's own quantized CPU models, forced onto the CPU even
+  when a GPU is present, with a fixed intra-op thread count. On a machine
+  without a GPU, the thread count is the only difference from a default
+  reader.
+- ``"onnx"``: the same recognizer, with the convolutional CRAFT detector, which
+  dominates CPU time on large images, exported once to ONNX and run on ONNX
+  Runtime. Requires ``onnx`` and ``onnxruntime``.
+
+Limit ``num_threads`` to the cores divided by the number of EasyOCR worker
+processes, so workers do not oversubscribe the machine. ``scripts/benchmark.py``
+compares throughput and accuracy against the default EasyOCR setup.
+"""
+
+import hashlib
+import os
+import threading
+from dataclasses import dataclass
+from functools import partial
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+from .readers import (
+    EasyOCRReaderPool,
+    LangKey,
+    _build_easyocr_reader,
+    get_reader_pool,
+)
+
+QUANTIZED = "quantized"
+ONNX = "onnx"
+
+CPU_BACKENDS = (QUANTIZED, ONNX)
+
+# Exported models are cached next to EasyOCR's own model directory
+DEFAULT_ONNX_DIR = Path.home() / ".EasyOCR" / "onnx"
+
+ONNX_OPSET = 17
+
+
+@dataclass(frozen=True)
+class CPUInferenceConfig:
+    """
+    How EasyOCR runs on the CPU.
+
+    Attributes:
+        backend: ``"quantized"`` or ``"onnx"``, see the module docstring.
+        num_threads: Intra-op threads of PyTorch and ONNX Runtime in each
+            process. ``None`` keeps the library defaults.
+        onnx_dir: Directory the exported detector models are cached in, named
+            after a digest of the detector weights. Defaults to
+            ``~/.EasyOCR/onnx``.
+    """
+
+    backend: str = QUANTIZED
+    num_threads: Optional[int] = None
+    onnx_dir: Optional[str] = None
+
+    def __post_init__(self) -> None:
+        if self.backend not in CPU_BACKENDS:
+            raise ValueError(
+                f"backend must be one of {', '.join(CPU_BACKENDS)}, "
+                f"not {self.backend!r}"
+            )
+        if self.num_threads is not None and self.num_threads < 1:
+            raise ValueError("num_threads must be at least 1")
+
+
+class ONNXDetector:
+    """
+    CRAFT text detector running on ONNX Runtime.
+
+    Called like the PyTorch module it replaces: takes a normalized image batch
+    tensor and returns the score map and feature tensors.
+    """
+
+    def __init__(self, path: Path, num_threads: Optional[int] = None) -> None:
+        """
+        Load an exported detector.
+
+        Args:
+            path: ONNX model written by ``export_detector``.
+            num_threads: Intra-op threads of the session.
+        """
+        try:
+            import onnxruntime
+        except ImportError as e:
+            raise ImportError(
+                "The onnx CPU backend requires onnxruntime: pip install onnxruntime"
+            ) from e
+
+        options = onnxruntime.SessionOptions()
+        if num_threads is not None:
+            options.intra_op_num_threads = num_threads
+            options.inter_op_num_threads = 1
+        self.path = path
+        self.session = onnxruntime.InferenceSession(
+            str(path), options, providers=["CPUExecutionProvider"]
+        )
+        # The session holds the weights of the model file; activations are not
+        # counted, like for the torch models
+        self.memory_bytes = path.stat().st_size
+
+    def __call__(self, images: Any) -> tuple[Any, Any]:
+        """Run detection on a batch of images, returning torch tensors."""
+        import torch
+
+        score, feature = self.session.run(
+            None, {"image": images.detach().cpu().numpy()}
+        )
+        return torch.from_numpy(score), torch.from_numpy(feature)
+
+
+def export_detector(detector: Any, path: Path) -> Path:
+    """
+    Export a CRAFT detector to ONNX with dynamic batch and image sizes.
+
+    The model is written to a temporary file and moved into place, so worker
+    processes exporting at the same time never read a partial file.
+
+    Args:
+        detector: PyTorch CRAFT module of an EasyOCR reader.
+        path: Destination of the ONNX model.
+
+    Returns:
+        ``path``.
+    """
+    import torch
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    partial_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    detector = getattr(detector, "module", detector)
+    detector.eval()
+    with torch.no_grad():
+        torch.onnx.export(
+            detector,
+            torch.zeros(1, 3, 640, 640),
+            str(partial_path),
+            input_names=["image"],
+            output_names=["score", "feature"],
+            dynamic_axes={
+                "image": {0: "batch", 2: "height", 3: "width"},
+                "score": {0: "batch", 1: "score_height", 2: "score_width"},
+                "feature": {0: "batch", 2: "feature_height", 3: "feature_width"},
+            },
+            opset_version=ONNX_OPSET,
+        )
+    os.replace(partial_path, path)
+    return path
+
+
+def detector_digest(detector: Any) -> str:
+    """
+    Short digest of a detector's weights and the ONNX opset it is exported with.
+
+    Names the cached export, so detectors with other weights, e.g. from another
+    model directory, get their own export instead of reusing a stale one.
+    """
+    digest = hashlib.sha256(f"opset {ONNX_OPSET}".encode())
+    module = getattr(detector, "module", detector)
+    for name, tensor in module.state_dict().items():
+        digest.update(name.encode())
+        digest.update(tensor.detach().cpu().numpy().tobytes())
+    return digest.hexdigest()[:16]
+
+
+def set_cpu_threads(num_threads: Optional[int]) -> None:
+    """Set the PyTorch intra-op thread count of this process."""
+    if num_threads is None:
+        return
+    import torch
+
+    torch.set_num_threads(num_threads)
+
+
+def build_cpu_reader(
+    lang_key: LangKey,
+    config: CPUInferenceConfig,
+    reader_factory: Optional[Callable[..., Any]] = None,
+    **reader_kwargs: Any,
+) -> Any:
+    """
+    Construct an EasyOCR reader set up for CPU inference.
+
+    Args:
+        lang_key: Normalized language set.
+        config: CPU backend and thread count.
+        reader_factory: Callable building the underlying reader from a language
+            key and ``reader_kwargs``, e.g. a model manager's. Defaults to
+            ``easyocr.Reader``.
+        **reader_kwargs: Extra ``easyocr.Reader`` arguments.
+
+    Returns:
+        EasyOCR reader whose detector may be an ``ONNXDetector``.
+    """
+    set_cpu_threads(config.num_threads)
+    factory = reader_factory or _build_easyocr_reader
+    reader = factory(lang_key, **{**reader_kwargs, "gpu": False, "quantize": True})
+    if config.backend == ONNX:
+        network = getattr(reader, "detect_network", "craft")
+        if network != "craft":
+            raise ValueError(f"The onnx CPU backend does not support {network}")
+        directory = Path(config.onnx_dir) if config.onnx_dir else DEFAULT_ONNX_DIR
+        path = directory / f"{network}-{detector_digest(reader.detector)}.onnx"
+        if not path.is_file():
+            export_detector(reader.detector, path)
+        reader.detector = ONNXDetector(path, config.num_threads)
+    return reader
+
+
+# CPU pool of every configuration, with the process-wide pool it was built from
+_cpu_reader_pools: dict[
+    CPUInferenceConfig, tuple[EasyOCRReaderPool, EasyOCRReaderPool]
+] = {}
+_cpu_reader_pools_lock = threading.Lock()
+
+
+def get_cpu_reader_pool(config: CPUInferenceConfig) -> EasyOCRReaderPool:
+    """
+    Return the process-wide reader pool of a CPU configuration.
+
+    The pool follows the process-wide reader pool: it takes its limits (reader
+    count, memory budget and admission), reader arguments and reader factory,
+    so readers of an ``EasyOCRModelManager`` are built for the CPU from the
+    same local files, in the same strict mode. It is rebuilt when the
+    process-wide pool is replaced, e.g. by ``configure_reader_pool`` or a model
+    manager starting. EasyOCR worker processes receive the configuration and
+    build their own pool from it, following the pool set by their worker
+    initializer.
+    """
+    base = get_reader_pool()
+    with _cpu_reader_pools_lock:
+        cached = _cpu_reader_pools.get(config)
+        if cached is not None and cached[0] is base:
+            return cached[1]
+        pool = EasyOCRReaderPool(
+            max_readers=base.max_readers,
+            max_memory_bytes=base.max_memory_bytes,
+            reader_factory=partial(
+                build_cpu_reader, config=config, reader_factory=base.reader_factory
+            ),
+            memory_estimator=base.memory_estimator,
+            admission_timeout=base.admission_timeout,
+            default_reader_bytes=base.default_reader_bytes,
+            **base.reader_kwargs,
+        )
+        _cpu_reader_pools[config] = (base, pool)
+        return pool
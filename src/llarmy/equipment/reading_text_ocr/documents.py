@@ -0,0 +1,162 @@
+"""
+Multi-page document support for the Reading Text OCR equipment.
+
+Documents are multi-frame images (e.g. scanned TIFFs) or PDFs. Pages are
+produced lazily one at a time and OCRed on a worker pool with a bounded number
+of pages in flight, so memory stays flat for long documents and results can be
+consumed as soon as the leading pages are done.
+"""
+
+import os
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, BinaryIO, Callable, Iterable, Iterator, Optional, TypeVar, Union
+
+from PIL import Image, ImageSequence
+
+from .images import is_base64_input, open_input_stream
+
+DEFAULT_PDF_DPI = 200
+
+PDF_MAGIC = b"%PDF"
+
+T = TypeVar("T")
+
+
+def iter_document_pages(
+    document_input: str,
+    start_page: int = 1,
+    max_pages: Optional[int] = None,
+    pdf_dpi: int = DEFAULT_PDF_DPI,
+) -> Iterator[tuple[int, Image.Image]]:
+    """
+    Lazily iterate over the pages of a document.
+
+    Args:
+        document_input: File path or base64 string of a PDF or an image. Every
+            frame of a multi-frame image (e.g. TIFF) is a page.
+        start_page: First page to yield (1-based).
+        max_pages: Maximum number of pages to yield.
+        pdf_dpi: Resolution PDF pages are rendered at.
+
+    Yields:
+        Page number (1-based) and the page image.
+    """
+    if start_page < 1:
+        raise ValueError("start_page must be at least 1")
+    stop = None if max_pages is None else start_page - 1 + max_pages
+
+    document = open_input_stream(document_input)
+    if _is_pdf(document):
+        document.close()
+        yield from _iter_pdf_pages(document_input, start_page, stop, pdf_dpi)
+        return
+
+    with Image.open(document) as image:
+        for index, frame in enumerate(ImageSequence.Iterator(image)):
+            page_number = index + 1
+            if stop is not None and page_number > stop:
+                break
+            if page_number >= start_page:
+                # Frames share one decoder; copy so workers get their own image
+                yield page_number, frame.copy()
+
+
+def count_document_pages(document_input: str) -> int:
+    """Return the number of pages (PDF pages or image frames) in a document."""
+    document = open_input_stream(document_input)
+    if _is_pdf(document):
+        document.close()
+        pdf = _load_pdf(document_input)
+        try:
+            return len(pdf)
+        finally:
+            pdf.close()
+    with Image.open(document) as image:
+        return getattr(image, "n_frames", 1)
+
+
+def ocr_document_pages(
+    pages: Iterable[tuple[int, Image.Image]],
+    ocr_page: Callable[[Image.Image], T],
+    max_workers: Optional[int] = None,
+    max_in_flight: Optional[int] = None,
+) -> Iterator[tuple[int, Union[T, Exception]]]:
+    """
+    OCR pages in parallel and yield the results in page order.
+
+    At most ``max_in_flight`` pages are rendered and waiting or being OCRed at
+    any time; the next page is only pulled from ``pages`` once the oldest one
+    has been yielded.
+
+    Args:
+        pages: Page number and image pairs, typically ``iter_document_pages``.
+        ocr_page: Engine call returning the text of one page.
+        max_workers: Number of OCR worker threads.
+        max_in_flight: Pages held at once. Defaults to twice the workers.
+
+    Yields:
+        Page number and extracted text, or the error raised for that page.
+    """
+    limit = max_in_flight or 2 * (max_workers or os.cpu_count() or 1)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        in_flight: deque[tuple[int, Future[T]]] = deque()
+        for page_number, image in pages:
+            in_flight.append((page_number, executor.submit(ocr_page, image)))
+            if len(in_flight) >= limit:
+                yield _page_result(*in_flight.popleft())
+        while in_flight:
+            yield _page_result(*in_flight.popleft())
+
+
+def _page_result(page_number: int, future: Future[Any]) -> tuple[int, Any]:
+    """Wait for one page and capture its error instead of raising."""
+    try:
+        return page_number, future.result()
+    except Exception as e:
+        return page_number, e
+
+
+def _is_pdf(document: BinaryIO) -> bool:
+    """Sniff the PDF signature without moving the stream position."""
+    position = document.tell()
+    signature = document.read(len(PDF_MAGIC))
+    document.seek(position)
+    return signature == PDF_MAGIC
+
+
+def _load_pdf(document_input: str) -> Any:
+    """Open a PDF with pypdfium2, which is an optional dependency."""
+    try:
+        import pypdfium2
+    except ImportError as e:
+        raise ImportError(
+            "PDF support requires pypdfium2. Install it with `pip install llarmy[pdf]`."
+        ) from e
+    if not is_base64_input(document_input):
+        # Let pdfium read the file itself instead of going through Python
+        return pypdfium2.PdfDocument(Path(document_input).resolve())
+    with open_input_stream(document_input) as document:
+        return pypdfium2.PdfDocument(document.read())
+
+
+def _iter_pdf_pages(
+    document_input: str,
+    start_page: int,
+    stop: Optional[int],
+    pdf_dpi: int,
+) -> Iterator[tuple[int, Image.Image]]:
+    """Render PDF pages one at a time."""
+    pdf = _load_pdf(document_input)
+    try:
+        last_page = len(pdf) if stop is None else min(stop, len(pdf))
+        for page_number in range(start_page, last_page + 1):
+            page = pdf[page_number - 1]
+            try:
+                bitmap = page.render(scale=pdf_dpi / 72)
+                yield page_number, bitmap.to_pil()
+            finally:
+                page.close()
+    finally:
+        pdf.close()
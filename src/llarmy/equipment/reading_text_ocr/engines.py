@@ -0,0 +1,147 @@
+"""
+Engine-level OCR helpers shared by the Reading Text OCR tool specs.
+
+These functions take already loaded images and return plain text, leaving
+input decoding and result formatting to the tool spec.
+"""
+
+from collections import defaultdict
+from typing import Any, Optional, Union
+
+from PIL import Image
+
+from .images import image_to_array
+from .instrumentation import ocr_stage
+from .layout import OCRLayout
+from .tesseract_backends import TesseractBackend, get_tesseract_backend
+
+
+def easyocr_readtext(reader: Any, image: Image.Image) -> str:
+    """Run EasyOCR on a single image and join the recognized text."""
+    return easyocr_readtext_with_confidence(reader, image)[0]
+
+
+def easyocr_readtext_with_confidence(
+    reader: Any,
+    image: Image.Image,
+) -> tuple[str, float]:
+    """
+    Run EasyOCR on a single image.
+
+    Returns:
+        Joined text and the mean detection confidence on a 0-100 scale.
+    """
+    with ocr_stage("easyocr", images=1, width=image.width, height=image.height):
+        results = reader.readtext(image_to_array(image))
+    text = " ".join(result[1] for result in results).strip()
+    if not results:
+        return text, 0.0
+    return text, 100 * sum(float(result[2]) for result in results) / len(results)
+
+
+def easyocr_readtext_layout(reader: Any, image: Image.Image) -> OCRLayout:
+    """Run EasyOCR on a single image and keep its boxes and confidences."""
+    with ocr_stage("easyocr", images=1, width=image.width, height=image.height):
+        results = reader.readtext(image_to_array(image))
+    return OCRLayout.from_easyocr(results, image.width, image.height)
+
+
+def tesseract_image_to_string_with_confidence(
+    image: Image.Image,
+    lang: str = "eng",
+    backend: Optional[TesseractBackend] = None,
+) -> tuple[str, float]:
+    """Run tesseract and return the text with its mean word confidence (0-100)."""
+    backend = backend if backend is not None else get_tesseract_backend()
+    with ocr_stage("tesseract", backend=backend.name, images=1):
+        return backend.image_to_string_with_confidence(image, lang=lang)
+
+
+def easyocr_readtext_batch(
+    reader: Any,
+    images: list[Image.Image],
+) -> list[Union[str, Exception]]:
+    """
+    Run EasyOCR over many images using its batched recognizer.
+
+    ``readtext_batched`` needs every image in a call to share the same size, so
+    images are grouped by dimensions and each group is sent as one batch. If a
+    batch fails, its images are retried one by one so a single bad image only
+    fails itself.
+
+    Args:
+        reader: EasyOCR reader for the requested languages.
+        images: Loaded images.
+
+    Returns:
+        Extracted text or the raised exception, in input order.
+    """
+    results: list[Union[str, Exception]] = [""] * len(images)
+    groups: dict[tuple[int, int], list[int]] = defaultdict(list)
+    for index, image in enumerate(images):
+        groups[image.size].append(index)
+
+    for indices in groups.values():
+        arrays = [image_to_array(images[index]) for index in indices]
+        width, height = images[indices[0]].size
+        try:
+            with ocr_stage("easyocr", images=len(arrays), width=width, height=height):
+                batch = reader.readtext_batched(arrays)
+        except Exception:
+            # Retry the group image by image to isolate the failure
+            batch = None
+        for position, index in enumerate(indices):
+            try:
+                detections = (
+                    batch[position]
+                    if batch is not None
+                    else reader.readtext(arrays[position])
+                )
+                results[index] = " ".join(d[1] for d in detections).strip()
+            except Exception as e:
+                results[index] = e
+    return results
+
+
+def tesseract_image_to_string(
+    image: Image.Image,
+    lang: str = "eng",
+    backend: Optional[TesseractBackend] = None,
+) -> str:
+    """Run tesseract on a single image with the given or process-wide backend."""
+    backend = backend if backend is not None else get_tesseract_backend()
+    with ocr_stage("tesseract", backend=backend.name, images=1):
+        return backend.image_to_string(image, lang=lang)
+
+
+def tesseract_image_to_string_batch(
+    images: list[Image.Image],
+    lang: str = "eng",
+    backend: Optional[TesseractBackend] = None,
+) -> list[Union[str, Exception]]:
+    """
+    Run tesseract over many images with the given or process-wide backend.
+
+    Args:
+        images: Loaded images.
+        lang: Tesseract language code(s), e.g. ``"eng"`` or ``"eng+spa"``.
+        backend: Tesseract backend. Defaults to the process-wide backend.
+
+    Returns:
+        Extracted text or the raised exception, in input order.
+    """
+    backend = backend if backend is not None else get_tesseract_backend()
+    with ocr_stage("tesseract", backend=backend.name, images=len(images)):
+        return backend.image_to_string_batch(images, lang=lang)
+
+
+def tesseract_image_to_layout(
+    image: Image.Image,
+    lang: str = "eng",
+    backend: Optional[TesseractBackend] = None,
+) -> OCRLayout:
+    """Run tesseract on a single image and keep its word boxes and confidences."""
+    backend = backend if backend is not None else get_tesseract_backend()
+    with ocr_stage("tesseract", backend=backend.name, images=1):
+        data = backend.image_to_data(image, lang=lang)
+    return OCRLayout.from_tesseract_data(data, image.width, image.height)
@@ -0,0 +1,188 @@
+"""
+Bounded executors for running OCR engines from async code.
+
+Tesseract runs as a subprocess, so a thread pool is enough to keep it off the
+event loop. EasyOCR is CPU bound Python/PyTorch work and runs in a process pool
+by default so it neither blocks the loop nor competes for the GIL.
+"""
+
+import asyncio
+import contextvars
+import functools
+import multiprocessing
+import threading
+import weakref
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+def _noop() -> None:
+    """Task used to start worker processes."""
+
+
+class OCRBusyError(RuntimeError):
+    """Raised when an OCR request cannot be admitted within the queue timeout."""
+
+
+class OCRExecutor:
+    """
+    Executor pair with admission control for async OCR calls.
+
+    At most ``max_pending`` OCR calls are admitted per event loop at once; the
+    engines themselves run on at most ``max_tesseract_workers`` threads and
+    ``max_easyocr_workers`` processes. Calls beyond ``max_pending`` wait for a
+    slot for up to ``queue_timeout`` seconds and then fail with
+    ``OCRBusyError`` so callers can shed load instead of piling up.
+    """
+
+    def __init__(
+        self,
+        max_tesseract_workers: int = 4,
+        max_easyocr_workers: int = 1,
+        max_pending: int = 32,
+        queue_timeout: Optional[float] = 30.0,
+        worker_initializer: Optional[Callable[..., None]] = None,
+        worker_initargs: tuple[Any, ...] = (),
+    ) -> None:
+        """
+        Initialize the OCR executor.
+
+        Args:
+            max_tesseract_workers: Threads running tesseract subprocesses.
+            max_easyocr_workers: Processes running EasyOCR. Each worker process
+                holds its own reader pool. Use 0 to run EasyOCR on the
+                tesseract thread pool instead (e.g. with a GPU reader).
+            max_pending: OCR calls admitted at once per event loop, running or
+                waiting for a worker.
+            queue_timeout: Seconds a call waits for admission before failing
+                with ``OCRBusyError``. ``None`` waits indefinitely.
+            worker_initializer: Picklable function run once in every EasyOCR
+                worker process, e.g. to preload readers.
+            worker_initargs: Arguments of ``worker_initializer``.
+        """
+        if max_tesseract_workers < 1:
+            raise ValueError("max_tesseract_workers must be at least 1")
+        if max_easyocr_workers < 0:
+            raise ValueError("max_easyocr_workers must not be negative")
+        if max_pending < 1:
+            raise ValueError("max_pending must be at least 1")
+        self.max_tesseract_workers = max_tesseract_workers
+        self.max_easyocr_workers = max_easyocr_workers
+        self.max_pending = max_pending
+        self.queue_timeout = queue_timeout
+        self.worker_initializer = worker_initializer
+        self.worker_initargs = worker_initargs
+        self._thread_pool: Optional[ThreadPoolExecutor] = None
+        self._process_pool: Optional[ProcessPoolExecutor] = None
+        self._slots: weakref.WeakKeyDictionary[
+            asyncio.AbstractEventLoop, asyncio.Semaphore
+        ] = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+
+    @property
+    def uses_process_pool(self) -> bool:
+        """Whether EasyOCR calls run in worker processes."""
+        return self.max_easyocr_workers > 0
+
+    async def run_tesseract(self, fn: Callable[..., T], *args: Any) -> T:
+        """Run a tesseract call on the thread pool."""
+        return await self.run_in_thread(fn, *args)
+
+    async def run_in_thread(self, fn: Callable[..., T], *args: Any) -> T:
+        """Run any blocking OCR work on the thread pool."""
+        return await self._submit(self._get_thread_pool(), fn, *args)
+
+    async def run_easyocr(self, fn: Callable[..., T], *args: Any) -> T:
+        """
+        Run an EasyOCR call on the process pool.
+
+        ``fn`` and ``args`` must be picklable when the process pool is enabled.
+        """
+        executor: Executor = (
+            self._get_process_pool()
+            if self.uses_process_pool
+            else self._get_thread_pool()
+        )
+        return await self._submit(executor, fn, *args)
+
+    def start_workers(self) -> None:
+        """Start the EasyOCR worker processes now instead of on first use."""
+        if not self.uses_process_pool:
+            return
+        pool = self._get_process_pool()
+        for future in [pool.submit(_noop) for _ in range(self.max_easyocr_workers)]:
+            future.result()
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Shut down the worker pools. They are recreated on next use."""
+        with self._lock:
+            thread_pool, self._thread_pool = self._thread_pool, None
+            process_pool, self._process_pool = self._process_pool, None
+        if thread_pool is not None:
+            thread_pool.shutdown(wait=wait)
+        if process_pool is not None:
+            process_pool.shutdown(wait=wait)
+
+    async def _submit(self, executor: Executor, fn: Callable[..., T], *args: Any) -> T:
+        """Wait for an admission slot, then run ``fn`` on ``executor``."""
+        loop = asyncio.get_running_loop()
+        slots = self._slots.get(loop)
+        if slots is None:
+            slots = self._slots.setdefault(loop, asyncio.Semaphore(self.max_pending))
+        try:
+            await asyncio.wait_for(slots.acquire(), timeout=self.queue_timeout)
+        except asyncio.TimeoutError as e:
+            raise OCRBusyError(
+                f"OCR queue is full ({self.max_pending} pending requests)"
+            ) from e
+        call = functools.partial(fn, *args)
+        if isinstance(executor, ThreadPoolExecutor):
+            # Like asyncio.to_thread, so the call sees the caller's image store
+            call = functools.partial(contextvars.copy_context().run, call)
+        try:
+            return await loop.run_in_executor(executor, call)
+        finally:
+            slots.release()
+
+    def _get_thread_pool(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._thread_pool is None:
+                self._thread_pool = ThreadPoolExecutor(
+                    max_workers=self.max_tesseract_workers,
+                    thread_name_prefix="llarmy-ocr",
+                )
+            return self._thread_pool
+
+    def _get_process_pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._process_pool is None:
+                # torch is not fork-safe once its thread pools have started
+                self._process_pool = ProcessPoolExecutor(
+                    max_workers=self.max_easyocr_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=self.worker_initializer,
+                    initargs=self.worker_initargs,
+                )
+            return self._process_pool
+
+
+_default_executor: Optional[OCRExecutor] = None
+_default_executor_lock = threading.Lock()
+
+
+def get_ocr_executor() -> OCRExecutor:
+    """Return the process-wide OCR executor, creating it on first use."""
+    global _default_executor
+    with _default_executor_lock:
+        if _default_executor is None:
+            _default_executor = OCRExecutor()
+        return _default_executor
+
+
+def set_ocr_executor(executor: OCRExecutor) -> None:
+    """Replace the process-wide OCR executor (e.g. to change its limits)."""
+    global _default_executor
+    with _default_executor_lock:
+        _default_executor = executor
@@ -0,0 +1,362 @@
+"""
+Image handles: register an image once, then refer to it by a short name.
+
+Agents passing base64 images to the OCR tools send megabytes of text through
+the LLM's tool-call arguments on every call, and every call decodes them
+again. An ``ImageStore`` registers an image once and returns a short handle
+(``img-`` followed by 16 hex digits of the content digest) that every OCR tool
+accepts in place of a path or base64 string.
+
+Base64 images are decoded once and written to a file in the store's
+directory, so worker processes can read them by path; files are referenced
+where they are, and a handle whose file changed is dropped on its next use.
+Registered images and decoded images are kept in bounded LRU caches, so
+repeated calls on the same handle skip decoding and a long session does not
+accumulate images.
+
+Each ``ReadingTextOCRToolSpec`` owns a store, made current with
+``use_image_store`` while its tools run; outside of a tool call, handles are
+resolved with the process-wide store.
+"""
+
+import shutil
+import tempfile
+import threading
+from collections import OrderedDict
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any, NamedTuple, Optional
+
+from PIL import Image
+
+from .images import (
+    image_input_digest,
+    is_base64_input,
+    is_image_handle,
+    load_image_from_input,
+    open_input_stream,
+)
+
+HANDLE_PREFIX = "img-"
+
+
+class _RegisteredImage(NamedTuple):
+    """File behind a handle and what it looked like when it was registered."""
+
+    path: Path
+    digest: str
+    # Modification time and size of files referenced in place, None for files
+    # written by the store
+    stat: Optional[tuple[int, int]]
+
+
+class ImageStore:
+    """
+    Registered images by handle, with an LRU cache of decoded images.
+
+    Handles are derived from the image content, so registering the same image
+    twice returns the same handle. The store is thread-safe.
+    """
+
+    def __init__(
+        self,
+        max_images: Optional[int] = 256,
+        max_decoded_images: int = 32,
+        max_decoded_bytes: Optional[int] = 512 * 2**20,
+        directory: Optional[str] = None,
+    ) -> None:
+        """
+        Initialize the image store.
+
+        Args:
+            max_images: Registered images kept. The least recently used image
+                is forgotten, and its file deleted if the store wrote it.
+                ``None`` disables the limit.
+            max_decoded_images: Decoded images kept in memory.
+            max_decoded_bytes: Pixel bytes of the decoded images kept in
+                memory. ``None`` disables the byte limit.
+            directory: Directory base64 images are written to. Defaults to a
+                temporary directory removed by ``close``.
+        """
+        self.max_images = max_images
+        self.max_decoded_images = max_decoded_images
+        self.max_decoded_bytes = max_decoded_bytes
+        self._directory = Path(directory) if directory is not None else None
+        self._owns_directory = directory is None
+        self._images: OrderedDict[str, _RegisteredImage] = OrderedDict()
+        self._decoded: OrderedDict[tuple[str, Optional[int]], Image.Image] = (
+            OrderedDict()
+        )
+        self._decoded_bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def register(self, image_input: str) -> str:
+        """
+        Register an image.
+
+        Args:
+            image_input: File path, base64 encoded image string or handle.
+
+        Returns:
+            Handle of the image.
+
+        Raises:
+            OSError: If the image cannot be read.
+        """
+        if is_image_handle(image_input):
+            self.path(image_input)
+            return image_input
+        stat = None
+        if not is_base64_input(image_input):
+            path = Path(image_input).resolve()
+            # Taken before hashing, so a file changed while it is hashed is
+            # seen as changed on its first lookup
+            stat = _file_stat(path)
+        digest = image_input_digest(image_input)
+        handle = HANDLE_PREFIX + digest[:16]
+        with self._lock:
+            current = self._images.get(handle)
+            # Files the store wrote cannot go stale; files referenced in place
+            # are looked at again below
+            if current is not None and current.stat is None:
+                self._images.move_to_end(handle)
+                return handle
+        if stat is None:
+            path = self._get_directory() / handle
+            with open_input_stream(image_input) as source, path.open("wb") as target:
+                shutil.copyfileobj(source, target)
+        entry = _RegisteredImage(path, digest, stat)
+        with self._lock:
+            current = self._images.get(handle)
+            if current is None or current.stat is not None:
+                self._images[handle] = entry
+            self._images.move_to_end(handle)
+            evicted = self._evict_images()
+        self._delete_files(evicted)
+        return handle
+
+    def path(self, handle: str) -> Path:
+        """
+        Return the file behind a handle.
+
+        Raises:
+            FileNotFoundError: If the handle is not registered, or its file
+                changed since it was registered.
+        """
+        return self._lookup(handle).path
+
+    def digest(self, handle: str) -> str:
+        """Return the SHA-256 digest of a registered image's file contents."""
+        return self._lookup(handle).digest
+
+    def load(self, handle: str, target_side: Optional[int] = None) -> Image.Image:
+        """
+        Return the decoded image behind a handle.
+
+        The image is shared with other callers and must not be modified in
+        place.
+
+        Args:
+            handle: Registered handle.
+            target_side: Longest side the OCR engine needs, see
+                ``load_image_from_input``.
+        """
+        path = self.path(handle)
+        key = (handle, target_side)
+        with self._lock:
+            image = self._decoded.get(key)
+            if image is not None:
+                self._decoded.move_to_end(key)
+                self.hits += 1
+                return image
+            self.misses += 1
+
+        image = load_image_from_input(str(path), target_side=target_side)
+        image.load()
+        size = _pixel_bytes(image)
+        with self._lock:
+            if key not in self._decoded:
+                self._decoded[key] = image
+                self._decoded_bytes += size
+                self._evict_decoded()
+        return image
+
+    def remove(self, handle: str) -> bool:
+        """Forget a handle and its decoded images. Returns whether it existed."""
+        with self._lock:
+            entry = self._images.pop(handle, None)
+            self._forget_decoded(handle)
+        if entry is None:
+            return False
+        self._delete_files([entry])
+        return True
+
+    def close(self) -> None:
+        """Forget every image and delete the files written by the store."""
+        with self._lock:
+            self._images.clear()
+            self._decoded.clear()
+            self._decoded_bytes = 0
+            directory, owned = self._directory, self._owns_directory
+            if owned:
+                self._directory = None
+        if directory is not None and owned:
+            shutil.rmtree(directory, ignore_errors=True)
+
+    def __contains__(self, handle: object) -> bool:
+        """Whether a handle is registered."""
+        with self._lock:
+            return handle in self._images
+
+    def __len__(self) -> int:
+        """Number of registered images."""
+        with self._lock:
+            return len(self._images)
+
+    @property
+    def stats(self) -> dict[str, Any]:
+        """Registered and decoded image counters for monitoring."""
+        with self._lock:
+            return {
+                "images": len(self._images),
+                "decoded_images": len(self._decoded),
+                "decoded_bytes": self._decoded_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+    def _lookup(self, handle: str) -> _RegisteredImage:
+        """
+        Return a registered image, dropping it if its file changed.
+
+        Handles name the content they were registered with; a file referenced
+        in place that was modified since no longer matches its handle.
+        """
+        with self._lock:
+            entry = self._images.get(handle)
+            if entry is not None:
+                self._images.move_to_end(handle)
+        if entry is None:
+            raise FileNotFoundError(f"Unknown image handle: {handle}")
+        if entry.stat is not None and not _unchanged(entry):
+            with self._lock:
+                if self._images.get(handle) == entry:
+                    del self._images[handle]
+                    self._forget_decoded(handle)
+            raise FileNotFoundError(
+                f"Image handle {handle} is stale: {entry.path} changed since it "
+                "was registered; register it again"
+            )
+        return entry
+
+    def _forget_decoded(self, handle: str) -> None:
+        """Drop the decoded images of a handle. Call with the lock held."""
+        for key in [key for key in self._decoded if key[0] == handle]:
+            self._decoded_bytes -= _pixel_bytes(self._decoded.pop(key))
+
+    def _evict_images(self) -> list[_RegisteredImage]:
+        """
+        Forget least recently used images until the store fits.
+
+        Call with the lock held; returns the forgotten images so their files
+        can be deleted outside of it.
+        """
+        evicted = []
+        while self.max_images is not None and len(self._images) > self.max_images:
+            handle, entry = self._images.popitem(last=False)
+            self._forget_decoded(handle)
+            evicted.append(entry)
+        return evicted
+
+    def _delete_files(self, entries: list[_RegisteredImage]) -> None:
+        """Delete the files the store wrote for forgotten images."""
+        for entry in entries:
+            if entry.stat is None:
+                entry.path.unlink(missing_ok=True)
+
+    def _get_directory(self) -> Path:
+        """Directory for base64 images, created on first use."""
+        with self._lock:
+            if self._directory is None:
+                self._directory = Path(tempfile.mkdtemp(prefix="llarmy_images_"))
+            self._directory.mkdir(parents=True, exist_ok=True)
+            return self._directory
+
+    def _evict_decoded(self) -> None:
+        """Drop least recently used decoded images until the cache fits."""
+        while len(self._decoded) > 1 and (
+            len(self._decoded) > self.max_decoded_images
+            or (
+                self.max_decoded_bytes is not None
+                and self._decoded_bytes > self.max_decoded_bytes
+            )
+        ):
+            _, image = self._decoded.popitem(last=False)
+            self._decoded_bytes -= _pixel_bytes(image)
+
+
+def _pixel_bytes(image: Image.Image) -> int:
+    """Approximate memory held by a decoded image."""
+    return image.width * image.height * len(image.getbands())
+
+
+def _unchanged(entry: _RegisteredImage) -> bool:
+    """Whether a file referenced in place still has its registered stat."""
+    try:
+        return _file_stat(entry.path) == entry.stat
+    except OSError:
+        return False
+
+
+def _file_stat(path: Path) -> tuple[int, int]:
+    """Modification time and size of a file."""
+    stat = path.stat()
+    return stat.st_mtime_ns, stat.st_size
+
+
+_default_store: Optional[ImageStore] = None
+_default_store_lock = threading.Lock()
+_current_store: ContextVar[Optional[ImageStore]] = ContextVar(
+    "llarmy_image_store", default=None
+)
+
+
+def get_image_store() -> ImageStore:
+    """Return the process-wide image store, creating it on first use."""
+    global _default_store
+    with _default_store_lock:
+        if _default_store is None:
+            _default_store = ImageStore()
+        return _default_store
+
+
+def set_image_store(store: ImageStore) -> None:
+    """Replace the process-wide image store used outside of tool calls."""
+    global _default_store
+    with _default_store_lock:
+        _default_store = store
+
+
+def current_image_store() -> ImageStore:
+    """Return the store set by ``use_image_store``, or the process-wide store."""
+    store = _current_store.get()
+    return store if store is not None else get_image_store()
+
+
+@contextmanager
+def use_image_store(store: ImageStore) -> Iterator[ImageStore]:
+    """
+    Resolve image handles with ``store`` in the current context.
+
+    The store is seen by threads started with ``asyncio.to_thread`` and the
+    OCR executors, which copy the caller's context, but not by plain threads.
+    """
+    token = _current_store.set(store)
+    try:
+        yield store
+    finally:
+        _current_store.reset(token)
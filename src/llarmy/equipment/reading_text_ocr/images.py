@@ -0,0 +1,281 @@
+"""
+Image loading for the Reading Text OCR equipment.
+
+Inputs are file paths, base64 strings or image handles (see ``handles``).
+Files are memory-mapped instead of being read into Python bytes, base64
+payloads are decoded in bounded chunks into a single preallocated buffer, and
+JPEGs can be decoded directly at a reduced scale when the engine does not need
+full resolution.
+"""
+
+import base64
+import binascii
+import contextvars
+import hashlib
+import math
+import mmap
+import re
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from pathlib import Path
+from typing import TYPE_CHECKING, BinaryIO, Optional, Union, cast
+
+import numpy as np
+from PIL import Image
+
+from .instrumentation import instrumentation_enabled, ocr_stage
+
+if TYPE_CHECKING:
+    from .handles import ImageStore
+
+# Data URLs and the base64 signatures of JPEG, PNG, GIF, WEBP, TIFF and PDF
+BASE64_PREFIXES = (
+    "data:",
+    "/9j/",
+    "iVBOR",
+    "R0lGOD",
+    "UklGR",
+    "SUkq",
+    "TU0A",
+    "JVBERi",
+)
+
+# Multiple of 4 so every chunk holds whole base64 quanta
+BASE64_CHUNK_CHARS = 4 * 256 * 1024
+
+# Handles returned by ``ImageStore.register``
+IMAGE_HANDLE_PATTERN = re.compile(r"img-[0-9a-f]{16}\Z")
+
+
+def load_image_from_input(
+    image_input: str,
+    target_side: Optional[int] = None,
+) -> Image.Image:
+    """
+    Load image from file path or base64 string.
+
+    Args:
+        image_input: File path, base64 encoded image string or image handle.
+        target_side: Longest side the OCR engine needs. When set, JPEGs are
+            decoded at the smallest scale whose longest side still covers it.
+
+    Returns:
+        PIL Image object. Pixel data is decoded lazily on first access, or
+        right away when instrumentation is enabled so decoding is timed.
+        Images behind handles come decoded from the image store's cache and
+        are shared, so they must not be modified in place.
+    """
+    if is_image_handle(image_input):
+        return _image_store().load(image_input, target_side=target_side)
+    if not instrumentation_enabled():
+        image = Image.open(open_input_stream(image_input))
+        if target_side is not None:
+            _draft(image, target_side)
+        return image
+
+    with ocr_stage("decode", base64=is_base64_input(image_input)) as attributes:
+        stream = open_input_stream(image_input)
+        stream.seek(0, 2)
+        attributes["bytes"] = stream.tell()
+        stream.seek(0)
+        image = Image.open(stream)
+        attributes["format"] = image.format or ""
+        if target_side is not None:
+            _draft(image, target_side)
+        image.load()
+        attributes["width"], attributes["height"] = image.size
+    return image
+
+
+def load_images_from_inputs(
+    image_inputs: list[str],
+    max_workers: Optional[int] = None,
+    target_side: Optional[int] = None,
+) -> list[Union[Image.Image, Exception]]:
+    """
+    Load and decode many images concurrently.
+
+    Args:
+        image_inputs: File paths or base64 encoded image strings.
+        max_workers: Maximum number of decoding threads.
+        target_side: Longest side the OCR engine needs, see
+            ``load_image_from_input``.
+
+    Returns:
+        Decoded PIL Image objects, or the error raised while loading each
+        input, in input order.
+    """
+
+    def _load(image_input: str) -> Union[Image.Image, Exception]:
+        try:
+            image = load_image_from_input(image_input, target_side=target_side)
+            image.load()
+            return image
+        except (OSError, ValueError) as e:
+            return e
+
+    if len(image_inputs) <= 1:
+        return [_load(image_input) for image_input in image_inputs]
+    # Each thread runs in a copy of the caller's context, so handles are
+    # resolved with the caller's image store
+    context = contextvars.copy_context()
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return list(
+            executor.map(
+                lambda image_input: context.copy().run(_load, image_input),
+                image_inputs,
+            )
+        )
+
+
+def image_input_digest(image_input: str) -> str:
+    """
+    Hash the image bytes behind a file path, base64 string or image handle.
+
+    Args:
+        image_input: File path, base64 encoded image string or image handle.
+
+    Returns:
+        SHA-256 hex digest of the encoded image file contents.
+    """
+    if is_image_handle(image_input):
+        return _image_store().digest(image_input)
+    digest = hashlib.sha256()
+    with open_input_stream(image_input) as image_file:
+        for chunk in iter(lambda: image_file.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def open_input_stream(image_input: str) -> BinaryIO:
+    """
+    Open the bytes behind a file path, base64 string or image handle.
+
+    Args:
+        image_input: File path, base64 encoded string (optionally a data URL)
+            or image handle.
+
+    Returns:
+        Memory-mapped or in-memory binary stream positioned at the start.
+    """
+    if is_image_handle(image_input):
+        return _open_image_file(_image_store().path(image_input))
+    payload = _base64_payload(image_input)
+    if payload is not None:
+        return _decode_base64(payload)
+    return _open_image_file(Path(image_input).resolve())
+
+
+def is_base64_input(image_input: str) -> bool:
+    """Whether an input is a base64 string (or data URL) rather than a path."""
+    return _base64_payload(image_input) is not None
+
+
+def is_image_handle(image_input: str) -> bool:
+    """Whether an input is an image handle rather than a path or base64 string."""
+    return IMAGE_HANDLE_PATTERN.match(image_input) is not None
+
+
+def resolve_image_input(image_input: str) -> str:
+    """
+    Replace an image handle with the path of its file.
+
+    Handles are only known to the process that registered them; resolve them
+    before sending inputs to worker processes.
+    """
+    if is_image_handle(image_input):
+        return str(_image_store().path(image_input))
+    return image_input
+
+
+def image_to_array(image: Image.Image) -> np.ndarray:
+    """
+    Expose a PIL image as a ``uint8`` NumPy array for the OCR engines.
+
+    Grayscale and RGB images are exported without conversion; other modes are
+    converted to RGB first. PIL has no public zero-copy access to its pixel
+    memory, so the array is a copy of the decoded pixels, made in one pass.
+    It is marked read-only, since the engines only read it.
+
+    Args:
+        image: PIL image in any mode.
+
+    Returns:
+        Read-only array of shape ``(height, width)`` or ``(height, width, 3)``.
+    """
+    if image.mode not in ("L", "RGB"):
+        image = image.convert("RGB")
+    array = np.asarray(image)
+    array.setflags(write=False)
+    return array
+
+
+def _image_store() -> "ImageStore":
+    """The current image store, imported late to avoid an import cycle."""
+    from .handles import current_image_store
+
+    return current_image_store()
+
+
+def _base64_payload(image_input: str) -> Optional[str]:
+    """Return the base64 payload of an image input, or None for file paths."""
+    # Check if input is base64 (common base64 image prefixes)
+    if image_input.startswith(BASE64_PREFIXES):
+        if image_input.startswith("data:"):
+            # Remove data:[type];base64, prefix
+            return image_input.split(",")[1]
+        return image_input
+    return None
+
+
+def _open_image_file(path: Path) -> BinaryIO:
+    """Memory-map an image file, falling back to a regular file handle."""
+    with path.open("rb") as image_file:
+        try:
+            mapped = mmap.mmap(image_file.fileno(), 0, access=mmap.ACCESS_READ)
+            return cast(BinaryIO, mapped)
+        except ValueError:
+            # Empty files cannot be mapped; let PIL report them
+            pass
+    return path.open("rb")
+
+
+def _decode_base64(payload: str) -> BinaryIO:
+    """
+    Decode a base64 payload into a single preallocated buffer.
+
+    The decoded size is known from the payload length, so the output is
+    allocated once and filled chunk by chunk instead of materializing the
+    decoded bytes and then copying them into a stream. Payloads with
+    whitespace or missing padding go through ``base64.b64decode``.
+    """
+    length = len(payload)
+    if length == 0 or length % 4:
+        return BytesIO(base64.b64decode(payload))
+
+    size = length // 4 * 3 - payload.count("=", length - 2)
+    buffer = mmap.mmap(-1, size)
+    try:
+        for start in range(0, length, BASE64_CHUNK_CHARS):
+            buffer.write(
+                binascii.a2b_base64(payload[start : start + BASE64_CHUNK_CHARS])
+            )
+    except (binascii.Error, ValueError):
+        buffer.close()
+        return BytesIO(base64.b64decode(payload))
+    if buffer.tell() != size:
+        buffer.close()
+        return BytesIO(base64.b64decode(payload))
+    buffer.seek(0)
+    return cast(BinaryIO, buffer)
+
+
+def _draft(image: Image.Image, target_side: int) -> None:
+    """Ask the decoder for the smallest scale covering ``target_side``."""
+    if image.format != "JPEG":
+        return
+    width, height = image.size
+    scale = target_side / max(width, height)
+    if scale >= 1:
+        return
+    image.draft(image.mode, (math.ceil(width * scale), math.ceil(height * scale)))
@@ -0,0 +1,192 @@
+"""
+Instrumentation of the Reading Text OCR equipment.
+
+Tool calls are LlamaIndex spans, so they nest under the agent and LLM spans
+of any LlamaIndex span handler. Inside a call, every stage (image decoding,
+reader construction, preprocessing, cache lookups, the engines) emits an
+``OCRStageEvent`` with its duration and attributes such as bytes decoded,
+image dimensions or cache hits, through this module's LlamaIndex dispatcher.
+
+Stages are only timed when an event handler is attached to the dispatcher or
+one of its parents, e.g.::
+
+    from llama_index.core.instrumentation import get_dispatcher
+
+    timer = OCRStageTimer()
+    get_dispatcher().add_event_handler(timer)
+    ...
+    print(timer.summary())
+
+Stages running in OCR worker processes are reported to the handlers of those
+processes.
+"""
+
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Any, Iterator, Optional
+
+from llama_index.core.bridge.pydantic import Field, PrivateAttr
+from llama_index.core.instrumentation import get_dispatcher
+from llama_index.core.instrumentation.event_handlers import (
+    BaseEventHandler,
+    NullEventHandler,
+)
+from llama_index.core.instrumentation.events import BaseEvent
+
+dispatcher = get_dispatcher(__name__.rpartition(".")[0])
+
+
+class OCRStageEvent(BaseEvent):
+    """
+    A stage of an OCR tool call finished.
+
+    Attributes:
+        stage: Stage name, e.g. ``"decode"``, ``"easyocr"`` or ``"tesseract"``.
+        duration: Wall-clock seconds spent in the stage.
+        attributes: Stage details, e.g. ``bytes``, ``width`` and ``height``.
+    """
+
+    stage: str
+    duration: float
+    attributes: dict[str, Any] = Field(default_factory=dict)
+
+    @classmethod
+    def class_name(cls) -> str:
+        """Class name."""
+        return "OCRStageEvent"
+
+
+def instrumentation_enabled() -> bool:
+    """Whether any event handler would receive OCR stage events."""
+    current: Optional[Any] = dispatcher
+    while current is not None:
+        if any(
+            not isinstance(handler, NullEventHandler)
+            for handler in current.event_handlers
+        ):
+            return True
+        current = current.parent if current.propagate else None
+    return False
+
+
+@contextmanager
+def ocr_stage(stage: str, **attributes: Any) -> Iterator[dict[str, Any]]:
+    """
+    Time a stage and emit an ``OCRStageEvent`` when it finishes.
+
+    Yields the attributes dict, so the stage can add details found while it
+    runs. When no handler is attached nothing is timed or emitted.
+
+    Args:
+        stage: Stage name.
+        **attributes: Stage details known up front.
+    """
+    if not instrumentation_enabled():
+        yield attributes
+        return
+    start = time.perf_counter()
+    try:
+        yield attributes
+    finally:
+        dispatcher.event(
+            OCRStageEvent(
+                stage=stage,
+                duration=time.perf_counter() - start,
+                attributes=attributes,
+            )
+        )
+
+
+def _stage_totals() -> defaultdict[str, defaultdict[str, float]]:
+    """Empty per-stage totals."""
+    return defaultdict(lambda: defaultdict(float))
+
+
+class OCRStageTimer(BaseEventHandler):
+    """Event handler aggregating OCR stage durations and counters in memory."""
+
+    _totals: defaultdict[str, defaultdict[str, float]] = PrivateAttr(
+        default_factory=_stage_totals
+    )
+    _lock: threading.Lock = PrivateAttr(default_factory=threading.Lock)
+
+    @classmethod
+    def class_name(cls) -> str:
+        """Class name."""
+        return "OCRStageTimer"
+
+    def handle(self, event: BaseEvent, **kwargs: Any) -> None:
+        """Add a stage event to the totals of its stage."""
+        if not isinstance(event, OCRStageEvent):
+            return
+        with self._lock:
+            totals = self._totals[event.stage]
+            totals["count"] += 1
+            totals["seconds"] += event.duration
+            for name, value in event.attributes.items():
+                if isinstance(value, (bool, int, float)):
+                    totals[name] += value
+
+    def summary(self) -> dict[str, dict[str, float]]:
+        """
+        Totals per stage.
+
+        Returns:
+            For every stage, the number of events (``count``), the total
+            ``seconds`` and the sum of each numeric attribute.
+        """
+        with self._lock:
+            return {stage: dict(totals) for stage, totals in self._totals.items()}
+
+    def reset(self) -> None:
+        """Forget the recorded totals."""
+        with self._lock:
+            self._totals.clear()
+
+
+class OpenTelemetryStageHandler(BaseEventHandler):
+    """
+    Event handler exporting OCR stages as OpenTelemetry spans.
+
+    Spans are children of the current OpenTelemetry span, so stages appear
+    inside the traces of instrumented agents. Requires ``opentelemetry-api``
+    and a configured tracer provider.
+    """
+
+    tracer_name: str = "llarmy.equipment.reading_text_ocr"
+    _tracer: Any = PrivateAttr(default=None)
+
+    def __init__(self, **data: Any) -> None:
+        """Initialize the handler, failing early without OpenTelemetry."""
+        super().__init__(**data)
+        try:
+            from opentelemetry import trace
+        except ImportError as e:
+            raise ImportError(
+                "OpenTelemetryStageHandler requires opentelemetry-api: "
+                "pip install opentelemetry-api"
+            ) from e
+        self._tracer = trace.get_tracer(self.tracer_name)
+
+    @classmethod
+    def class_name(cls) -> str:
+        """Class name."""
+        return "OpenTelemetryStageHandler"
+
+    def handle(self, event: BaseEvent, **kwargs: Any) -> None:
+        """Record a stage event as a finished span."""
+        if not isinstance(event, OCRStageEvent):
+            return
+        end = time.time_ns()
+        span = self._tracer.start_span(
+            f"ocr.{event.stage}",
+            start_time=end - int(event.duration * 1e9),
+            attributes={
+                f"ocr.{name}": value
+                for name, value in event.attributes.items()
+                if isinstance(value, (bool, int, float, str))
+            },
+        )
+        span.end(end_time=end)
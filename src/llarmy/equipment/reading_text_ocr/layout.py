@@ -0,0 +1,367 @@
+"""
+Structured OCR results for the Reading Text OCR equipment.
+
+An ``OCRLayout`` holds the words recognized in an image in reading order, with
+their boxes, confidences and the line and block each belongs to. Words are
+stored as columns: NumPy arrays for the numeric fields and a single string
+with offsets for the text, so large pages cost a few arrays instead of
+thousands of dicts. Layouts can be queried by region or text without running
+the engine again.
+"""
+
+from typing import Any, NamedTuple, Optional, Sequence
+
+import numpy as np
+
+
+class LayoutLine(NamedTuple):
+    """A line of text with its bounding box and mean word confidence (0-100)."""
+
+    text: str
+    box: tuple[int, int, int, int]
+    confidence: float
+
+
+class OCRLayout:
+    """
+    Words recognized in an image, in reading order.
+
+    Boxes are ``(left, top, right, bottom)`` pixel coordinates in the original
+    image. Words with the same line id form a line, lines with the same block
+    id form a block (e.g. a paragraph).
+    """
+
+    def __init__(
+        self,
+        words: Sequence[str],
+        boxes: Any,
+        confidences: Any,
+        line_ids: Any,
+        block_ids: Any,
+        width: int,
+        height: int,
+        engine: str = "",
+    ) -> None:
+        """
+        Initialize a layout from word columns.
+
+        Args:
+            words: Word texts, in reading order.
+            boxes: ``(n, 4)`` word boxes.
+            confidences: Word confidences on a 0-100 scale.
+            line_ids: Line id of every word, non-decreasing.
+            block_ids: Block id of every word, non-decreasing.
+            width: Width of the image.
+            height: Height of the image.
+            engine: Engine that produced the words.
+        """
+        self._text = "".join(words)
+        self._offsets = np.cumsum([0, *map(len, words)], dtype=np.int64)
+        self.boxes = np.asarray(boxes, dtype=np.int32).reshape(-1, 4)
+        self.confidences = np.asarray(confidences, dtype=np.float32)
+        self.line_ids = np.asarray(line_ids, dtype=np.int32)
+        self.block_ids = np.asarray(block_ids, dtype=np.int32)
+        self.width = width
+        self.height = height
+        self.engine = engine
+
+    def __len__(self) -> int:
+        return len(self.confidences)
+
+    @property
+    def words(self) -> list[str]:
+        """Word texts, in reading order."""
+        offsets = self._offsets.tolist()
+        return [self._text[start:end] for start, end in zip(offsets, offsets[1:])]
+
+    @property
+    def mean_confidence(self) -> float:
+        """Mean word confidence, 0.0 for an empty layout."""
+        return float(self.confidences.mean()) if len(self) else 0.0
+
+    @property
+    def text(self) -> str:
+        """Full text, with lines on separate lines and blank lines between blocks."""
+        parts: list[str] = []
+        previous_block = None
+        for block, line in zip(self._line_blocks(), self.lines()):
+            if previous_block is not None:
+                parts.append("\n\n" if block != previous_block else "\n")
+            parts.append(line.text)
+            previous_block = block
+        return "".join(parts)
+
+    def lines(self) -> list[LayoutLine]:
+        """Lines in reading order, with their boxes and confidences."""
+        if not len(self):
+            return []
+        words = self.words
+        starts = self._line_starts()
+        ends = [*starts[1:], len(self)]
+        lines = []
+        for start, end in zip(starts, ends):
+            boxes = self.boxes[start:end]
+            box = (
+                int(boxes[:, 0].min()),
+                int(boxes[:, 1].min()),
+                int(boxes[:, 2].max()),
+                int(boxes[:, 3].max()),
+            )
+            lines.append(
+                LayoutLine(
+                    " ".join(words[start:end]),
+                    box,
+                    round(float(self.confidences[start:end].mean()), 1),
+                )
+            )
+        return lines
+
+    def region(
+        self,
+        left: float,
+        top: float,
+        right: float,
+        bottom: float,
+        min_overlap: float = 0.5,
+    ) -> "OCRLayout":
+        """
+        Select the words inside a region.
+
+        Args:
+            left: Left edge of the region in pixels.
+            top: Top edge of the region in pixels.
+            right: Right edge of the region in pixels.
+            bottom: Bottom edge of the region in pixels.
+            min_overlap: Share of a word's box that must lie in the region.
+
+        Returns:
+            Layout with the selected words.
+        """
+        boxes = self.boxes.astype(np.float64)
+        overlap_width = np.clip(
+            np.minimum(boxes[:, 2], right) - np.maximum(boxes[:, 0], left), 0, None
+        )
+        overlap_height = np.clip(
+            np.minimum(boxes[:, 3], bottom) - np.maximum(boxes[:, 1], top), 0, None
+        )
+        areas = np.maximum(
+            (boxes[:, 2] - boxes[:, 0]) * (boxes[:, 3] - boxes[:, 1]), 1.0
+        )
+        return self._select(overlap_width * overlap_height / areas >= min_overlap)
+
+    def search(self, query: str) -> list[LayoutLine]:
+        """Lines containing ``query``, ignoring case."""
+        query = query.lower()
+        return [line for line in self.lines() if query in line.text.lower()]
+
+    def to_dict(self) -> dict[str, Any]:
+        """Serialize the layout to JSON compatible columns."""
+        return {
+            "words": self.words,
+            "boxes": self.boxes.tolist(),
+            "confidences": self.confidences.round(1).tolist(),
+            "line_ids": self.line_ids.tolist(),
+            "block_ids": self.block_ids.tolist(),
+            "width": self.width,
+            "height": self.height,
+            "engine": self.engine,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "OCRLayout":
+        """Restore a layout serialized with ``to_dict``."""
+        return cls(**data)
+
+    @classmethod
+    def from_tesseract_data(
+        cls,
+        data: dict[str, list[Any]],
+        width: int,
+        height: int,
+    ) -> "OCRLayout":
+        """
+        Build a layout from tesseract ``image_to_data`` dict output.
+
+        Tesseract already reports words in reading order; empty words and
+        entries without a confidence (page, block and line rows) are dropped.
+        """
+        keep = [
+            index
+            for index, word in enumerate(data["text"])
+            if word and word.strip() and float(data["conf"][index]) >= 0
+        ]
+        if not keep:
+            return cls.empty(width, height, "tesseract")
+        left, top, box_width, box_height = (
+            np.asarray([data[key][index] for index in keep], dtype=np.int64)
+            for key in ("left", "top", "width", "height")
+        )
+        boxes = np.stack([left, top, left + box_width, top + box_height], axis=1)
+        paragraphs = [
+            (data["block_num"][index], data["par_num"][index]) for index in keep
+        ]
+        lines = [
+            (*paragraph, data["line_num"][index])
+            for index, paragraph in zip(keep, paragraphs)
+        ]
+        return cls(
+            [data["text"][index].strip() for index in keep],
+            boxes,
+            [float(data["conf"][index]) for index in keep],
+            _dense_ids(lines),
+            _dense_ids(paragraphs),
+            width,
+            height,
+            "tesseract",
+        )
+
+    @classmethod
+    def from_easyocr(
+        cls,
+        results: list[Any],
+        width: int,
+        height: int,
+    ) -> "OCRLayout":
+        """
+        Build a layout from EasyOCR ``readtext`` detail output.
+
+        EasyOCR returns text segments in detection order; they are arranged
+        into lines and blocks with ``from_boxes``.
+        """
+        if not results:
+            return cls.empty(width, height, "easyocr")
+        corners = np.asarray([result[0] for result in results], dtype=np.float64)
+        return cls.from_boxes(
+            [str(result[1]) for result in results],
+            np.concatenate([corners.min(axis=1), corners.max(axis=1)], axis=1),
+            [100 * float(result[2]) for result in results],
+            width,
+            height,
+            "easyocr",
+        )
+
+    @classmethod
+    def from_boxes(
+        cls,
+        words: Sequence[str],
+        boxes: Any,
+        confidences: Any,
+        width: int,
+        height: int,
+        engine: str = "",
+    ) -> "OCRLayout":
+        """
+        Build a layout from unordered words and their boxes.
+
+        Words are grouped into lines by their vertical centers, lines into
+        blocks where the gap between lines exceeds the typical line height,
+        and sorted into reading order.
+        """
+        if not len(words):
+            return cls.empty(width, height, engine)
+        boxes = np.asarray(boxes, dtype=np.float64).reshape(-1, 4)
+        confidences = np.asarray(confidences, dtype=np.float64)
+        centers = (boxes[:, 1] + boxes[:, 3]) / 2
+        heights = boxes[:, 3] - boxes[:, 1]
+        line_height = max(float(np.median(heights)), 1.0)
+
+        line_of = np.empty(len(words), dtype=np.int64)
+        line_centers: list[float] = []
+        for index in np.argsort(centers, kind="stable"):
+            if (
+                line_centers
+                and abs(centers[index] - line_centers[-1]) <= line_height / 2
+            ):
+                line_of[index] = len(line_centers) - 1
+            else:
+                line_of[index] = len(line_centers)
+                line_centers.append(float(centers[index]))
+
+        order = np.lexsort((boxes[:, 0], line_of))
+        boxes, line_ids = boxes[order], line_of[order]
+        starts = np.flatnonzero(np.diff(line_ids, prepend=-1))
+        line_tops = np.minimum.reduceat(boxes[:, 1], starts)
+        line_bottoms = np.maximum.reduceat(boxes[:, 3], starts)
+        gaps = line_tops[1:] - line_bottoms[:-1]
+        block_of_line = np.concatenate([[0], np.cumsum(gaps > line_height)])
+        return cls(
+            [words[index] for index in order],
+            boxes.round(),
+            confidences[order],
+            line_ids,
+            block_of_line[line_ids],
+            width,
+            height,
+            engine,
+        )
+
+    @classmethod
+    def empty(cls, width: int, height: int, engine: str = "") -> "OCRLayout":
+        """Layout of an image without text."""
+        return cls([], np.empty((0, 4)), [], [], [], width, height, engine)
+
+    def with_boxes(self, boxes: np.ndarray, width: int, height: int) -> "OCRLayout":
+        """Copy of the layout with new boxes, e.g. mapped to another image."""
+        layout = self._select(np.ones(len(self), dtype=bool))
+        layout.boxes = np.asarray(boxes).round().astype(np.int32).reshape(-1, 4)
+        layout.width = width
+        layout.height = height
+        return layout
+
+    def _select(self, mask: np.ndarray) -> "OCRLayout":
+        """Layout with the words selected by a boolean mask."""
+        words = self.words
+        return OCRLayout(
+            [word for word, keep in zip(words, mask.tolist()) if keep],
+            self.boxes[mask],
+            self.confidences[mask],
+            self.line_ids[mask],
+            self.block_ids[mask],
+            self.width,
+            self.height,
+            self.engine,
+        )
+
+    def _line_starts(self) -> list[int]:
+        """Index of the first word of every line."""
+        if not len(self):
+            return []
+        changes = np.flatnonzero(np.diff(self.line_ids)) + 1
+        return [0, *changes.tolist()]
+
+    def _line_blocks(self) -> list[int]:
+        """Block id of every line."""
+        return self.block_ids[self._line_starts()].tolist()
+
+
+def _dense_ids(keys: list[Any]) -> np.ndarray:
+    """Number consecutive runs of equal keys 0, 1, 2, ..."""
+    ids = np.zeros(len(keys), dtype=np.int32)
+    for index in range(1, len(keys)):
+        ids[index] = ids[index - 1] + (keys[index] != keys[index - 1])
+    return ids
+
+
+def layout_summary(
+    layout: OCRLayout,
+    lines: Optional[list[LayoutLine]] = None,
+) -> str:
+    """
+    Describe layout lines for an agent.
+
+    Boxes are reported as fractions of the image width and height, so they can
+    be passed back to region queries without knowing the image size.
+    """
+    lines = layout.lines() if lines is None else lines
+    if not lines:
+        return "No text found in the image"
+    width, height = max(layout.width, 1), max(layout.height, 1)
+    rows = []
+    for line in lines:
+        left, top, right, bottom = line.box
+        rows.append(
+            f"[{left / width:.3f}, {top / height:.3f}, "
+            f"{right / width:.3f}, {bottom / height:.3f}] "
+            f"({line.confidence:.0f}) {line.text}"
+        )
+    return "\n".join(rows) + "\n"
@@ -0,0 +1,252 @@
+"""
+Offline model management for EasyOCR.
+
+``easyocr.Reader`` downloads missing detector and recognizer weights on first
+use of a language, which stalls or fails on air-gapped workers and puts the
+load on the first request. ``EasyOCRModelManager`` resolves the weights from a
+local directory with downloads disabled, verifies them against a checksum
+manifest, preloads the configured language sets at startup and reports
+readiness. With ``strict`` set, language sets that were not preloaded are
+rejected instead of being cold-loaded on the request path.
+
+Prepare a model directory on a connected machine by running EasyOCR once for
+every language set with ``model_storage_directory`` pointing at it, then write
+its manifest with ``EasyOCRModelManager.write_manifest``.
+"""
+
+import hashlib
+import json
+import threading
+from pathlib import Path
+from typing import Any, Callable, Iterable, Optional, Union
+
+from .executors import OCRBusyError, OCRExecutor, set_ocr_executor
+from .readers import (
+    EasyOCRReaderPool,
+    LangKey,
+    _build_easyocr_reader,
+    normalize_lang_list,
+    set_reader_pool,
+)
+
+MANIFEST_NAME = "manifest.json"
+
+# Extensions of the files EasyOCR loads from its model directory
+MODEL_SUFFIXES = (".pth", ".pt", ".yaml", ".py")
+
+
+class OCRModelUnavailableError(OCRBusyError):
+    """Raised when the models of a language set are not preloaded in strict mode."""
+
+
+def _file_sha256(path: Path) -> str:
+    """SHA-256 hex digest of a file, read in chunks."""
+    digest = hashlib.sha256()
+    with path.open("rb") as model_file:
+        for chunk in iter(lambda: model_file.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class EasyOCRModelManager:
+    """
+    Local EasyOCR weights, verified and preloaded for a set of languages.
+
+    ``start`` verifies the model directory, preloads a reader for every
+    configured language set and installs the readers as the process-wide
+    reader pool; EasyOCR worker processes of the installed executor preload
+    the same readers when they start.
+    """
+
+    def __init__(
+        self,
+        model_dir: Union[str, Path],
+        lang_sets: Iterable[Iterable[str]] = (("en",),),
+        strict: bool = True,
+        verify_checksums: bool = True,
+        **reader_kwargs: Any,
+    ) -> None:
+        """
+        Initialize the model manager.
+
+        Args:
+            model_dir: Directory holding the EasyOCR model files and
+                ``manifest.json``.
+            lang_sets: Language sets to preload, e.g. ``[["en"], ["en", "es"]]``.
+            strict: Reject language sets that are not preloaded with
+                ``OCRModelUnavailableError`` instead of loading them on the
+                request path.
+            verify_checksums: Check the model files against the manifest
+                checksums, not only their presence.
+            **reader_kwargs: Extra ``easyocr.Reader`` arguments, e.g. ``gpu``.
+        """
+        self.model_dir = Path(model_dir)
+        self.lang_sets = list(dict.fromkeys(normalize_lang_list(s) for s in lang_sets))
+        self.strict = strict
+        self.verify_checksums = verify_checksums
+        self.extra_reader_kwargs = reader_kwargs
+        self.reader_kwargs = {
+            "model_storage_directory": str(self.model_dir),
+            "user_network_directory": str(self.model_dir / "user_network"),
+            "download_enabled": False,
+            **reader_kwargs,
+        }
+        self.problems: list[str] = []
+        self.lang_set_status: dict[LangKey, str] = dict.fromkeys(
+            self.lang_sets, "pending"
+        )
+        self._reader_pool: Optional[EasyOCRReaderPool] = None
+        self._lock = threading.Lock()
+
+    @property
+    def reader_pool(self) -> EasyOCRReaderPool:
+        """Pool building readers from the local model directory only."""
+        with self._lock:
+            if self._reader_pool is None:
+                self._reader_pool = EasyOCRReaderPool(
+                    max_readers=max(len(self.lang_sets), 1),
+                    reader_factory=self._build_reader,
+                    **self.reader_kwargs,
+                )
+            return self._reader_pool
+
+    @property
+    def ready(self) -> bool:
+        """Whether the models verified and every language set is loaded."""
+        return not self.problems and all(
+            status == "ready" for status in self.lang_set_status.values()
+        )
+
+    def status(self) -> dict[str, Any]:
+        """Readiness report for health checks."""
+        return {
+            "ready": self.ready,
+            "model_dir": str(self.model_dir),
+            "problems": list(self.problems),
+            "lang_sets": {
+                ",".join(key): status for key, status in self.lang_set_status.items()
+            },
+            "memory": self.reader_pool.usage,
+        }
+
+    def verify(self) -> list[str]:
+        """
+        Check the model directory against its manifest.
+
+        Returns:
+            Problems found: a missing directory or manifest, missing files and,
+            with ``verify_checksums``, files whose checksum does not match.
+        """
+        problems: list[str] = []
+        manifest_path = self.model_dir / MANIFEST_NAME
+        if not self.model_dir.is_dir():
+            problems.append(f"Model directory {self.model_dir} does not exist")
+        elif not manifest_path.is_file():
+            problems.append(f"Model manifest {manifest_path} does not exist")
+        else:
+            manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+            for name, checksum in sorted(manifest.items()):
+                path = self.model_dir / name
+                if not path.is_file():
+                    problems.append(f"Model file {name} is missing")
+                elif self.verify_checksums and _file_sha256(path) != checksum:
+                    problems.append(f"Model file {name} does not match its checksum")
+        self.problems = problems
+        return problems
+
+    def preload(self) -> dict[LangKey, str]:
+        """
+        Load a reader for every configured language set.
+
+        Returns:
+            ``"ready"`` or the load error for every language set.
+        """
+        for key in self.lang_sets:
+            try:
+                self.reader_pool.get(key)
+                self.lang_set_status[key] = "ready"
+            except Exception as e:
+                self.lang_set_status[key] = f"{type(e).__name__}: {e!s}"
+        return dict(self.lang_set_status)
+
+    def start(self, executor: Optional[OCRExecutor] = None) -> bool:
+        """
+        Verify and preload the models and make them the process-wide defaults.
+
+        Call it at startup, before tool specs are created and before the
+        executor starts its worker processes.
+
+        Args:
+            executor: Executor to install as the process-wide executor. Its
+                EasyOCR worker processes are started right away and preload
+                the same readers. Defaults to an ``OCRExecutor`` with default
+                limits.
+
+        Returns:
+            Whether the models are ready, see ``status`` for details.
+        """
+        self.verify()
+        self.preload()
+        set_reader_pool(self.reader_pool)
+        executor = executor if executor is not None else OCRExecutor()
+        executor.worker_initializer, executor.worker_initargs = (
+            self.worker_initializer()
+        )
+        set_ocr_executor(executor)
+        if self.ready:
+            executor.start_workers()
+        return self.ready
+
+    def worker_initializer(self) -> tuple[Callable[..., None], tuple[Any, ...]]:
+        """Picklable initializer and arguments preloading readers in workers."""
+        return _start_worker_models, (
+            str(self.model_dir),
+            [list(key) for key in self.lang_sets],
+            self.strict,
+            self.extra_reader_kwargs,
+        )
+
+    @staticmethod
+    def write_manifest(model_dir: Union[str, Path]) -> dict[str, str]:
+        """
+        Record the checksums of the model files in a directory.
+
+        Args:
+            model_dir: Directory EasyOCR downloaded its models to.
+
+        Returns:
+            Checksum of every model file, by path relative to ``model_dir``.
+        """
+        model_dir = Path(model_dir)
+        manifest = {
+            path.relative_to(model_dir).as_posix(): _file_sha256(path)
+            for path in sorted(model_dir.rglob("*"))
+            if path.is_file() and path.suffix in MODEL_SUFFIXES
+        }
+        (model_dir / MANIFEST_NAME).write_text(
+            json.dumps(manifest, indent=2) + "\n", encoding="utf-8"
+        )
+        return manifest
+
+    def _build_reader(self, lang_key: LangKey, **reader_kwargs: Any) -> Any:
+        """Build a reader from local files, refusing unconfigured languages."""
+        if self.strict and lang_key not in self.lang_set_status:
+            raise OCRModelUnavailableError(
+                f"Language set {','.join(lang_key)} is not preloaded; configured: "
+                + "; ".join(",".join(key) for key in self.lang_sets)
+            )
+        return _build_easyocr_reader(lang_key, **reader_kwargs)
+
+
+def _start_worker_models(
+    model_dir: str,
+    lang_sets: list[list[str]],
+    strict: bool,
+    reader_kwargs: dict[str, Any],
+) -> None:
+    """Preload the readers of a model manager in an OCR worker process."""
+    manager = EasyOCRModelManager(
+        model_dir, lang_sets, strict=strict, verify_checksums=False, **reader_kwargs
+    )
+    manager.preload()
+    set_reader_pool(manager.reader_pool)
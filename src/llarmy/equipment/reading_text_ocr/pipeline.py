@@ -0,0 +1,626 @@
+"""
+Bulk OCR pipeline for offline jobs.
+
+Walks directories or reads manifests lazily, OCRs the images in batches on a
+process pool sized to the machine and streams the results to a JSONL file or
+a directory of Parquet files. Work is checkpointed by the output itself: a
+rerun with the same output skips every input that already has a result, so an
+interrupted job resumes where it stopped.
+
+Each worker reads and decodes the images of its batch itself, on threads, so
+no pixels are sent between processes. A worker decodes a batch before
+recognizing it; with one worker per core, workers decoding and workers
+recognizing keep the machine busy together::
+
+    python -m llarmy.equipment.reading_text_ocr.pipeline scans/ --output ocr.jsonl
+
+Manifests are text files with one path per line, or JSONL files with a
+``path`` field; relative paths are resolved against the manifest's directory.
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import time
+from collections import deque
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    BrokenExecutor,
+    Future,
+    ProcessPoolExecutor,
+    wait,
+)
+from itertools import islice
+from pathlib import Path
+from typing import Any, Iterable, Iterator, Optional, Union
+
+from .cpu import CPUInferenceConfig
+from .executors import OCRBusyError
+from .models import OCRModelUnavailableError
+from .preprocessing import PreprocessingConfig
+from .routing import EASYOCR, TESSERACT, EngineRouter, to_tesseract_lang
+from .tiling import TilingConfig
+from .workers import general_purpose_ocr_batch, printed_material_ocr_batch, routed_ocr
+
+AUTO = "auto"
+
+PIPELINE_ENGINES = (AUTO, EASYOCR, TESSERACT)
+
+IMAGE_EXTENSIONS = frozenset(
+    {".bmp", ".gif", ".jpeg", ".jpg", ".png", ".tif", ".tiff", ".webp"}
+)
+
+MANIFEST_EXTENSIONS = frozenset({".txt", ".jsonl"})
+
+
+def iter_image_inputs(
+    sources: Iterable[Union[str, Path]],
+    extensions: Iterable[str] = IMAGE_EXTENSIONS,
+) -> Iterator[str]:
+    """
+    Lazily list the images behind directories, manifests and image paths.
+
+    Directories are walked recursively in sorted order, one directory at a
+    time, so listing a large tree starts yielding right away.
+
+    Args:
+        sources: Directories, manifest files (``.txt`` or ``.jsonl``) and
+            image files.
+        extensions: File extensions of the images to pick from directories.
+
+    Yields:
+        Image paths.
+    """
+    suffixes = {suffix.lower() for suffix in extensions}
+    for source in sources:
+        path = Path(source)
+        if path.is_dir():
+            yield from _walk_directory(path, suffixes)
+        elif path.suffix.lower() in MANIFEST_EXTENSIONS:
+            yield from _read_manifest(path)
+        else:
+            yield str(path)
+
+
+def _walk_directory(directory: Path, suffixes: set[str]) -> Iterator[str]:
+    """Image files below a directory, depth first in sorted order."""
+    with os.scandir(directory) as scan:
+        entries = sorted(scan, key=lambda entry: entry.name)
+    for entry in entries:
+        if entry.is_dir():
+            yield from _walk_directory(Path(entry.path), suffixes)
+        elif Path(entry.name).suffix.lower() in suffixes:
+            yield entry.path
+
+
+def _read_manifest(manifest: Path) -> Iterator[str]:
+    """Paths listed in a manifest, resolved against its directory."""
+    with manifest.open(encoding="utf-8") as lines:
+        for line in lines:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            path = json.loads(line)["path"] if manifest.suffix == ".jsonl" else line
+            yield str(manifest.parent / path)
+
+
+class JSONLResultWriter:
+    """
+    Results appended to a JSONL file, one object per line.
+
+    A line cut short by an interrupted run is removed when the file is
+    reopened.
+    """
+
+    def __init__(self, path: Union[str, Path]) -> None:
+        """
+        Open the output file, keeping the results of earlier runs.
+
+        Args:
+            path: JSONL file.
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._drop_partial_line()
+        self._file = self.path.open("a", encoding="utf-8")
+
+    def done(self) -> set[str]:
+        """Paths that already have a result."""
+        if not self.path.is_file():
+            return set()
+        with self.path.open(encoding="utf-8") as lines:
+            return {json.loads(line)["path"] for line in lines if line.strip()}
+
+    def write(self, records: list[dict[str, Any]]) -> None:
+        """Append results and flush them to disk."""
+        self._file.writelines(
+            json.dumps(record, ensure_ascii=False) + "\n" for record in records
+        )
+        self._file.flush()
+
+    def close(self) -> None:
+        """Close the output file."""
+        self._file.close()
+
+    def _drop_partial_line(self) -> None:
+        """Cut the file after its last complete line."""
+        if not self.path.is_file():
+            return
+        with self.path.open("rb+") as output:
+            end = output.seek(0, os.SEEK_END)
+            position = end
+            while position > 0:
+                chunk_start = max(position - (1 << 16), 0)
+                output.seek(chunk_start)
+                newline = output.read(position - chunk_start).rfind(b"\n")
+                if newline >= 0:
+                    position = chunk_start + newline + 1
+                    break
+                position = chunk_start
+            if position < end:
+                output.truncate(position)
+
+
+class ParquetResultWriter:
+    """
+    Results written as a directory of Parquet files.
+
+    Parquet files cannot be appended to, so every ``rows_per_file`` results
+    are written to a new file, under a temporary name renamed once complete.
+    Results still buffered when a run is interrupted are OCRed again on the
+    next run. Requires ``pyarrow``.
+    """
+
+    def __init__(self, directory: Union[str, Path], rows_per_file: int = 10_000):
+        """
+        Open the output directory, keeping the results of earlier runs.
+
+        Args:
+            directory: Directory of ``part-*.parquet`` files.
+            rows_per_file: Results per Parquet file.
+        """
+        try:
+            import pyarrow.parquet
+        except ImportError as e:
+            raise ImportError(
+                "Parquet output requires pyarrow: pip install pyarrow"
+            ) from e
+        self._parquet = pyarrow.parquet
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.rows_per_file = rows_per_file
+        self._rows: list[dict[str, Any]] = []
+        self._done = self._read_done()
+
+    def done(self) -> set[str]:
+        """Paths that already have a result."""
+        return set(self._done)
+
+    def write(self, records: list[dict[str, Any]]) -> None:
+        """Buffer results, writing a file whenever enough are buffered."""
+        self._rows.extend(records)
+        while len(self._rows) >= self.rows_per_file:
+            self._flush(self._rows[: self.rows_per_file])
+            del self._rows[: self.rows_per_file]
+
+    def close(self) -> None:
+        """Write the buffered results."""
+        if self._rows:
+            self._flush(self._rows)
+            self._rows = []
+
+    def _flush(self, rows: list[dict[str, Any]]) -> None:
+        """Write rows to the next part file, atomically."""
+        import pyarrow
+
+        index = len(list(self.directory.glob("part-*.parquet")))
+        path = self.directory / f"part-{index:06d}.parquet"
+        partial = path.with_suffix(".parquet.tmp")
+        schema = pyarrow.schema(
+            [(name, pyarrow.string()) for name in ("path", "text", "engine", "error")]
+        )
+        self._parquet.write_table(pyarrow.Table.from_pylist(rows, schema), partial)
+        os.replace(partial, path)
+
+    def _read_done(self) -> set[str]:
+        """Paths in the part files; files of an interrupted write are removed."""
+        for partial in self.directory.glob("part-*.parquet.tmp"):
+            partial.unlink()
+        done: set[str] = set()
+        for path in sorted(self.directory.glob("part-*.parquet")):
+            table = self._parquet.read_table(path, columns=["path"])
+            done.update(table.column("path").to_pylist())
+        return done
+
+
+ResultWriter = Union[JSONLResultWriter, ParquetResultWriter]
+
+BatchFuture = Future[tuple[list[dict[str, Any]], list[str]]]
+
+
+def _is_transient(error: Exception) -> bool:
+    """Whether an error may not happen again, e.g. a busy engine."""
+    return isinstance(error, OCRBusyError) and not isinstance(
+        error, OCRModelUnavailableError
+    )
+
+
+def _ocr_batch(
+    image_inputs: list[str],
+    engine: str,
+    lang_list: list[str],
+    cpu_inference: Optional[CPUInferenceConfig],
+    max_decode_workers: Optional[int],
+    target_side: Optional[int],
+    preprocessing: Optional[PreprocessingConfig],
+    tiling: Optional[TilingConfig],
+) -> tuple[list[dict[str, Any]], list[str]]:
+    """
+    OCR one batch of images. Runs in the pipeline worker processes.
+
+    Returns:
+        Results to record and the inputs that failed with a transient error,
+        which get no result.
+    """
+    records: list[dict[str, Any]] = []
+    retries: list[str] = []
+    if engine == AUTO:
+        router = EngineRouter()
+        for image_input in image_inputs:
+            try:
+                result = routed_ocr(
+                    image_input,
+                    lang_list,
+                    router,
+                    cpu_inference,
+                    target_side,
+                    None,
+                    preprocessing,
+                )
+                records.append(
+                    {
+                        "path": image_input,
+                        "text": result["text"],
+                        "engine": result["engine"],
+                        "error": None,
+                    }
+                )
+            except Exception as e:
+                if _is_transient(e):
+                    retries.append(image_input)
+                else:
+                    records.append(_error_record(image_input, engine, e))
+        return records, retries
+
+    results: list[Union[str, Exception]]
+    try:
+        if engine == EASYOCR:
+            results = general_purpose_ocr_batch(
+                image_inputs,
+                lang_list,
+                cpu_inference,
+                max_decode_workers,
+                target_side,
+                preprocessing,
+                tiling,
+            )
+        else:
+            results = printed_material_ocr_batch(
+                image_inputs,
+                to_tesseract_lang(lang_list),
+                max_decode_workers,
+                target_side,
+                None,
+                preprocessing,
+            )
+    except Exception as e:
+        # Failures of the whole batch, e.g. a reader that cannot be loaded
+        results = [e] * len(image_inputs)
+    for image_input, text in zip(image_inputs, results):
+        if not isinstance(text, Exception):
+            records.append(
+                {"path": image_input, "text": text, "engine": engine, "error": None}
+            )
+        elif _is_transient(text):
+            retries.append(image_input)
+        else:
+            records.append(_error_record(image_input, engine, text))
+    return records, retries
+
+
+def _error_record(image_input: str, engine: str, error: Exception) -> dict[str, Any]:
+    """Result of an image that could not be OCRed."""
+    return {
+        "path": image_input,
+        "text": None,
+        "engine": engine,
+        "error": f"{type(error).__name__}: {error!s}",
+    }
+
+
+class OCRPipeline:
+    """
+    OCR many images on a process pool, streaming results to disk.
+
+    Results are written as their batches finish, so their order differs from
+    the input order. Images that fail are recorded with an ``error`` and are
+    not retried by later runs. Images failing with a transient error (a busy
+    engine or a full memory budget) and batches whose worker died are retried
+    up to ``max_retries`` times, on a new process pool if it broke, and then
+    left without a result, so the next run OCRs them again.
+    """
+
+    def __init__(
+        self,
+        engine: str = EASYOCR,
+        lang_list: Optional[list[str]] = None,
+        workers: Optional[int] = None,
+        batch_size: int = 16,
+        max_pending_batches: Optional[int] = None,
+        max_decode_workers: int = 4,
+        cpu_inference: Optional[CPUInferenceConfig] = None,
+        target_image_side: Optional[int] = None,
+        preprocessing: Optional[PreprocessingConfig] = None,
+        tiling: Optional[TilingConfig] = None,
+        max_retries: int = 2,
+    ) -> None:
+        """
+        Initialize the pipeline.
+
+        Args:
+            engine: ``"easyocr"``, ``"tesseract"`` or ``"auto"`` to route every
+                image like the extract_text tool.
+            lang_list: Language codes (ISO 639). Defaults to English.
+            workers: Worker processes. Defaults to the number of cores.
+            batch_size: Images per worker call.
+            max_pending_batches: Batches submitted ahead of the finished ones.
+                Defaults to twice the number of workers.
+            max_decode_workers: Threads decoding a batch in each worker.
+            cpu_inference: CPU backend and thread count of EasyOCR in the
+                workers. Defaults to one intra-op thread per worker.
+            target_image_side: Longest image side the engines need.
+            preprocessing: Preprocessing applied to every image.
+            tiling: Tiling of very large images, for EasyOCR.
+            max_retries: Retries of images failing with a transient error.
+        """
+        if engine not in PIPELINE_ENGINES:
+            raise ValueError(f"engine must be one of {', '.join(PIPELINE_ENGINES)}")
+        if batch_size < 1:
+            raise ValueError("batch_size must be at least 1")
+        self.engine = engine
+        self.lang_list = list(lang_list or ["en"])
+        self.workers = workers or os.cpu_count() or 1
+        self.batch_size = batch_size
+        self.max_pending_batches = max_pending_batches or 2 * self.workers
+        self.max_decode_workers = max_decode_workers
+        # Every worker runs its own engine; more threads would oversubscribe
+        self.cpu_inference = (
+            cpu_inference
+            if cpu_inference is not None
+            else CPUInferenceConfig(num_threads=1)
+        )
+        self.target_image_side = target_image_side
+        self.preprocessing = preprocessing
+        self.tiling = tiling
+        self.max_retries = max_retries
+
+    def _start_pool(self) -> ProcessPoolExecutor:
+        """Start the worker processes."""
+        # torch is not fork-safe once its thread pools have started
+        return ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+
+    def run(
+        self,
+        image_inputs: Iterable[str],
+        writer: ResultWriter,
+        progress_every: Optional[int] = None,
+    ) -> dict[str, Any]:
+        """
+        OCR every input that has no result in the writer's output yet.
+
+        Args:
+            image_inputs: Image paths, e.g. from ``iter_image_inputs``.
+            writer: Output the results are streamed to; closed when done.
+            progress_every: Print progress every this many images.
+
+        Returns:
+            Counts of the ``processed``, ``skipped``, failed (``errors``) and
+            ``unfinished`` images, the latter still failing with a transient
+            error after their retries, the elapsed ``seconds`` and
+            ``images_per_s``.
+        """
+        done = writer.done()
+        stats: dict[str, Any] = {
+            "processed": 0,
+            "skipped": 0,
+            "errors": 0,
+            "unfinished": 0,
+        }
+        start = time.perf_counter()
+
+        def pending_inputs() -> Iterator[str]:
+            for image_input in image_inputs:
+                if image_input in done:
+                    stats["skipped"] += 1
+                else:
+                    yield image_input
+
+        def requeue(image_inputs: list[str], attempt: int) -> None:
+            if image_inputs and attempt < self.max_retries:
+                retries.append((image_inputs, attempt + 1))
+            else:
+                stats["unfinished"] += len(image_inputs)
+
+        def collect(finished: set[BatchFuture]) -> bool:
+            """Record finished batches, returning whether the pool broke."""
+            broken = False
+            for future in finished:
+                batch, attempt = pending.pop(future)
+                try:
+                    records, transient = future.result()
+                except Exception as e:
+                    # A worker died or the batch could not be sent to it; its
+                    # images may never have run, so they are retried
+                    broken = broken or isinstance(e, BrokenExecutor)
+                    records, transient = [], batch
+                requeue(transient, attempt)
+                writer.write(records)
+                before = stats["processed"]
+                stats["processed"] += len(records)
+                stats["errors"] += sum(
+                    record["error"] is not None for record in records
+                )
+                if progress_every and (
+                    stats["processed"] // progress_every != before // progress_every
+                ):
+                    elapsed = time.perf_counter() - start
+                    print(
+                        f"{stats['processed']} images "
+                        f"({stats['processed'] / elapsed:.1f} img/s), "
+                        f"{stats['errors']} errors, {stats['skipped']} skipped"
+                    )
+            return broken
+
+        def restart(pool: ProcessPoolExecutor) -> ProcessPoolExecutor:
+            """Replace a broken pool once its remaining batches have failed."""
+            finished, _ = wait(pending)
+            collect(finished)
+            pool.shutdown()
+            return self._start_pool()
+
+        def next_batch() -> Optional[tuple[list[str], int]]:
+            if retries:
+                return retries.popleft()
+            batch = list(islice(inputs, self.batch_size))
+            return (batch, 0) if batch else None
+
+        inputs = pending_inputs()
+        # Submitted batches with their retry attempt, and batches to retry
+        pending: dict[BatchFuture, tuple[list[str], int]] = {}
+        retries: deque[tuple[list[str], int]] = deque()
+        pool = self._start_pool()
+        try:
+            while True:
+                submission = (
+                    next_batch() if len(pending) < self.max_pending_batches else None
+                )
+                if submission is not None:
+                    batch, attempt = submission
+                    try:
+                        future = pool.submit(
+                            _ocr_batch,
+                            batch,
+                            self.engine,
+                            self.lang_list,
+                            self.cpu_inference,
+                            self.max_decode_workers,
+                            self.target_image_side,
+                            self.preprocessing,
+                            self.tiling,
+                        )
+                    except BrokenExecutor:
+                        requeue(batch, attempt)
+                        pool = restart(pool)
+                        continue
+                    pending[future] = submission
+                elif pending:
+                    # Finished batches may queue retries for the next turn
+                    finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    if collect(finished):
+                        pool = restart(pool)
+                else:
+                    break
+        finally:
+            pool.shutdown()
+            writer.close()
+
+        stats["seconds"] = time.perf_counter() - start
+        stats["images_per_s"] = (
+            stats["processed"] / stats["seconds"] if stats["seconds"] else 0.0
+        )
+        return stats
+
+
+def open_result_writer(
+    output: Union[str, Path], output_format: Optional[str] = None
+) -> ResultWriter:
+    """
+    Open the result writer for an output path.
+
+    Args:
+        output: JSONL file, or directory of Parquet files.
+        output_format: ``"jsonl"`` or ``"parquet"``. Defaults to JSONL for
+            ``.jsonl`` paths and Parquet otherwise.
+    """
+    if output_format is None:
+        output_format = "jsonl" if Path(output).suffix == ".jsonl" else "parquet"
+    if output_format == "jsonl":
+        return JSONLResultWriter(output)
+    if output_format == "parquet":
+        return ParquetResultWriter(output)
+    raise ValueError(f"Unknown output format: {output_format}")
+
+
+def main() -> None:
+    """Run the bulk OCR pipeline."""
+    parser = argparse.ArgumentParser(
+        description="OCR directories or manifests of images into JSONL or Parquet."
+    )
+    parser.add_argument(
+        "sources", nargs="+", help="Directories, manifests and image files"
+    )
+    parser.add_argument(
+        "--output",
+        required=True,
+        help="JSONL file or Parquet directory; existing results are skipped",
+    )
+    parser.add_argument("--format", choices=("jsonl", "parquet"))
+    parser.add_argument("--engine", choices=PIPELINE_ENGINES, default=EASYOCR)
+    parser.add_argument(
+        "--lang", default="en", help="Comma separated languages, e.g. en,es"
+    )
+    parser.add_argument("--workers", type=int, help="Default: number of cores")
+    parser.add_argument("--batch-size", type=int, default=16)
+    parser.add_argument(
+        "--cpu-backend", choices=("quantized", "onnx"), default="quantized"
+    )
+    parser.add_argument(
+        "--threads", type=int, default=1, help="EasyOCR threads per worker"
+    )
+    parser.add_argument("--target-image-side", type=int)
+    parser.add_argument("--preprocessing", action="store_true")
+    parser.add_argument("--progress-every", type=int, default=1000)
+    args = parser.parse_args()
+
+    pipeline = OCRPipeline(
+        engine=args.engine,
+        lang_list=args.lang.split(","),
+        workers=args.workers,
+        batch_size=args.batch_size,
+        cpu_inference=CPUInferenceConfig(
+            backend=args.cpu_backend, num_threads=args.threads
+        ),
+        target_image_side=args.target_image_side,
+        preprocessing=PreprocessingConfig() if args.preprocessing else None,
+    )
+    print(f"OCR pipeline with {pipeline.workers} workers...")
+    stats = pipeline.run(
+        iter_image_inputs(args.sources),
+        open_result_writer(args.output, args.format),
+        progress_every=args.progress_every,
+    )
+    print(
+        f"{stats['processed']} images in {stats['seconds']:.1f} s "
+        f"({stats['images_per_s']:.1f} img/s), {stats['errors']} errors, "
+        f"{stats['skipped']} already done"
+    )
+    if stats["unfinished"]:
+        print(f"{stats['unfinished']} images left for the next run")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,288 @@
+"""
+Image preprocessing for the Reading Text OCR equipment.
+
+Both engines spend most of their time proportional to pixel count, while text
+only needs a few dozen pixels of height to be read reliably. The stages here
+crop the image to the region that holds ink, scale it so text lines have a
+target height, and optionally convert to grayscale, deskew and binarize. Image
+analysis runs on a reduced copy with vectorized NumPy operations, so
+preprocessing costs a fraction of the OCR time it saves.
+"""
+
+from dataclasses import dataclass
+from typing import Optional, Union
+
+import numpy as np
+from PIL import Image
+
+
+@dataclass(frozen=True)
+class PreprocessingConfig:
+    """
+    Preprocessing applied to images before OCR.
+
+    Attributes:
+        grayscale: Convert to single channel grayscale.
+        target_text_height: Height in pixels text lines are scaled to. Images
+            are only ever scaled down. ``None`` disables text-height scaling.
+        max_side: Longest side of the preprocessed image. ``None`` keeps the
+            size chosen by ``target_text_height``.
+        crop_to_text: Crop to the bounding box of the ink, plus ``crop_margin``.
+        crop_margin: Margin around the cropped text, as a fraction of the
+            longest image side.
+        deskew: Straighten text rotated by up to ``max_skew_angle`` degrees.
+        max_skew_angle: Largest skew angle searched when deskewing.
+        binarize: Threshold to black and white with Otsu's method. Helps
+            tesseract on uneven scans; EasyOCR usually does better without it.
+        analysis_side: Longest side of the reduced copy used for analysis.
+    """
+
+    grayscale: bool = True
+    target_text_height: Optional[int] = 48
+    max_side: Optional[int] = 2560
+    crop_to_text: bool = True
+    crop_margin: float = 0.02
+    deskew: bool = False
+    max_skew_angle: float = 10.0
+    binarize: bool = False
+    analysis_side: int = 1024
+
+
+@dataclass(frozen=True)
+class PreprocessingTransform:
+    """
+    Geometry of a preprocessed image relative to the original.
+
+    Attributes:
+        offset: Top left corner of the crop in the original image.
+        scale: Horizontal and vertical scale applied after cropping.
+        angle: Counter-clockwise rotation applied after scaling, in degrees.
+        rotated_from: Size of the image before the rotation.
+        size: Size of the preprocessed image.
+    """
+
+    offset: tuple[int, int] = (0, 0)
+    scale: tuple[float, float] = (1.0, 1.0)
+    angle: float = 0.0
+    rotated_from: tuple[int, int] = (0, 0)
+    size: tuple[int, int] = (0, 0)
+
+    def to_original(self, boxes: np.ndarray) -> np.ndarray:
+        """
+        Map boxes in the preprocessed image back to the original image.
+
+        Args:
+            boxes: ``(n, 4)`` array of ``(left, top, right, bottom)`` boxes.
+
+        Returns:
+            ``(n, 4)`` float array of boxes in original image coordinates.
+            Rotated boxes are replaced by their axis-aligned bounding box.
+        """
+        boxes = np.asarray(boxes, dtype=np.float64).reshape(-1, 4)
+        if self.angle:
+            # Corners of every box, undoing the rotation about the image center
+            xs = boxes[:, [0, 2, 2, 0]] - self.size[0] / 2
+            ys = boxes[:, [1, 1, 3, 3]] - self.size[1] / 2
+            theta = np.radians(self.angle)
+            cos, sin = np.cos(theta), np.sin(theta)
+            xs, ys = (
+                xs * cos - ys * sin + self.rotated_from[0] / 2,
+                xs * sin + ys * cos + self.rotated_from[1] / 2,
+            )
+            boxes = np.stack(
+                [xs.min(axis=1), ys.min(axis=1), xs.max(axis=1), ys.max(axis=1)],
+                axis=1,
+            )
+        scale = np.array(self.scale * 2)
+        offset = np.array(self.offset * 2, dtype=np.float64)
+        return boxes / scale + offset
+
+
+def preprocess_image(image: Image.Image, config: PreprocessingConfig) -> Image.Image:
+    """
+    Run the configured preprocessing stages on an image.
+
+    Args:
+        image: Loaded image.
+        config: Stages to run.
+
+    Returns:
+        Preprocessed image. The input image is not modified.
+    """
+    return preprocess_image_with_transform(image, config)[0]
+
+
+def preprocess_image_with_transform(
+    image: Image.Image,
+    config: PreprocessingConfig,
+) -> tuple[Image.Image, PreprocessingTransform]:
+    """
+    Run the configured preprocessing stages and report the geometry change.
+
+    Returns:
+        Preprocessed image and the transform mapping it to the original, used
+        to report text positions in original image coordinates.
+    """
+    gray = image if image.mode == "L" else image.convert("L")
+    if config.grayscale:
+        image = gray
+    elif image.mode not in ("L", "RGB"):
+        image = image.convert("RGB")
+
+    factor = max(1, max(gray.size) // config.analysis_side)
+    small = gray.reduce(factor) if factor > 1 else gray
+    pixels = np.asarray(small)
+    threshold = otsu_threshold(pixels)
+    ink = ink_mask(pixels, threshold)
+
+    offset = (0, 0)
+    if config.crop_to_text:
+        box = text_bounding_box(ink, config.crop_margin)
+        if box is not None:
+            left, upper, right, lower = (value * factor for value in box)
+            crop = (left, upper, min(right, image.width), min(lower, image.height))
+            image = image.crop(crop)
+            offset = (left, upper)
+            ink = ink[box[1] : box[3], box[0] : box[2]]
+
+    angle = estimate_skew_angle(ink, config.max_skew_angle) if config.deskew else 0.0
+    if angle:
+        # Measure line heights on straightened text; rotated lines overlap rows
+        ink = np.asarray(
+            Image.fromarray(ink.view(np.uint8) * 255).rotate(
+                angle, Image.Resampling.NEAREST, expand=True
+            )
+        ).astype(bool)
+
+    scale = 1.0
+    if config.target_text_height is not None:
+        text_height = estimate_text_height(ink)
+        if text_height is not None:
+            scale = min(scale, config.target_text_height / (text_height * factor))
+    if config.max_side is not None:
+        scale = min(scale, config.max_side / max(image.size))
+    scales = (1.0, 1.0)
+    if scale < 1.0:
+        size = (max(1, round(image.width * scale)), max(1, round(image.height * scale)))
+        scales = (size[0] / image.width, size[1] / image.height)
+        image = image.resize(size, Image.Resampling.LANCZOS)
+    rotated_from = image.size
+
+    if angle:
+        # Rotate after downscaling, where it is cheapest
+        background = int(np.median(pixels))
+        fill: Union[int, tuple[int, ...]] = (
+            background if image.mode == "L" else (background,) * 3
+        )
+        image = image.rotate(
+            angle, Image.Resampling.BICUBIC, expand=True, fillcolor=fill
+        )
+
+    if config.binarize:
+        gray = image if image.mode == "L" else image.convert("L")
+        level = otsu_threshold(np.asarray(gray))
+        image = gray.point(lambda value: 255 if value > level else 0)
+
+    transform = PreprocessingTransform(
+        offset=offset,
+        scale=scales,
+        angle=angle,
+        rotated_from=rotated_from,
+        size=image.size,
+    )
+    return image, transform
+
+
+def otsu_threshold(pixels: np.ndarray) -> int:
+    """
+    Compute the Otsu threshold of 8-bit grayscale pixels.
+
+    Returns:
+        Gray level maximizing the between-class variance. Pixels above it
+        belong to the light class.
+    """
+    histogram = np.bincount(pixels.ravel(), minlength=256).astype(np.float64)
+    probabilities = histogram / histogram.sum()
+    weight = np.cumsum(probabilities)
+    mean = np.cumsum(probabilities * np.arange(256))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        between = (mean[-1] * weight - mean) ** 2 / (weight * (1.0 - weight))
+    return int(np.nanargmax(between)) if np.isfinite(between).any() else 127
+
+
+def ink_mask(pixels: np.ndarray, threshold: int) -> np.ndarray:
+    """
+    Mark ink pixels, taking the minority side of the threshold as ink.
+
+    Handles both dark text on a light background and light text on a dark one.
+    """
+    dark = pixels <= threshold
+    return dark if dark.mean() <= 0.5 else ~dark
+
+
+def text_bounding_box(
+    ink: np.ndarray,
+    margin: float = 0.0,
+) -> Optional[tuple[int, int, int, int]]:
+    """
+    Bounding box of the ink, ignoring isolated noise rows and columns.
+
+    Returns:
+        ``(left, upper, right, lower)`` in mask coordinates, or None when the
+        mask holds no ink.
+    """
+    rows = np.flatnonzero(ink.mean(axis=1) > 0.002)
+    columns = np.flatnonzero(ink.mean(axis=0) > 0.002)
+    if not len(rows) or not len(columns):
+        return None
+    pad = int(round(margin * max(ink.shape)))
+    height, width = ink.shape
+    return (
+        max(0, int(columns[0]) - pad),
+        max(0, int(rows[0]) - pad),
+        min(width, int(columns[-1]) + 1 + pad),
+        min(height, int(rows[-1]) + 1 + pad),
+    )
+
+
+def estimate_text_height(ink: np.ndarray, min_lines: int = 2) -> Optional[float]:
+    """
+    Estimate the height of text lines from the runs of rows containing ink.
+
+    Returns:
+        Median line height in mask pixels, or None when fewer than
+        ``min_lines`` lines are found (e.g. photos without line structure).
+    """
+    row_ink = ink.mean(axis=1) > 0.01
+    edges = np.flatnonzero(np.diff(np.concatenate(([0], row_ink.view(np.int8), [0]))))
+    heights = edges[1::2] - edges[::2]
+    heights = heights[heights > 1]
+    if len(heights) < min_lines:
+        return None
+    return float(np.median(heights))
+
+
+def estimate_skew_angle(
+    ink: np.ndarray,
+    max_angle: float = 10.0,
+    step: float = 0.5,
+) -> float:
+    """
+    Estimate the rotation that makes text lines horizontal.
+
+    Rotated copies of the ink mask are compared by the variance of their row
+    sums, which peaks when text lines line up with the rows.
+
+    Returns:
+        Counter-clockwise rotation in degrees, 0.0 when no better angle is found.
+    """
+    if not ink.any():
+        return 0.0
+    mask = Image.fromarray(ink.view(np.uint8) * 255)
+    best_angle, best_score = 0.0, -1.0
+    for angle in np.arange(-max_angle, max_angle + step / 2, step):
+        rotated = np.asarray(mask.rotate(float(angle), Image.Resampling.NEAREST))
+        score = float(rotated.sum(axis=1, dtype=np.float64).var())
+        if score > best_score:
+            best_angle, best_score = float(angle), score
+    return best_angle
@@ -0,0 +1,418 @@
+"""
+Process-wide registry of EasyOCR readers keyed by language set.
+
+Building an ``easyocr.Reader`` loads the detection and recognition weights from
+disk, which is far more expensive than running OCR on a single image. Readers
+are therefore kept in an LRU pool keyed by the normalized language set so every
+tool call with the same languages reuses the already loaded models.
+
+With a memory budget, the pool also controls admission: a reader for a new
+language set is only built once the estimated footprint of the loaded readers,
+the readers being built and the new one fits the budget. Idle readers are
+evicted to make room; readers leased by running OCR calls are not, so calls
+wait for them to be returned and fail with ``OCRMemoryBudgetError`` after
+``admission_timeout``. Bursts of requests with many language combinations then
+queue instead of loading every model at once.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Callable, Iterable, Iterator, Optional
+
+from .executors import OCRBusyError
+from .instrumentation import ocr_stage
+
+LangKey = tuple[str, ...]
+
+DEFAULT_LANGS: LangKey = ("en",)
+
+# Footprint assumed for language sets that have not been loaded yet: the CRAFT
+# detector and one recognition model, with headroom for PyTorch's allocations.
+DEFAULT_READER_BYTES = 256 * 2**20
+
+
+class OCRMemoryBudgetError(OCRBusyError):
+    """Raised when a reader cannot be loaded within the pool's memory budget."""
+
+
+def normalize_lang_list(lang_list: Optional[Iterable[str]]) -> LangKey:
+    """
+    Normalize a language list into a hashable pool key.
+
+    Args:
+        lang_list: Language codes (ISO 639), in any order and possibly repeated.
+
+    Returns:
+        Sorted, deduplicated tuple of language codes. Defaults to English.
+    """
+    langs = sorted({lang.strip() for lang in lang_list or () if lang.strip()})
+    return tuple(langs) or DEFAULT_LANGS
+
+
+def _build_easyocr_reader(lang_key: LangKey, **reader_kwargs: Any) -> Any:
+    """Construct an EasyOCR reader for the given language set."""
+    import easyocr
+
+    return easyocr.Reader(list(lang_key), **reader_kwargs)
+
+
+def estimate_reader_memory(reader: Any) -> int:
+    """
+    Estimate the memory held by an EasyOCR reader.
+
+    Args:
+        reader: EasyOCR reader (or any object exposing torch modules as
+            ``detector`` and ``recognizer`` attributes).
+
+    Returns:
+        Bytes used by the parameters and buffers of the reader models. Models
+        that are not torch modules, e.g. an ``ONNXDetector``, count their
+        ``memory_bytes``.
+    """
+    total = 0
+    for attr in ("detector", "recognizer"):
+        model = getattr(reader, attr, None)
+        memory_bytes = getattr(model, "memory_bytes", None)
+        if memory_bytes is not None:
+            total += memory_bytes
+            continue
+        for tensors in ("parameters", "buffers"):
+            iterate = getattr(model, tensors, None)
+            if iterate is None:
+                continue
+            total += sum(t.numel() * t.element_size() for t in iterate())
+    return total
+
+
+class EasyOCRReaderPool:
+    """
+    LRU pool of EasyOCR readers keyed by normalized language set.
+
+    Readers are built lazily on first use (or eagerly via ``warmup``) and the
+    least recently used idle reader is evicted once ``max_readers`` or
+    ``max_memory_bytes`` is exceeded. The pool is thread-safe; concurrent
+    requests for a language set that is still loading wait for the single
+    build instead of loading the weights twice.
+
+    Use ``lease`` around OCR calls so the reader is not evicted, and its
+    memory counted as free, while it is in use.
+    """
+
+    def __init__(
+        self,
+        max_readers: int = 4,
+        max_memory_bytes: Optional[int] = None,
+        reader_factory: Optional[Callable[..., Any]] = None,
+        memory_estimator: Callable[[Any], int] = estimate_reader_memory,
+        admission_timeout: Optional[float] = 30.0,
+        default_reader_bytes: int = DEFAULT_READER_BYTES,
+        **reader_kwargs: Any,
+    ) -> None:
+        """
+        Initialize the reader pool.
+
+        Args:
+            max_readers: Maximum number of readers kept loaded at once.
+            max_memory_bytes: Optional budget for the estimated memory of all
+                loaded readers and readers being built. A reader is always
+                admitted when no other reader is loaded.
+            reader_factory: Callable building a reader from a language key and
+                ``reader_kwargs``. Defaults to ``easyocr.Reader``.
+            memory_estimator: Callable returning the footprint of a reader.
+            admission_timeout: Seconds a new language set waits for leased
+                readers to be returned when it does not fit the budget, before
+                failing with ``OCRMemoryBudgetError``. ``None`` waits
+                indefinitely, 0 rejects right away.
+            default_reader_bytes: Footprint assumed for a language set before
+                it is loaded for the first time; afterwards its measured
+                footprint is used.
+            **reader_kwargs: Extra keyword arguments passed to every reader
+                (e.g. ``gpu``, ``model_storage_directory``).
+        """
+        if max_readers < 1:
+            raise ValueError("max_readers must be at least 1")
+        self.max_readers = max_readers
+        self.max_memory_bytes = max_memory_bytes
+        self.reader_factory = reader_factory or _build_easyocr_reader
+        self.memory_estimator = memory_estimator
+        self.admission_timeout = admission_timeout
+        self.default_reader_bytes = default_reader_bytes
+        self.reader_kwargs = reader_kwargs
+        self._readers: OrderedDict[LangKey, tuple[Any, int]] = OrderedDict()
+        self._building: dict[LangKey, threading.Lock] = {}
+        # Measured footprint of every language set loaded so far
+        self._sizes: dict[LangKey, int] = {}
+        # Estimated footprint of the readers being built
+        self._reserved: dict[LangKey, int] = {}
+        self._leases: dict[LangKey, int] = {}
+        self._lock = threading.Lock()
+        self._returned = threading.Condition(self._lock)
+        self.loads = 0
+        self.evictions = 0
+        self.admission_waits = 0
+        self.rejections = 0
+
+    def get(self, lang_list: Optional[Iterable[str]]) -> Any:
+        """
+        Return the reader for a language set, building it if needed.
+
+        Args:
+            lang_list: Language codes (ISO 639) for the reader.
+
+        Returns:
+            EasyOCR reader for the normalized language set.
+
+        Raises:
+            OCRMemoryBudgetError: If the reader has to be built and does not
+                fit the memory budget within ``admission_timeout``.
+        """
+        return self._acquire(normalize_lang_list(lang_list), lease=False)
+
+    @contextmanager
+    def lease(self, lang_list: Optional[Iterable[str]]) -> Iterator[Any]:
+        """
+        Borrow the reader for a language set while running OCR with it.
+
+        Leased readers are not evicted, so their memory is not handed to other
+        language sets while they are in use.
+
+        Args:
+            lang_list: Language codes (ISO 639) for the reader.
+
+        Yields:
+            EasyOCR reader for the normalized language set.
+
+        Raises:
+            OCRMemoryBudgetError: See ``get``.
+        """
+        key = normalize_lang_list(lang_list)
+        reader = self._acquire(key, lease=True)
+        try:
+            yield reader
+        finally:
+            with self._lock:
+                self._leases[key] -= 1
+                if not self._leases[key]:
+                    del self._leases[key]
+                self._evict_over_budget()
+                self._returned.notify_all()
+
+    def _acquire(self, key: LangKey, lease: bool) -> Any:
+        """Return the reader for a language key, building it once admitted."""
+        with self._lock:
+            reader = self._use(key, lease)
+            if reader is not None:
+                return reader
+            build_lock = self._building.setdefault(key, threading.Lock())
+
+        with build_lock:
+            with self._lock:
+                reader = self._use(key, lease)
+                if reader is not None:
+                    return reader
+                self._admit(key)
+
+            try:
+                with ocr_stage("reader_load", lang=",".join(key)) as attributes:
+                    reader = self.reader_factory(key, **self.reader_kwargs)
+                    size = self.memory_estimator(reader)
+                    attributes["memory_bytes"] = size
+            except BaseException:
+                with self._lock:
+                    self._reserved.pop(key, None)
+                    self._returned.notify_all()
+                raise
+
+            with self._lock:
+                self._reserved.pop(key, None)
+                self._readers[key] = (reader, size)
+                self._sizes[key] = size
+                self._building.pop(key, None)
+                self.loads += 1
+                if lease:
+                    self._leases[key] = self._leases.get(key, 0) + 1
+                self._evict_over_budget()
+                self._returned.notify_all()
+            return reader
+
+    def _use(self, key: LangKey, lease: bool) -> Any:
+        """Mark a loaded reader as used and return it, or None if not loaded."""
+        entry = self._readers.get(key)
+        if entry is None:
+            return None
+        self._readers.move_to_end(key)
+        if lease:
+            self._leases[key] = self._leases.get(key, 0) + 1
+        return entry[0]
+
+    def _admit(self, key: LangKey) -> None:
+        """
+        Wait until a new reader fits the memory budget and reserve its memory.
+
+        Called with the pool lock held.
+        """
+        size = self._sizes.get(key, self.default_reader_bytes)
+        deadline = (
+            None
+            if self.admission_timeout is None
+            else time.monotonic() + self.admission_timeout
+        )
+        waited = False
+        while True:
+            self._evict_over_budget(incoming=size)
+            used = self._used_bytes()
+            if (
+                self.max_memory_bytes is None
+                or used + size <= self.max_memory_bytes
+                or not (self._readers or self._reserved)
+            ):
+                break
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                self.rejections += 1
+                raise OCRMemoryBudgetError(
+                    f"Loading the EasyOCR models for {','.join(key)} "
+                    f"(~{size / 2**20:.0f} MiB) would exceed the memory budget "
+                    f"of {self.max_memory_bytes / 2**20:.0f} MiB: "
+                    f"{used / 2**20:.0f} MiB are in use"
+                )
+            if not waited:
+                self.admission_waits += 1
+                waited = True
+            self._returned.wait(remaining)
+        self._reserved[key] = size
+
+    def warmup(self, lang_sets: Iterable[Iterable[str]]) -> list[LangKey]:
+        """
+        Preload readers so the first tool call does not pay the load cost.
+
+        Args:
+            lang_sets: Language lists to preload, e.g. ``[["en"], ["en", "es"]]``.
+
+        Returns:
+            Normalized language keys that are loaded in the pool.
+        """
+        keys = []
+        for lang_list in lang_sets:
+            key = normalize_lang_list(lang_list)
+            self.get(key)
+            keys.append(key)
+        return [key for key in keys if key in self]
+
+    def evict(self, lang_list: Optional[Iterable[str]]) -> bool:
+        """Drop the reader for a language set. Returns whether it was loaded."""
+        key = normalize_lang_list(lang_list)
+        with self._lock:
+            return self._readers.pop(key, None) is not None
+
+    def clear(self) -> None:
+        """Drop every loaded reader."""
+        with self._lock:
+            self._readers.clear()
+
+    @property
+    def memory_bytes(self) -> int:
+        """Estimated memory held by the loaded readers."""
+        with self._lock:
+            return sum(size for _, size in self._readers.values())
+
+    @property
+    def usage(self) -> dict[str, Any]:
+        """Memory budget, usage per language set and admission counters."""
+        with self._lock:
+            return {
+                "budget_bytes": self.max_memory_bytes,
+                "used_bytes": self._used_bytes(),
+                "reserved_bytes": sum(self._reserved.values()),
+                "lang_sets": {
+                    ",".join(key): {
+                        "memory_bytes": size,
+                        "leases": self._leases.get(key, 0),
+                    }
+                    for key, (_, size) in self._readers.items()
+                },
+                "loads": self.loads,
+                "evictions": self.evictions,
+                "admission_waits": self.admission_waits,
+                "rejections": self.rejections,
+            }
+
+    @property
+    def loaded_lang_sets(self) -> list[LangKey]:
+        """Loaded language keys, least recently used first."""
+        with self._lock:
+            return list(self._readers)
+
+    def __contains__(self, lang_list: object) -> bool:
+        """Whether the reader for a language set is loaded."""
+        if not isinstance(lang_list, (list, tuple, set, frozenset)):
+            return False
+        key = normalize_lang_list(lang_list)
+        with self._lock:
+            return key in self._readers
+
+    def __len__(self) -> int:
+        """Number of loaded readers."""
+        with self._lock:
+            return len(self._readers)
+
+    def _used_bytes(self) -> int:
+        """Estimated memory of the loaded readers and the readers being built."""
+        return sum(size for _, size in self._readers.values()) + sum(
+            self._reserved.values()
+        )
+
+    def _evict_over_budget(self, incoming: Optional[int] = None) -> None:
+        """
+        Evict least recently used idle readers until the pool fits its limits.
+
+        Args:
+            incoming: Estimated footprint of a reader about to be built. It
+                counts as the most recently used reader, so every loaded
+                reader may be evicted for it.
+        """
+        extra = 0 if incoming is None else incoming
+        while True:
+            count = len(self._readers) + (incoming is not None)
+            over_budget = count > self.max_readers or (
+                self.max_memory_bytes is not None
+                and self._used_bytes() + extra > self.max_memory_bytes
+            )
+            idle = next((key for key in self._readers if key not in self._leases), None)
+            if count <= 1 or not over_budget or idle is None:
+                return
+            del self._readers[idle]
+            self.evictions += 1
+
+
+_default_pool: Optional[EasyOCRReaderPool] = None
+_default_pool_lock = threading.Lock()
+
+
+def get_reader_pool() -> EasyOCRReaderPool:
+    """Return the process-wide reader pool, creating it on first use."""
+    global _default_pool
+    with _default_pool_lock:
+        if _default_pool is None:
+            _default_pool = EasyOCRReaderPool()
+        return _default_pool
+
+
+def set_reader_pool(pool: EasyOCRReaderPool) -> None:
+    """Replace the process-wide reader pool (e.g. to change its limits)."""
+    global _default_pool
+    with _default_pool_lock:
+        _default_pool = pool
+
+
+def configure_reader_pool(**pool_kwargs: Any) -> None:
+    """
+    Replace the process-wide reader pool with one built from keyword arguments.
+
+    Picklable, so EasyOCR worker processes can set their own limits, e.g.
+    ``OCRExecutor(worker_initializer=partial(configure_reader_pool,
+    max_memory_bytes=2 * 2**30))``.
+    """
+    set_reader_pool(EasyOCRReaderPool(**pool_kwargs))
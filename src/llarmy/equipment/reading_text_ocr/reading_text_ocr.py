@@ -5,56 +5,631 @@ Extract text from images using tesseract (printed material) and EasyOCR (general
 Includes multi language support.
 """
 
-import base64
-from io import BytesIO
-from pathlib import Path
+import asyncio
+import inspect
+import threading
+from collections import OrderedDict
+from contextlib import ExitStack, contextmanager
+from dataclasses import asdict
+from functools import partial, wraps
+from typing import Any, Callable, Iterable, Iterator, Optional, TypeVar, Union, cast
 from llama_index.core.tools.tool_spec.base import BaseToolSpec
-import easyocr
-import easyocr.utils
 from PIL import Image
 import pytesseract
 
+from .batching import BatchingConfig, MicroBatcher
+from .cache import OCRResultCache
+from .cpu import CPUInferenceConfig, get_cpu_reader_pool
+from .documents import count_document_pages, iter_document_pages, ocr_document_pages
+from .engines import (
+    easyocr_readtext,
+    easyocr_readtext_layout,
+    tesseract_image_to_string,
+)
+from .executors import OCRBusyError, OCRExecutor, get_ocr_executor
+from .handles import ImageStore, use_image_store
+from .images import image_input_digest, load_image_from_input, resolve_image_input
+from .instrumentation import dispatcher, ocr_stage
+from .layout import OCRLayout, layout_summary
+from .preprocessing import PreprocessingConfig
+from .readers import EasyOCRReaderPool, LangKey, get_reader_pool, normalize_lang_list
+from .routing import EngineRouter
+from .sequences import FrameResult, FrameSequence, FrameSequenceConfig
+from .tesseract_backends import TesseractBackend, get_tesseract_backend
+from .text_presence import TextPresence, TextPresenceConfig, detect_text_presence
+from .tiling import TilingConfig
+from .workers import (
+    ReaderPoolArg,
+    general_purpose_ocr,
+    general_purpose_ocr_batch,
+    prepare_image,
+    printed_material_ocr,
+    printed_material_ocr_batch,
+    routed_ocr,
+    structured_ocr,
+)
 
-def load_image_from_input(image_input: str) -> Image.Image:
-    """
-    Load image from file path or base64 string.
+GENERAL_PURPOSE_ERROR = "General Purpose Reading Text Module Error (EasyOCR)"
+PRINTED_MATERIAL_ERROR = "Reading Printed Material Text Error (tesseract)"
+READING_TEXT_ERROR = "Reading Text Error"
+NO_TEXT_SKIPPED = (
+    "No text found in the image "
+    "(recognition skipped: the text pre-check found no text regions)"
+)
 
-    Args:
-        image_input: File path or base64 encoded image string.
 
-    Returns:
-        PIL Image object.
-    """
-    # Check if input is base64 (common base64 image prefixes)
-    if any(
-        image_input.startswith(prefix)
-        for prefix in ["data:image/", "/9j/", "iVBOR", "R0lGOD", "UklGR"]
-    ):
-        # Handle base64
-        if image_input.startswith("data:image/"):
-            # Remove data:image/[type];base64, prefix
-            image_input = image_input.split(",")[1]
+def _format_extracted_text(extracted_text: str) -> str:
+    """Format engine output into the tool response."""
+    if extracted_text:
+        return f"Extracted text: {extracted_text}\n"
+    return "No text found in the image"
 
-        # Decode base64 and create PIL Image
-        image_data = base64.b64decode(image_input)
-        return Image.open(BytesIO(image_data))
 
-    # Handle file path
-    img_path = Path(image_input).resolve()
-    return Image.open(img_path)
+@contextmanager
+def _lease_layout_engine(
+    reader_pool: EasyOCRReaderPool, lang_list: Iterable[str]
+) -> Iterator[Callable[[Image.Image], OCRLayout]]:
+    """Lease the EasyOCR reader of a language set as a layout engine call."""
+    with reader_pool.lease(lang_list) as reader:
+        yield partial(easyocr_readtext_layout, reader)
+
+
+def _format_routed_result(result: dict[str, Any]) -> str:
+    """Format routed OCR output, reporting the engine that was used."""
+    engine_note = f"Engine: {result['engine']} (confidence {result['confidence']:.0f})"
+    if result["escalated_from"]:
+        engine_note += f", used after low confidence from {result['escalated_from']}"
+    return f"{_format_extracted_text(result['text']).rstrip()}\n{engine_note}\n"
+
+
+def _format_frame_result(result: FrameResult) -> str:
+    """Format the text changes of a frame into the tool response."""
+    summary = (
+        f"Frame {result.index}: {result.changed_tiles} of {result.tiles} "
+        "regions changed"
+    )
+    if result.added or result.removed:
+        changes = [f"+ {line}" for line in result.added]
+        changes.extend(f"- {line}" for line in result.removed)
+    elif not len(result.layout):
+        changes = ["No text found in the image"]
+    else:
+        changes = ["No text changes"]
+    return "\n".join([summary, *changes]) + "\n"
+
+
+def _format_batch_results(
+    results: list[Union[str, Exception, TextPresence]],
+    error_prefix: str,
+) -> list[str]:
+    """Format batch engine output into the tool response."""
+    return [
+        (
+            f"{error_prefix}: {result!s}"
+            if isinstance(result, Exception)
+            else (
+                NO_TEXT_SKIPPED
+                if isinstance(result, TextPresence)
+                else _format_extracted_text(result)
+            )
+        )
+        for result in results
+    ]
+
+
+ToolMethod = TypeVar("ToolMethod", bound=Callable[..., Any])
+
+
+def _uses_image_store(method: ToolMethod) -> ToolMethod:
+    """Resolve image handles with the tool spec's image store while a tool runs."""
+    if inspect.iscoroutinefunction(method):
+
+        @wraps(method)
+        async def async_tool(
+            self: "ReadingTextOCRToolSpec", *args: Any, **kwargs: Any
+        ) -> Any:
+            with use_image_store(self.image_store):
+                return await method(self, *args, **kwargs)
+
+        return cast(ToolMethod, async_tool)
+
+    @wraps(method)
+    def tool(self: "ReadingTextOCRToolSpec", *args: Any, **kwargs: Any) -> Any:
+        with use_image_store(self.image_store):
+            return method(self, *args, **kwargs)
+
+    return cast(ToolMethod, tool)
 
 
 class ReadingTextOCRToolSpec(BaseToolSpec):
     """Reading Text OCR tool spec."""
 
-    def __init__(self) -> None:
-        """Initialize the Reading Text OCR tool spec."""
+    def __init__(
+        self,
+        reader_pool: Optional[EasyOCRReaderPool] = None,
+        max_decode_workers: Optional[int] = None,
+        executor: Optional[OCRExecutor] = None,
+        cache: Optional[OCRResultCache] = None,
+        target_image_side: Optional[int] = None,
+        max_page_workers: Optional[int] = None,
+        tesseract_backend: Optional[TesseractBackend] = None,
+        router: Optional[EngineRouter] = None,
+        preprocessing: Optional[PreprocessingConfig] = None,
+        max_layouts: int = 32,
+        tiling: Optional[TilingConfig] = None,
+        batching: Optional[BatchingConfig] = None,
+        cpu_inference: Optional[CPUInferenceConfig] = None,
+        text_presence: Optional[TextPresenceConfig] = None,
+        frame_sequences: Optional[FrameSequenceConfig] = None,
+        max_sequences: int = 16,
+        image_store: Optional[ImageStore] = None,
+    ) -> None:
+        """
+        Initialize the Reading Text OCR tool spec.
+
+        Args:
+            reader_pool: Pool of EasyOCR readers to use. Defaults to the
+                process-wide pool shared by every tool spec.
+            max_decode_workers: Maximum number of threads decoding images in the
+                batch tools.
+            executor: Bounded executor used by the async tools. Defaults to the
+                process-wide executor.
+            cache: Optional cache of OCR results keyed by image content, engine
+                and languages. Disabled by default.
+            target_image_side: Longest image side the engines need. Larger JPEGs
+                are decoded at a reduced scale instead of full resolution.
+            max_page_workers: Number of threads OCRing document pages in
+                parallel.
+            tesseract_backend: Backend running tesseract. Defaults to the
+                process-wide backend: pooled in-process engines when tesserocr
+                is installed, the pytesseract subprocess otherwise.
+            router: Rules the extract_text tool uses to choose between
+                tesseract and EasyOCR.
+            preprocessing: Preprocessing (cropping to text, downscaling to a
+                target text height, grayscale, deskew, binarization) applied to
+                every image before OCR. Disabled by default.
+            max_layouts: Structured OCR results kept in memory, so regions of
+                recently read images can be queried without running OCR again.
+            tiling: Split very large images into overlapping tiles OCRed in
+                parallel, for EasyOCR and structured results. Disabled by
+                default.
+            batching: Collect concurrent general_purpose_extract_text calls
+                with the same languages and run them as one batched EasyOCR
+                call in this process. Disabled by default.
+            cpu_inference: Run EasyOCR with a CPU-optimized backend
+                (quantized PyTorch or ONNX Runtime) and thread count, in
+                this process and in the EasyOCR worker processes. Cannot be
+                combined with ``reader_pool``.
+            text_presence: Check a downscaled copy of every uncached image for
+                text-like regions first, and skip recognition when there are
+                none. Disabled by default.
+            frame_sequences: Tiles and change detection of the frame
+                sequences read by extract_frame_text.
+            max_sequences: Frame sequences whose previous frame is kept in
+                memory; the least recently used sequence starts over.
+            image_store: Store of the handles returned by register_image.
+                Defaults to a store owned by this tool spec, so handles are
+                scoped to it and its files are deleted by ``close``.
+        """
+        if cpu_inference is not None and reader_pool is not None:
+            raise ValueError("Pass either reader_pool or cpu_inference, not both")
+        if cpu_inference is not None:
+            reader_pool = get_cpu_reader_pool(cpu_inference)
+        self.cpu_inference = cpu_inference
+        self.reader_pool = reader_pool if reader_pool is not None else get_reader_pool()
+        self.max_decode_workers = max_decode_workers
+        self.executor = executor if executor is not None else get_ocr_executor()
+        self.cache = cache
+        self.target_image_side = target_image_side
+        self.max_page_workers = max_page_workers
+        self.tesseract_backend = (
+            tesseract_backend
+            if tesseract_backend is not None
+            else get_tesseract_backend()
+        )
+        self.router = router if router is not None else EngineRouter()
+        self.preprocessing = preprocessing
+        self.max_layouts = max_layouts
+        self.tiling = tiling
+        self.text_presence = text_presence
+        self.frame_sequences = (
+            frame_sequences if frame_sequences is not None else FrameSequenceConfig()
+        )
+        self.max_sequences = max_sequences
+        self._owns_image_store = image_store is None
+        self.image_store = image_store if image_store is not None else ImageStore()
+        self._sequences: OrderedDict[tuple[str, LangKey], FrameSequence] = OrderedDict()
+        self._sequences_lock = threading.Lock()
+        self._layouts: OrderedDict[str, OCRLayout] = OrderedDict()
+        self._layouts_lock = threading.Lock()
+        self.batcher: Optional[MicroBatcher[str, str]] = (
+            None
+            if batching is None
+            else MicroBatcher(self._run_general_purpose_batch, batching)
+        )
+
+    def warmup(self, lang_sets: Iterable[Iterable[str]]) -> list[LangKey]:
+        """
+        Preload EasyOCR readers for the given language sets.
+
+        Args:
+            lang_sets: Language lists to preload, e.g. ``[["en"], ["en", "es"]]``.
+
+        Returns:
+            Normalized language keys that are loaded.
+        """
+        return self.reader_pool.warmup(lang_sets)
+
+    def memory_usage(self) -> dict[str, Any]:
+        """
+        Memory budget and usage of the EasyOCR readers in this process.
+
+        EasyOCR worker processes hold their own reader pools; give them a
+        budget with ``configure_reader_pool`` as the executor's worker
+        initializer.
+
+        Returns:
+            Budget, used and reserved bytes, footprint and leases per loaded
+            language set, and admission counters.
+        """
+        return self.reader_pool.usage
+
+    def close(self) -> None:
+        """
+        Run the pending batched requests and stop the batching threads.
+
+        The spec's own image store is closed too, forgetting its handles.
+        """
+        if self.batcher is not None:
+            self.batcher.close()
+        if self._owns_image_store:
+            self.image_store.close()
 
     spec_functions = [
-        "printed_material_extract_text",
-        "general_purpose_extract_text",
+        ("register_image", "aregister_image"),
+        ("extract_text", "aextract_text"),
+        ("extract_text_layout", "aextract_text_layout"),
+        ("query_text_region", "aquery_text_region"),
+        ("extract_frame_text", "aextract_frame_text"),
+        ("printed_material_extract_text", "aprinted_material_extract_text"),
+        ("general_purpose_extract_text", "ageneral_purpose_extract_text"),
+        (
+            "printed_material_extract_text_batch",
+            "aprinted_material_extract_text_batch",
+        ),
+        (
+            "general_purpose_extract_text_batch",
+            "ageneral_purpose_extract_text_batch",
+        ),
+        ("printed_document_extract_text", "aprinted_document_extract_text"),
+        (
+            "general_purpose_document_extract_text",
+            "ageneral_purpose_document_extract_text",
+        ),
     ]
 
+    @dispatcher.span
+    @_uses_image_store
+    def register_image(self, image_path_or_base64: str) -> str:
+        """
+        Register an image once and get a short handle to pass to the other tools.
+
+        Call this before running several tools on the same base64 image, then
+        pass the handle instead of the base64 string.
+
+        Args:
+            image_path_or_base64: Path to the image file or base64 encoded image.
+
+        Returns:
+            Image handle (e.g. ``img-0123456789abcdef``), or an error message.
+        """
+        try:
+            return self.image_store.register(image_path_or_base64)
+        except (OSError, ValueError) as e:
+            return f"{READING_TEXT_ERROR}: {e!s}"
+
+    @dispatcher.span
+    @_uses_image_store
+    async def aregister_image(self, image_path_or_base64: str) -> str:
+        """Async version of register_image."""
+        return await asyncio.to_thread(self.register_image, image_path_or_base64)
+
+    @dispatcher.span
+    @_uses_image_store
+    def extract_text(
+        self,
+        image_path_or_base64: str,
+        lang_list: Optional[list[str]] = None,
+    ) -> str:
+        """
+        Extract text from an image, automatically choosing the OCR engine.
+
+        Prefer this tool over printed_material_extract_text and
+        general_purpose_extract_text: it detects whether the image is printed
+        material and picks the engine itself, so there is no need to try both.
+
+        Args:
+            image_path_or_base64: Path to the image file, base64 encoded image
+                or handle from register_image.
+            lang_list: Language codes (ISO 639) for languages to be recognized during analysis. Defaults to English.
+
+        Returns:
+            Extracted text and the engine that was used, or an error message.
+        """
+        lang_list = list(normalize_lang_list(lang_list))
+        try:
+            keys, cached = self._lookup_cache(
+                [image_path_or_base64], "auto", **self._routing_options(lang_list)
+            )
+            result = cached[0]
+            if result is None:
+                if self._lacks_text(image_path_or_base64):
+                    return NO_TEXT_SKIPPED
+                result = routed_ocr(
+                    image_path_or_base64,
+                    lang_list,
+                    self.router,
+                    self.reader_pool,
+                    self.target_image_side,
+                    self.tesseract_backend,
+                    self.preprocessing,
+                )
+                self._store_cache(keys, [result])
+            return _format_routed_result(result)
+
+        except (OSError, ValueError, pytesseract.TesseractError, OCRBusyError) as e:
+            return f"{READING_TEXT_ERROR}: {e!s}"
+
+    @dispatcher.span
+    @_uses_image_store
+    async def aextract_text(
+        self,
+        image_path_or_base64: str,
+        lang_list: Optional[list[str]] = None,
+    ) -> str:
+        """Async version of extract_text."""
+        try:
+            return await self.executor.run_in_thread(
+                self.extract_text, image_path_or_base64, lang_list
+            )
+        except OCRBusyError as e:
+            return f"{READING_TEXT_ERROR}: {e!s}"
+
+    @dispatcher.span
+    @_uses_image_store
+    def extract_text_layout(
+        self,
+        image_path_or_base64: str,
+        lang_list: Optional[list[str]] = None,
+    ) -> str:
+        """
+        Extract the lines of text in an image with their positions.
+
+        Use this tool when the position of text matters, e.g. to read forms,
+        receipts or tables. Each line is reported as [left, top, right, bottom]
+        fractions of the image size (0 to 1), the confidence (0-100) and the
+        text. Regions can then be read with query_text_region without running
+        OCR again.
+
+        Args:
+            image_path_or_base64: Path to the image file, base64 encoded image
+                or handle from register_image.
+            lang_list: Language codes (ISO 639) for languages to be recognized during analysis. Defaults to English.
+
+        Returns:
+            Lines of text with their boxes, or an error message.
+        """
+        try:
+            layout = self.get_layout(image_path_or_base64, lang_list)
+        except (OSError, ValueError, pytesseract.TesseractError, OCRBusyError) as e:
+            return f"{READING_TEXT_ERROR}: {e!s}"
+        return f"Engine: {layout.engine}\n{layout_summary(layout)}"
+
+    @dispatcher.span
+    @_uses_image_store
+    def query_text_region(
+        self,
+        image_path_or_base64: str,
+        left: float,
+        top: float,
+        right: float,
+        bottom: float,
+        lang_list: Optional[list[str]] = None,
+    ) -> str:
+        """
+        Read the text inside a region of an image.
+
+        Coordinates are fractions of the image width and height (0 to 1), as
+        reported by extract_text_layout. Images that were already read are not
+        OCRed again.
+
+        Args:
+            image_path_or_base64: Path to the image file, base64 encoded image
+                or handle from register_image.
+            left: Left edge of the region (0 to 1).
+            top: Top edge of the region (0 to 1).
+            right: Right edge of the region (0 to 1).
+            bottom: Bottom edge of the region (0 to 1).
+            lang_list: Language codes (ISO 639) for languages to be recognized during analysis. Defaults to English.
+
+        Returns:
+            Lines of text inside the region with their boxes, or an error message.
+        """
+        try:
+            layout = self.get_layout(image_path_or_base64, lang_list)
+        except (OSError, ValueError, pytesseract.TesseractError, OCRBusyError) as e:
+            return f"{READING_TEXT_ERROR}: {e!s}"
+        region = layout.region(
+            left * layout.width,
+            top * layout.height,
+            right * layout.width,
+            bottom * layout.height,
+        )
+        return layout_summary(region)
+
+    @dispatcher.span
+    @_uses_image_store
+    async def aextract_text_layout(
+        self,
+        image_path_or_base64: str,
+        lang_list: Optional[list[str]] = None,
+    ) -> str:
+        """Async version of extract_text_layout."""
+        try:
+            return await self.executor.run_in_thread(
+                self.extract_text_layout, image_path_or_base64, lang_list
+            )
+        except OCRBusyError as e:
+            return f"{READING_TEXT_ERROR}: {e!s}"
+
+    @dispatcher.span
+    @_uses_image_store
+    async def aquery_text_region(
+        self,
+        image_path_or_base64: str,
+        left: float,
+        top: float,
+        right: float,
+        bottom: float,
+        lang_list: Optional[list[str]] = None,
+    ) -> str:
+        """Async version of query_text_region."""
+        try:
+            return await self.executor.run_in_thread(
+                self.query_text_region,
+                image_path_or_base64,
+                left,
+                top,
+                right,
+                bottom,
+                lang_list,
+            )
+        except OCRBusyError as e:
+            return f"{READING_TEXT_ERROR}: {e!s}"
+
+    @dispatcher.span
+    @_uses_image_store
+    def extract_frame_text(
+        self,
+        image_path_or_base64: str,
+        sequence_id: str = "default",
+        lang_list: Optional[list[str]] = None,
+    ) -> str:
+        """
+        Extract the text changes in the next frame of a video or screen recording.
+
+        Use this tool instead of extract_text for consecutive frames of the
+        same screen or camera: only regions that changed since the previous
+        frame of the sequence are read again, and the result lists the lines
+        of text that appeared (+) and disappeared (-). The first frame of a
+        sequence lists all of its lines.
+
+        Args:
+            image_path_or_base64: Path to the frame image, base64 encoded image
+                or handle from register_image.
+            sequence_id: Name of the frame sequence, e.g. one per video or
+                screen. Send the frames of a sequence in order.
+            lang_list: Language codes (ISO 639) for languages to be recognized during analysis. Defaults to English.
+
+        Returns:
+            Changed regions and text changes since the previous frame, or an
+            error message.
+        """
+        lang_key = normalize_lang_list(lang_list)
+        try:
+            image = load_image_from_input(
+                image_path_or_base64, target_side=self.target_image_side
+            )
+            image.load()
+            sequence = self._get_sequence(sequence_id, lang_key)
+            result = sequence.process(
+                image, partial(_lease_layout_engine, self.reader_pool, lang_key)
+            )
+        except (OSError, ValueError, OCRBusyError) as e:
+            return f"{READING_TEXT_ERROR}: {e!s}"
+        return _format_frame_result(result)
+
+    @dispatcher.span
+    @_uses_image_store
+    async def aextract_frame_text(
+        self,
+        image_path_or_base64: str,
+        sequence_id: str = "default",
+        lang_list: Optional[list[str]] = None,
+    ) -> str:
+        """Async version of extract_frame_text."""
+        try:
+            return await self.executor.run_in_thread(
+                self.extract_frame_text, image_path_or_base64, sequence_id, lang_list
+            )
+        except OCRBusyError as e:
+            return f"{READING_TEXT_ERROR}: {e!s}"
+
+    @dispatcher.span
+    @_uses_image_store
+    def get_layout(
+        self,
+        image_path_or_base64: str,
+        lang_list: Optional[list[str]] = None,
+    ) -> OCRLayout:
+        """
+        Return the structured OCR result of an image, running OCR only once.
+
+        Layouts are kept in memory for the ``max_layouts`` most recent images,
+        and in the result cache when one is configured.
+
+        Args:
+            image_path_or_base64: Path to the image file, base64 encoded image
+                or handle from register_image.
+            lang_list: EasyOCR language codes. Defaults to English.
+
+        Returns:
+            Words with boxes in the coordinates of the loaded image.
+        """
+        lang_list = list(normalize_lang_list(lang_list))
+        key = OCRResultCache.make_key(
+            image_input_digest(image_path_or_base64),
+            "layout",
+            **self._image_options(),
+            **self._routing_options(lang_list),
+        )
+        with ocr_stage("cache_lookup", engine="layout") as attributes:
+            with self._layouts_lock:
+                layout = self._layouts.get(key)
+                if layout is not None:
+                    self._layouts.move_to_end(key)
+            cached = None
+            if layout is None and self.cache is not None:
+                cached = self.cache.get(key)
+            attributes["hits"] = int(layout is not None or cached is not None)
+            attributes["misses"] = 1 - attributes["hits"]
+        if layout is not None:
+            return layout
+
+        if cached is not None:
+            layout = OCRLayout.from_dict(cached)
+        else:
+            layout = structured_ocr(
+                image_path_or_base64,
+                lang_list,
+                self.router,
+                self.reader_pool,
+                self.target_image_side,
+                self.tesseract_backend,
+                self.preprocessing,
+                self.tiling,
+            )
+            if self.cache is not None:
+                self.cache.set(key, layout.to_dict())
+
+        with self._layouts_lock:
+            self._layouts[key] = layout
+            while len(self._layouts) > self.max_layouts:
+                self._layouts.popitem(last=False)
+        return layout
+
+    @dispatcher.span
+    @_uses_image_store
     def general_purpose_extract_text(
         self,
         image_path_or_base64: str,
@@ -67,29 +642,44 @@ class ReadingTextOCRToolSpec(BaseToolSpec):
         If the image is a printed material, use the printed_material_extract_text tool.
 
         Args:
-            image_path: Path to the image file.
+            image_path: Path to the image file, base64 encoded image or handle
+                from register_image.
             lang_list: Language codes (ISO 639) for languages to be recognized during analysis.
 
         Returns:
             Extracted text from the image or an error message.
         """
         try:
-            if len(lang_list) == 0:
-                lang_list = ["en"]
-            reader = easyocr.Reader(lang_list)
-            image = load_image_from_input(image_path_or_base64)
-            results = reader.readtext(image)
-            extracted_text = " ".join([result[1] for result in results])
-
-            extracted_text = extracted_text.strip()
-
-            if extracted_text:
-                return f"Extracted text: {extracted_text}\n"
-            return "No text found in the image"
+            keys, cached = self._lookup_cache(
+                [image_path_or_base64],
+                "easyocr",
+                lang_list=normalize_lang_list(lang_list),
+            )
+            extracted_text = cached[0]
+            if extracted_text is None:
+                if self._lacks_text(image_path_or_base64):
+                    return NO_TEXT_SKIPPED
+                if self.batcher is not None:
+                    extracted_text = self.batcher.submit(
+                        normalize_lang_list(lang_list), image_path_or_base64
+                    ).result()
+                else:
+                    extracted_text = general_purpose_ocr(
+                        image_path_or_base64,
+                        lang_list,
+                        self.reader_pool,
+                        self.target_image_side,
+                        self.preprocessing,
+                        self.tiling,
+                    )
+                self._store_cache(keys, [extracted_text])
+            return _format_extracted_text(extracted_text)
 
-        except easyocr.utils.Image.UnidentifiedImageError as e:
-            return f"General Purpose Reading Text Module Error (EasyOCR): {e!s}"
+        except (OSError, ValueError, OCRBusyError) as e:
+            return f"{GENERAL_PURPOSE_ERROR}: {e!s}"
 
+    @dispatcher.span
+    @_uses_image_store
     def printed_material_extract_text(
         self,
         image_path_or_base64: str,
@@ -109,16 +699,629 @@ class ReadingTextOCRToolSpec(BaseToolSpec):
             Extracted text from the image.
         """
         try:
-            print("🔍 Extracting text using tesseract")
-            image = load_image_from_input(image_path_or_base64)
+            keys, cached = self._lookup_cache(
+                [image_path_or_base64],
+                "tesseract",
+                lang=lang,
+                backend=self.tesseract_backend.name,
+            )
+            extracted_text = cached[0]
+            if extracted_text is None:
+                if self._lacks_text(image_path_or_base64):
+                    return NO_TEXT_SKIPPED
+                extracted_text = printed_material_ocr(
+                    image_path_or_base64,
+                    lang,
+                    self.target_image_side,
+                    self.tesseract_backend,
+                    self.preprocessing,
+                )
+                self._store_cache(keys, [extracted_text])
+            return _format_extracted_text(extracted_text)
 
-            # Process with tesseract
-            extracted_text = pytesseract.image_to_string(image, lang=lang)
-            extracted_text = extracted_text.strip()
+        except (OSError, ValueError, pytesseract.TesseractError, OCRBusyError) as e:
+            return f"{PRINTED_MATERIAL_ERROR}: {e!s}"
 
-            if extracted_text:
-                return f"Extracted text: {extracted_text}\n"
-            return "No text found in the image"
+    @dispatcher.span
+    @_uses_image_store
+    def general_purpose_extract_text_batch(
+        self,
+        images_paths_or_base64: list[str],
+        lang_list: list[str],
+    ) -> list[str]:
+        """
+        Extract text from many images at once using EasyOCR.
 
-        except pytesseract.TesseractError as e:
-            return f"Reading Printed Material Text Error (tesseract): {e!s}"
+        Use this tool instead of general_purpose_extract_text when several
+        general purpose images need to be read, e.g. the pages of a document.
+
+        Args:
+            images_paths_or_base64: Paths to the image files, base64 encoded images
+                or handles from register_image.
+            lang_list: Language codes (ISO 639) for languages to be recognized during analysis.
+
+        Returns:
+            Extracted text or an error message for each image, in input order.
+        """
+        keys, results = self._lookup_cache(
+            images_paths_or_base64, "easyocr", lang_list=normalize_lang_list(lang_list)
+        )
+        misses = self._skip_text_free(images_paths_or_base64, results)
+        try:
+            if misses:
+                computed = general_purpose_ocr_batch(
+                    [images_paths_or_base64[index] for index in misses],
+                    lang_list,
+                    self.reader_pool,
+                    self.max_decode_workers,
+                    self.target_image_side,
+                    self.preprocessing,
+                    self.tiling,
+                )
+                self._merge_results(keys, results, misses, computed)
+        except OCRBusyError as e:
+            return [f"{GENERAL_PURPOSE_ERROR}: {e!s}"] * len(images_paths_or_base64)
+        return _format_batch_results(results, GENERAL_PURPOSE_ERROR)
+
+    @dispatcher.span
+    @_uses_image_store
+    def printed_material_extract_text_batch(
+        self,
+        images_paths_or_base64: list[str],
+        lang: str = "eng",
+    ) -> list[str]:
+        """
+        Extract text from many images at once using tesseract OCR.
+
+        Use this tool instead of printed_material_extract_text when several
+        printed material images need to be read, e.g. the pages of a document.
+
+        Args:
+            images_paths_or_base64: Paths to the image files, base64 encoded images
+                or handles from register_image.
+            lang: Language of the text in the images.
+
+        Returns:
+            Extracted text or an error message for each image, in input order.
+        """
+        keys, results = self._lookup_cache(
+            images_paths_or_base64,
+            "tesseract",
+            lang=lang,
+            backend=self.tesseract_backend.name,
+        )
+        misses = self._skip_text_free(images_paths_or_base64, results)
+        try:
+            if misses:
+                computed = printed_material_ocr_batch(
+                    [images_paths_or_base64[index] for index in misses],
+                    lang,
+                    self.max_decode_workers,
+                    self.target_image_side,
+                    self.tesseract_backend,
+                    self.preprocessing,
+                )
+                self._merge_results(keys, results, misses, computed)
+        except OCRBusyError as e:
+            return [f"{PRINTED_MATERIAL_ERROR}: {e!s}"] * len(images_paths_or_base64)
+        return _format_batch_results(results, PRINTED_MATERIAL_ERROR)
+
+    @dispatcher.span
+    @_uses_image_store
+    async def ageneral_purpose_extract_text(
+        self,
+        image_path_or_base64: str,
+        lang_list: list[str],
+    ) -> str:
+        """Async version of general_purpose_extract_text."""
+        try:
+            keys, cached = await asyncio.to_thread(
+                self._lookup_cache,
+                [image_path_or_base64],
+                "easyocr",
+                lang_list=normalize_lang_list(lang_list),
+            )
+            extracted_text = cached[0]
+            if extracted_text is None:
+                if await asyncio.to_thread(self._lacks_text, image_path_or_base64):
+                    return NO_TEXT_SKIPPED
+                if self.batcher is not None:
+                    extracted_text = await asyncio.wrap_future(
+                        self.batcher.submit(
+                            normalize_lang_list(lang_list), image_path_or_base64
+                        )
+                    )
+                else:
+                    extracted_text = await self.executor.run_easyocr(
+                        general_purpose_ocr,
+                        self._easyocr_worker_input(image_path_or_base64),
+                        lang_list,
+                        *self._easyocr_worker_args(),
+                        self.target_image_side,
+                        self.preprocessing,
+                        self.tiling,
+                    )
+                self._store_cache(keys, [extracted_text])
+            return _format_extracted_text(extracted_text)
+
+        except (OSError, ValueError, OCRBusyError) as e:
+            return f"{GENERAL_PURPOSE_ERROR}: {e!s}"
+
+    @dispatcher.span
+    @_uses_image_store
+    async def aprinted_material_extract_text(
+        self,
+        image_path_or_base64: str,
+        lang: str = "eng",
+    ) -> str:
+        """Async version of printed_material_extract_text."""
+        try:
+            keys, cached = await asyncio.to_thread(
+                self._lookup_cache,
+                [image_path_or_base64],
+                "tesseract",
+                lang=lang,
+                backend=self.tesseract_backend.name,
+            )
+            extracted_text = cached[0]
+            if extracted_text is None:
+                if await asyncio.to_thread(self._lacks_text, image_path_or_base64):
+                    return NO_TEXT_SKIPPED
+                extracted_text = await self.executor.run_tesseract(
+                    printed_material_ocr,
+                    image_path_or_base64,
+                    lang,
+                    self.target_image_side,
+                    self.tesseract_backend,
+                    self.preprocessing,
+                )
+                self._store_cache(keys, [extracted_text])
+            return _format_extracted_text(extracted_text)
+
+        except (OSError, ValueError, pytesseract.TesseractError, OCRBusyError) as e:
+            return f"{PRINTED_MATERIAL_ERROR}: {e!s}"
+
+    @dispatcher.span
+    @_uses_image_store
+    async def ageneral_purpose_extract_text_batch(
+        self,
+        images_paths_or_base64: list[str],
+        lang_list: list[str],
+    ) -> list[str]:
+        """Async version of general_purpose_extract_text_batch."""
+        keys, results = await asyncio.to_thread(
+            self._lookup_cache,
+            images_paths_or_base64,
+            "easyocr",
+            lang_list=normalize_lang_list(lang_list),
+        )
+        misses = await asyncio.to_thread(
+            self._skip_text_free, images_paths_or_base64, results
+        )
+        try:
+            if misses:
+                computed = await self.executor.run_easyocr(
+                    general_purpose_ocr_batch,
+                    [
+                        self._easyocr_worker_input(images_paths_or_base64[index])
+                        for index in misses
+                    ],
+                    lang_list,
+                    *self._easyocr_worker_args(),
+                    self.max_decode_workers,
+                    self.target_image_side,
+                    self.preprocessing,
+                    self.tiling,
+                )
+                self._merge_results(keys, results, misses, computed)
+        except OCRBusyError as e:
+            return [f"{GENERAL_PURPOSE_ERROR}: {e!s}"] * len(images_paths_or_base64)
+        return _format_batch_results(results, GENERAL_PURPOSE_ERROR)
+
+    @dispatcher.span
+    @_uses_image_store
+    async def aprinted_material_extract_text_batch(
+        self,
+        images_paths_or_base64: list[str],
+        lang: str = "eng",
+    ) -> list[str]:
+        """Async version of printed_material_extract_text_batch."""
+        keys, results = await asyncio.to_thread(
+            self._lookup_cache,
+            images_paths_or_base64,
+            "tesseract",
+            lang=lang,
+            backend=self.tesseract_backend.name,
+        )
+        misses = await asyncio.to_thread(
+            self._skip_text_free, images_paths_or_base64, results
+        )
+        try:
+            if misses:
+                computed = await self.executor.run_tesseract(
+                    printed_material_ocr_batch,
+                    [images_paths_or_base64[index] for index in misses],
+                    lang,
+                    self.max_decode_workers,
+                    self.target_image_side,
+                    self.tesseract_backend,
+                    self.preprocessing,
+                )
+                self._merge_results(keys, results, misses, computed)
+        except OCRBusyError as e:
+            return [f"{PRINTED_MATERIAL_ERROR}: {e!s}"] * len(images_paths_or_base64)
+        return _format_batch_results(results, PRINTED_MATERIAL_ERROR)
+
+    @dispatcher.span
+    @_uses_image_store
+    def printed_document_extract_text(
+        self,
+        document_path_or_base64: str,
+        lang: str = "eng",
+        start_page: int = 1,
+        max_pages: Optional[int] = None,
+    ) -> str:
+        """
+        Extract text from a multi-page document using tesseract OCR.
+
+        This tool is designed for printed documents: PDFs and multi-page TIFF
+        scans. Long documents can be read in parts using start_page and max_pages.
+
+        Args:
+            document_path_or_base64: Path to the document file or base64 encoded document.
+            lang: Language of the text in the document.
+            start_page: First page to read (1-based).
+            max_pages: Maximum number of pages to read.
+
+        Returns:
+            Extracted text of each page, prefixed by its page number.
+        """
+        return self._extract_document_text(
+            document_path_or_base64,
+            "tesseract",
+            lang,
+            start_page,
+            max_pages,
+            PRINTED_MATERIAL_ERROR,
+        )
+
+    @dispatcher.span
+    @_uses_image_store
+    def general_purpose_document_extract_text(
+        self,
+        document_path_or_base64: str,
+        lang_list: list[str],
+        start_page: int = 1,
+        max_pages: Optional[int] = None,
+    ) -> str:
+        """
+        Extract text from a multi-page document using EasyOCR.
+
+        This tool is designed for documents that are not printed material, e.g.
+        photographed pages. If the document is printed, use the
+        printed_document_extract_text tool.
+
+        Args:
+            document_path_or_base64: Path to the document file or base64 encoded document.
+            lang_list: Language codes (ISO 639) for languages to be recognized during analysis.
+            start_page: First page to read (1-based).
+            max_pages: Maximum number of pages to read.
+
+        Returns:
+            Extracted text of each page, prefixed by its page number.
+        """
+        return self._extract_document_text(
+            document_path_or_base64,
+            "easyocr",
+            lang_list,
+            start_page,
+            max_pages,
+            GENERAL_PURPOSE_ERROR,
+        )
+
+    @dispatcher.span
+    @_uses_image_store
+    async def aprinted_document_extract_text(
+        self,
+        document_path_or_base64: str,
+        lang: str = "eng",
+        start_page: int = 1,
+        max_pages: Optional[int] = None,
+    ) -> str:
+        """Async version of printed_document_extract_text."""
+        try:
+            return await self.executor.run_in_thread(
+                self.printed_document_extract_text,
+                document_path_or_base64,
+                lang,
+                start_page,
+                max_pages,
+            )
+        except OCRBusyError as e:
+            return f"{PRINTED_MATERIAL_ERROR}: {e!s}"
+
+    @dispatcher.span
+    @_uses_image_store
+    async def ageneral_purpose_document_extract_text(
+        self,
+        document_path_or_base64: str,
+        lang_list: list[str],
+        start_page: int = 1,
+        max_pages: Optional[int] = None,
+    ) -> str:
+        """Async version of general_purpose_document_extract_text."""
+        try:
+            return await self.executor.run_in_thread(
+                self.general_purpose_document_extract_text,
+                document_path_or_base64,
+                lang_list,
+                start_page,
+                max_pages,
+            )
+        except OCRBusyError as e:
+            return f"{GENERAL_PURPOSE_ERROR}: {e!s}"
+
+    def iter_document_text(
+        self,
+        document_path_or_base64: str,
+        engine: str = "tesseract",
+        lang: Union[str, list[str]] = "eng",
+        start_page: int = 1,
+        max_pages: Optional[int] = None,
+    ) -> Iterator[tuple[int, Union[str, Exception]]]:
+        """
+        Stream the text of a document page by page as pages finish.
+
+        Pages are rendered lazily and OCRed on ``max_page_workers`` threads, so
+        the first results arrive before the rest of the document is processed.
+
+        Args:
+            document_path_or_base64: Path to the document file or base64 encoded document.
+            engine: ``"tesseract"`` or ``"easyocr"``.
+            lang: Tesseract language (e.g. ``"eng+spa"``) or EasyOCR language list.
+            start_page: First page to read (1-based).
+            max_pages: Maximum number of pages to read.
+
+        Yields:
+            Page number and extracted text, or the error raised for that page.
+        """
+        leases = ExitStack()
+        if engine == "tesseract":
+            tesseract_lang = lang if isinstance(lang, str) else "+".join(lang)
+
+            def ocr_page(image: Image.Image) -> str:
+                return tesseract_image_to_string(
+                    prepare_image(image, self.preprocessing),
+                    lang=tesseract_lang,
+                    backend=self.tesseract_backend,
+                )
+
+        elif engine == "easyocr":
+            reader = leases.enter_context(
+                self.reader_pool.lease([lang] if isinstance(lang, str) else lang)
+            )
+
+            def ocr_page(image: Image.Image) -> str:
+                return easyocr_readtext(
+                    reader, prepare_image(image, self.preprocessing)
+                )
+
+        else:
+            raise ValueError(f"Unknown OCR engine: {engine}")
+
+        with leases:
+            pages = iter_document_pages(document_path_or_base64, start_page, max_pages)
+            yield from ocr_document_pages(
+                pages, ocr_page, max_workers=self.max_page_workers
+            )
+
+    def _extract_document_text(
+        self,
+        document_path_or_base64: str,
+        engine: str,
+        lang: Union[str, list[str]],
+        start_page: int,
+        max_pages: Optional[int],
+        error_prefix: str,
+    ) -> str:
+        """Collect the streamed pages of a document into the tool response."""
+        try:
+            page_count = count_document_pages(document_path_or_base64)
+            sections = [
+                f"Page {page_number}: "
+                + _format_batch_results([result], error_prefix)[0].rstrip("\n")
+                for page_number, result in self.iter_document_text(
+                    document_path_or_base64, engine, lang, start_page, max_pages
+                )
+            ]
+        except (OSError, ValueError, ImportError, OCRBusyError) as e:
+            return f"{error_prefix}: {e!s}"
+
+        if not sections:
+            return (
+                f"The document has {page_count} pages; page {start_page} does not exist"
+            )
+        last_page = start_page + len(sections) - 1
+        summary = f"Pages {start_page}-{last_page} of {page_count}"
+        if last_page < page_count:
+            summary += f" (call again with start_page={last_page + 1} for the rest)"
+        return "\n".join([summary, *sections]) + "\n"
+
+    def _run_general_purpose_batch(
+        self,
+        lang_key: Any,
+        images_paths_or_base64: list[str],
+    ) -> list[Union[str, Exception]]:
+        """Run one micro-batch of general_purpose_extract_text calls."""
+        with use_image_store(self.image_store):
+            return general_purpose_ocr_batch(
+                images_paths_or_base64,
+                list(lang_key),
+                self.reader_pool,
+                self.max_decode_workers,
+                self.target_image_side,
+                self.preprocessing,
+                self.tiling,
+            )
+
+    def _easyocr_worker_args(self) -> tuple[ReaderPoolArg]:
+        """
+        Reader pool argument for EasyOCR worker calls.
+
+        Worker processes use their own process-wide pool, or build one from
+        the CPU inference config; the spec's pool is only passed when EasyOCR
+        runs on threads in this process.
+        """
+        if self.executor.uses_process_pool:
+            return (self.cpu_inference,)
+        return (self.reader_pool,)
+
+    def _easyocr_worker_input(self, image_input: str) -> str:
+        """
+        Image input for EasyOCR worker calls.
+
+        Worker processes do not share this process's image store, so handles
+        are replaced with the paths of their files.
+        """
+        if self.executor.uses_process_pool:
+            return resolve_image_input(image_input)
+        return image_input
+
+    def _get_sequence(self, sequence_id: str, lang_key: LangKey) -> FrameSequence:
+        """Return the state of a frame sequence, creating it on first use."""
+        key = (sequence_id, lang_key)
+        with self._sequences_lock:
+            sequence = self._sequences.get(key)
+            if sequence is None:
+                sequence = self._sequences[key] = FrameSequence(self.frame_sequences)
+                while len(self._sequences) > self.max_sequences:
+                    self._sequences.popitem(last=False)
+            self._sequences.move_to_end(key)
+            return sequence
+
+    def _check_text_presence(self, image_input: str) -> Optional[TextPresence]:
+        """
+        Run the text-presence pre-check on an image.
+
+        Returns:
+            Outcome of the pre-check, or None when it is disabled or the image
+            cannot be read; the engine call reports unreadable images.
+        """
+        if self.text_presence is None:
+            return None
+        config = self.text_presence
+        try:
+            image = load_image_from_input(image_input, target_side=config.analysis_side)
+            with ocr_stage(
+                "text_presence", width=image.width, height=image.height
+            ) as attributes:
+                presence = detect_text_presence(image, config)
+                attributes["has_text"] = presence.has_text
+                attributes["text_blocks"] = presence.text_blocks
+        except (OSError, ValueError):
+            return None
+        return presence
+
+    def _lacks_text(self, image_input: str) -> bool:
+        """Whether the text-presence pre-check rules out text in an image."""
+        presence = self._check_text_presence(image_input)
+        return presence is not None and not presence.has_text
+
+    def _skip_text_free(
+        self,
+        image_inputs: list[str],
+        results: list[Any],
+    ) -> list[int]:
+        """
+        Mark cache misses without text as skipped.
+
+        Returns:
+            Indices of the cache misses that still need OCR. Skipped images
+            get their ``TextPresence`` as result, which is not cached.
+        """
+        misses = []
+        for index, result in enumerate(results):
+            if result is not None:
+                continue
+            presence = self._check_text_presence(image_inputs[index])
+            if presence is not None and not presence.has_text:
+                results[index] = presence
+            else:
+                misses.append(index)
+        return misses
+
+    def _lookup_cache(
+        self,
+        image_inputs: list[str],
+        engine: str,
+        **options: Any,
+    ) -> tuple[list[Optional[str]], list[Any]]:
+        """
+        Look up cached results for image inputs.
+
+        Returns:
+            Cache key (None when caching is disabled or the input cannot be
+            read) and cached result (None on a miss) for every input.
+        """
+        if self.cache is None:
+            return [None] * len(image_inputs), [None] * len(image_inputs)
+        keys: list[Optional[str]] = []
+        results: list[Any] = []
+        with ocr_stage("cache_lookup", engine=engine) as attributes:
+            for image_input in image_inputs:
+                key = None
+                result = None
+                try:
+                    key = self.cache.make_key(
+                        image_input_digest(image_input),
+                        engine,
+                        **self._image_options(),
+                        **options,
+                    )
+                    result = self.cache.get(key)
+                except (OSError, ValueError):
+                    # Unreadable inputs are reported by the engine call
+                    key = None
+                keys.append(key)
+                results.append(result)
+            attributes["hits"] = sum(result is not None for result in results)
+            attributes["misses"] = len(results) - attributes["hits"]
+        return keys, results
+
+    def _store_cache(self, keys: list[Optional[str]], results: list[Any]) -> None:
+        """Cache successful results."""
+        if self.cache is None:
+            return
+        for key, result in zip(keys, results):
+            if key is not None and not isinstance(result, Exception):
+                self.cache.set(key, result)
+
+    def _image_options(self) -> dict[str, Any]:
+        """Cache key options for how images are prepared before OCR."""
+        return {
+            "target_side": self.target_image_side,
+            "preprocessing": (
+                None if self.preprocessing is None else asdict(self.preprocessing)
+            ),
+            "tiling": None if self.tiling is None else asdict(self.tiling),
+        }
+
+    def _routing_options(self, lang_list: list[str]) -> dict[str, Any]:
+        """Cache key options for routed OCR."""
+        return {
+            "lang_list": lang_list,
+            "backend": self.tesseract_backend.name,
+            "router": asdict(self.router),
+        }
+
+    def _merge_results(
+        self,
+        keys: list[Optional[str]],
+        results: list[Any],
+        misses: list[int],
+        computed: list[Union[str, Exception]],
+    ) -> None:
+        """Fill cache misses with computed results and cache them."""
+        for index, result in zip(misses, computed):
+            results[index] = result
+        self._store_cache([keys[index] for index in misses], computed)
@@ -0,0 +1,174 @@
+"""
+Automatic engine selection between tesseract and EasyOCR.
+
+A cheap classifier looks at a downscaled grayscale copy of the image: printed
+material (scans, screenshots, documents) has a uniform light background, high
+contrast and regularly spaced horizontal text lines, which is what tesseract is
+good at. Everything else (photos, signs, skewed or low contrast text) goes to
+EasyOCR. Optionally tesseract is tried first and the image is escalated to
+EasyOCR only when tesseract's confidence is low.
+"""
+
+from dataclasses import dataclass
+from typing import Iterable
+
+import numpy as np
+from PIL import Image
+
+from .preprocessing import estimate_skew_angle
+
+TESSERACT = "tesseract"
+EASYOCR = "easyocr"
+
+# EasyOCR (ISO 639-1 style) codes to tesseract traineddata names
+TESSERACT_LANGS = {
+    "ar": "ara",
+    "bn": "ben",
+    "ch_sim": "chi_sim",
+    "ch_tra": "chi_tra",
+    "cs": "ces",
+    "da": "dan",
+    "de": "deu",
+    "el": "ell",
+    "en": "eng",
+    "es": "spa",
+    "fa": "fas",
+    "fi": "fin",
+    "fr": "fra",
+    "he": "heb",
+    "hi": "hin",
+    "hu": "hun",
+    "id": "ind",
+    "it": "ita",
+    "ja": "jpn",
+    "ko": "kor",
+    "nl": "nld",
+    "no": "nor",
+    "pl": "pol",
+    "pt": "por",
+    "ro": "ron",
+    "ru": "rus",
+    "sv": "swe",
+    "th": "tha",
+    "tr": "tur",
+    "uk": "ukr",
+    "vi": "vie",
+}
+
+
+def to_tesseract_lang(lang_list: Iterable[str]) -> str:
+    """
+    Convert EasyOCR language codes into a tesseract language string.
+
+    Args:
+        lang_list: EasyOCR language codes, e.g. ``["en", "es"]``.
+
+    Returns:
+        Tesseract language string, e.g. ``"eng+spa"``. Unknown codes are passed
+        through unchanged; an empty list maps to English.
+    """
+    langs = [TESSERACT_LANGS.get(lang, lang) for lang in lang_list]
+    return "+".join(dict.fromkeys(langs)) or "eng"
+
+
+@dataclass
+class ImageProfile:
+    """Cheap statistics describing how document-like an image is."""
+
+    background_fraction: float
+    contrast: float
+    line_regularity: float
+    ink_fraction: float
+    skew_angle: float
+
+
+def profile_image(image: Image.Image, max_side: int = 256) -> ImageProfile:
+    """
+    Compute an image profile on a downscaled grayscale copy.
+
+    Args:
+        image: Image to profile.
+        max_side: Longest side of the downscaled copy.
+
+    Returns:
+        Background uniformity, contrast, horizontal line regularity, the
+        fraction of ink pixels and the estimated skew of the text lines.
+    """
+    if image.mode not in ("L", "RGB", "RGBA"):
+        image = image.convert("L")
+    factor = max(1, max(image.size) // max_side)
+    small = image.reduce(factor) if factor > 1 else image
+    pixels = np.asarray(small.convert("L"), dtype=np.float32) / 255.0
+
+    histogram = np.bincount((pixels * 15).astype(np.int64).ravel(), minlength=16)
+    background_bin = int(histogram.argmax())
+    background_fraction = float(histogram[background_bin] / pixels.size)
+
+    low, high = np.percentile(pixels, [2, 98])
+    contrast = float(high - low)
+
+    # Ink is whatever differs clearly from the dominant background level
+    background_level = (background_bin + 0.5) / 15
+    ink = np.abs(pixels - background_level) > max(contrast / 2, 0.1)
+    ink_fraction = float(ink.mean())
+
+    # Printed text produces alternating ink/no-ink rows; compare the variance
+    # of row ink density with the variance expected if ink were scattered.
+    rows = ink.mean(axis=1)
+    expected = ink_fraction * (1 - ink_fraction)
+    line_regularity = float(rows.var() / expected) if expected > 0 else 0.0
+
+    # A coarse search is enough to tell straight pages from skewed ones
+    skew_angle = estimate_skew_angle(ink, step=1.0)
+
+    return ImageProfile(
+        background_fraction=background_fraction,
+        contrast=contrast,
+        line_regularity=line_regularity,
+        ink_fraction=ink_fraction,
+        skew_angle=skew_angle,
+    )
+
+
+@dataclass
+class EngineRouter:
+    """
+    Rules choosing the OCR engine for an image.
+
+    Attributes:
+        min_background_fraction: Share of pixels at the dominant gray level for
+            an image to count as printed material.
+        min_contrast: Minimum spread between dark and light pixels.
+        min_line_regularity: Minimum row-density variance relative to scattered
+            ink; horizontal text lines push it well above zero.
+        max_ink_fraction: Images with more ink than this are treated as photos.
+        max_skew_angle: Text lines rotated by more degrees than this are
+            treated as skewed, which tesseract reads poorly without deskewing.
+        escalate: When an image is routed to tesseract, rerun it with EasyOCR
+            if tesseract's confidence is below ``escalation_confidence``.
+        escalation_confidence: Tesseract mean word confidence (0-100) below
+            which EasyOCR is run.
+    """
+
+    min_background_fraction: float = 0.5
+    min_contrast: float = 0.4
+    min_line_regularity: float = 0.05
+    max_ink_fraction: float = 0.35
+    max_skew_angle: float = 2.0
+    escalate: bool = True
+    escalation_confidence: float = 60.0
+
+    def choose(self, profile: ImageProfile) -> str:
+        """Return ``"tesseract"`` for printed material, ``"easyocr"`` otherwise."""
+        printed = (
+            profile.background_fraction >= self.min_background_fraction
+            and profile.contrast >= self.min_contrast
+            and profile.line_regularity >= self.min_line_regularity
+            and 0 < profile.ink_fraction <= self.max_ink_fraction
+            and abs(profile.skew_angle) <= self.max_skew_angle
+        )
+        return TESSERACT if printed else EASYOCR
+
+    def route(self, image: Image.Image) -> str:
+        """Profile an image and choose its engine."""
+        return self.choose(profile_image(image))
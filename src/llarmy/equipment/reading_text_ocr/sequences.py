@@ -0,0 +1,239 @@
+"""
+Incremental OCR of frame sequences.
+
+Agents watching screen recordings or camera feeds send consecutive frames
+that are mostly identical. A ``FrameSequence`` splits every frame into the
+same overlapping tiles and summarizes the frame with a block hash: the mean
+gray level of small square cells. Only tiles whose cells changed since the
+previous frame are OCRed again; the other tiles reuse their previous words,
+and frames without changes do not touch the engine at all.
+The merged text is compared line by line with the previous frame, so callers
+see which lines appeared and disappeared, and the cost of a frame follows the
+amount of change instead of the frame size.
+"""
+
+import difflib
+import threading
+from dataclasses import dataclass
+from contextlib import AbstractContextManager
+from typing import Callable, Optional, Sequence
+
+import numpy as np
+from PIL import Image
+
+from .documents import ocr_document_pages
+from .instrumentation import ocr_stage
+from .layout import OCRLayout
+from .tiling import iter_tiles, merge_tile_layouts, tile_boxes
+
+TileEngine = Callable[[Image.Image], OCRLayout]
+
+
+@dataclass(frozen=True)
+class FrameSequenceConfig:
+    """
+    How frames are compared and split into tiles.
+
+    Attributes:
+        tile_size: Side of the square tiles in pixels.
+        overlap: Pixels shared by neighbouring tiles, see ``TilingConfig``.
+        cell_size: Side in pixels of the cells of the block hash.
+        change_threshold: Change of a cell's mean gray level (0-1) for its
+            tiles to be OCRed again. Keeps video noise and compression
+            artifacts from invalidating tiles.
+        max_workers: Threads OCRing changed tiles in parallel.
+        duplicate_overlap: See ``TilingConfig``.
+    """
+
+    tile_size: int = 512
+    overlap: int = 64
+    cell_size: int = 16
+    change_threshold: float = 0.03
+    max_workers: Optional[int] = None
+    duplicate_overlap: float = 0.5
+
+    def __post_init__(self) -> None:
+        if not 0 <= self.overlap < self.tile_size:
+            raise ValueError("overlap must be between 0 and tile_size")
+        if self.cell_size < 1:
+            raise ValueError("cell_size must be at least 1")
+
+
+@dataclass
+class FrameResult:
+    """
+    OCR result of a frame and how its text differs from the previous frame.
+
+    Attributes:
+        index: Position of the frame in the sequence, starting at 0.
+        layout: Words of the whole frame.
+        added: Lines that are new since the previous frame, in reading order.
+        removed: Lines of the previous frame that are gone.
+        changed_tiles: Tiles that were OCRed for this frame.
+        tiles: Tiles the frame is split into.
+    """
+
+    index: int
+    layout: OCRLayout
+    added: list[str]
+    removed: list[str]
+    changed_tiles: int
+    tiles: int
+
+
+def block_hash(image: Image.Image, cell_size: int) -> np.ndarray:
+    """
+    Mean gray level (0-1) of every ``cell_size`` square of an image.
+
+    Cells at the right and bottom edges cover the remaining pixels.
+    """
+    gray = image.convert("L")
+    cells = gray.reduce(cell_size) if cell_size > 1 else gray
+    return np.asarray(cells, dtype=np.float32) / 255.0
+
+
+def diff_lines(
+    previous: Sequence[str],
+    current: Sequence[str],
+) -> tuple[list[str], list[str]]:
+    """
+    Compare the lines of two frames.
+
+    Returns:
+        Lines only in ``current`` and lines only in ``previous``, each in
+        reading order.
+    """
+    matcher = difflib.SequenceMatcher(a=previous, b=current, autojunk=False)
+    added: list[str] = []
+    removed: list[str] = []
+    for tag, previous_start, previous_end, start, end in matcher.get_opcodes():
+        if tag in ("replace", "delete"):
+            removed.extend(previous[previous_start:previous_end])
+        if tag in ("replace", "insert"):
+            added.extend(current[start:end])
+    return added, removed
+
+
+class FrameSequence:
+    """
+    OCR state of one sequence of frames, e.g. one screen recording.
+
+    Frames are processed one at a time, in the order they are passed. A frame
+    of a different size starts the sequence over.
+    """
+
+    def __init__(self, config: Optional[FrameSequenceConfig] = None) -> None:
+        """
+        Initialize an empty sequence.
+
+        Args:
+            config: Tile geometry and change detection.
+        """
+        self.config = config if config is not None else FrameSequenceConfig()
+        self.frames = 0
+        self._size: Optional[tuple[int, int]] = None
+        self._cells: Optional[np.ndarray] = None
+        self._boxes: list[tuple[int, int, int, int]] = []
+        self._tile_layouts: list[OCRLayout] = []
+        self._layout = OCRLayout.empty(0, 0)
+        self._lines: list[str] = []
+        self._lock = threading.Lock()
+
+    def process(
+        self,
+        image: Image.Image,
+        open_engine: Callable[[], AbstractContextManager[TileEngine]],
+    ) -> FrameResult:
+        """
+        OCR the tiles of a frame that changed and merge them with the rest.
+
+        Args:
+            image: Next frame of the sequence.
+            open_engine: Called only when tiles changed; returns a context
+                manager, e.g. a reader lease, yielding the engine call that
+                returns the layout of one tile. Use the same engine and
+                languages for every frame of a sequence.
+
+        Returns:
+            Layout of the frame and the lines added and removed since the
+            previous frame.
+
+        Raises:
+            Exception: The first error raised while OCRing a tile. The
+                sequence is left at the previous frame.
+        """
+        config = self.config
+        with self._lock:
+            width, height = image.size
+            cells = block_hash(image, config.cell_size)
+            if image.size != self._size or self._cells is None:
+                boxes = tile_boxes(width, height, config.tile_size, config.overlap)
+                changed = list(range(len(boxes)))
+                tile_layouts = [OCRLayout.empty(0, 0)] * len(boxes)
+                previous_lines: list[str] = []
+            else:
+                boxes = self._boxes
+                changed = self._changed_tiles(cells, self._cells)
+                tile_layouts = list(self._tile_layouts)
+                previous_lines = self._lines
+
+            with ocr_stage("frame", tiles=len(boxes), changed_tiles=len(changed)):
+                if changed:
+                    changed_boxes = [boxes[index] for index in changed]
+                    with open_engine() as ocr_tile:
+                        for position, tile_layout in ocr_document_pages(
+                            iter_tiles(image, changed_boxes),
+                            ocr_tile,
+                            max_workers=config.max_workers,
+                        ):
+                            if isinstance(tile_layout, Exception):
+                                raise tile_layout
+                            tile_layouts[changed[position]] = tile_layout
+                    layout = merge_tile_layouts(
+                        list(zip(boxes, tile_layouts)),
+                        width,
+                        height,
+                        config.overlap,
+                        config.duplicate_overlap,
+                    )
+                    lines = [line.text for line in layout.lines()]
+                else:
+                    layout, lines = self._layout, previous_lines
+
+            added, removed = diff_lines(previous_lines, lines)
+            result = FrameResult(
+                index=self.frames,
+                layout=layout,
+                added=added,
+                removed=removed,
+                changed_tiles=len(changed),
+                tiles=len(boxes),
+            )
+            self.frames += 1
+            self._size = image.size
+            self._cells = cells
+            self._boxes = boxes
+            self._tile_layouts = tile_layouts
+            self._layout = layout
+            self._lines = lines
+            return result
+
+    def reset(self) -> None:
+        """Forget the previous frame, so the next one is OCRed whole."""
+        with self._lock:
+            self._size = None
+            self._cells = None
+
+    def _changed_tiles(self, cells: np.ndarray, previous: np.ndarray) -> list[int]:
+        """Indices of the tiles containing a cell that changed noticeably."""
+        cell_size = self.config.cell_size
+        changed_cells = np.abs(cells - previous) > self.config.change_threshold
+        changed = []
+        for index, (left, top, right, bottom) in enumerate(self._boxes):
+            window = changed_cells[
+                top // cell_size : -(-bottom // cell_size),
+                left // cell_size : -(-right // cell_size),
+            ]
+            if window.any():
+                changed.append(index)
+        return changed
@@ -0,0 +1,576 @@
+"""
+OCR service mode: one long-lived process serving OCR to many agents.
+
+Every ``ReadingTextOCRToolSpec`` loads its own EasyOCR readers and tesseract
+engines, so many agent processes on a host hold many copies of the same
+models. ``OCRServer`` keeps a single tool spec with warm engines behind a
+local Unix socket (or a localhost TCP port), and
+``RemoteReadingTextOCRToolSpec`` is a drop-in replacement for the tool spec
+that forwards every tool call to it.
+
+The server's tool spec micro-batches concurrent general_purpose_extract_text
+requests from different clients with the same languages into one batched
+EasyOCR call (see ``BatchingConfig``).
+
+Requests travel over ``multiprocessing.connection``, which pickles them, so
+the server never runs without a shared key: clients and server authenticate
+each other with it before anything is unpickled. The key is taken from
+``LLARMY_OCR_AUTHKEY`` when not given. A Unix socket server without a key
+generates one and writes it next to the socket (``<socket>.key``, mode 0600),
+where clients of the same user find it. The default socket lives in a private
+directory (``$XDG_RUNTIME_DIR/llarmy``, or ``llarmy-<uid>`` in the temporary
+directory), and sockets are created with mode 0600. Run a server with::
+
+    python -m llarmy.equipment.reading_text_ocr.service --warmup en en,es
+"""
+
+import argparse
+import asyncio
+import functools
+import inspect
+import json
+import os
+import queue
+import secrets
+import stat
+import tempfile
+import threading
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Client, Connection, Listener
+from pathlib import Path
+from typing import Any, Callable, Optional, Union
+
+from llama_index.core.tools.tool_spec.base import BaseToolSpec
+
+from .batching import BatchingConfig
+from .images import is_base64_input, is_image_handle
+from .models import EasyOCRModelManager
+from .reading_text_ocr import ReadingTextOCRToolSpec
+
+Address = Union[str, tuple[str, int]]
+
+AUTHKEY_ENV = "LLARMY_OCR_AUTHKEY"
+SOCKET_NAME = "ocr.sock"
+
+SERVICE_ERROR = "OCR Service Error"
+
+# Tool calls clients may make: the sync tools of the spec
+SERVICE_METHODS = frozenset(
+    functions[0] for functions in ReadingTextOCRToolSpec.spec_functions
+)
+
+
+def parse_address(address: str) -> Address:
+    """
+    Parse a service address.
+
+    Args:
+        address: Unix socket path, or ``host:port`` for TCP.
+
+    Returns:
+        Socket path or ``(host, port)`` tuple.
+    """
+    host, separator, port = address.rpartition(":")
+    if separator and port.isdigit() and "/" not in address:
+        return host or "127.0.0.1", int(port)
+    return address
+
+
+def runtime_dir() -> str:
+    """
+    Return the private directory of the default socket, creating it.
+
+    Raises:
+        PermissionError: If the directory is not owned by the current user or
+            other users can access it.
+    """
+    base = os.environ.get("XDG_RUNTIME_DIR")
+    path = (
+        os.path.join(base, "llarmy")
+        if base
+        else os.path.join(tempfile.gettempdir(), f"llarmy-{os.getuid()}")
+    )
+    os.makedirs(path, mode=0o700, exist_ok=True)
+    info = os.lstat(path)
+    if (
+        not stat.S_ISDIR(info.st_mode)
+        or info.st_uid != os.getuid()
+        or info.st_mode & 0o077
+    ):
+        raise PermissionError(f"{path} must be a directory private to this user")
+    return path
+
+
+def default_address() -> str:
+    """Return the default Unix socket path, in ``runtime_dir``."""
+    return os.path.join(runtime_dir(), SOCKET_NAME)
+
+
+def authkey_path(address: str) -> str:
+    """Return the key file of a Unix socket server."""
+    return f"{address}.key"
+
+
+def _env_authkey() -> Optional[bytes]:
+    """Return ``LLARMY_OCR_AUTHKEY``, if set."""
+    value = os.environ.get(AUTHKEY_ENV)
+    return value.encode() if value else None
+
+
+def _read_authkey(path: str) -> Optional[bytes]:
+    """
+    Read a key file written by a server of the current user.
+
+    Raises:
+        PermissionError: If the file belongs to another user or other users
+            can access it, since its key could then be forged.
+    """
+    try:
+        with open(path, "rb") as file:
+            info = os.fstat(file.fileno())
+            if info.st_uid != os.getuid() or info.st_mode & 0o077:
+                raise PermissionError(f"{path} must be private to this user")
+            return file.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def _write_authkey(path: str) -> bytes:
+    """Generate a random key and write it to a new file only the user can read."""
+    key = secrets.token_hex(32).encode()
+    if os.path.lexists(path):
+        os.unlink(path)
+    descriptor = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    with os.fdopen(descriptor, "wb") as file:
+        file.write(key)
+    return key
+
+
+class OCRServiceError(RuntimeError):
+    """Raised by ``RemoteReadingTextOCRToolSpec.call`` when the server fails."""
+
+
+class OCRServer:
+    """
+    Local OCR server holding one set of warm engines for many clients.
+
+    Every client connection is served on its own thread and calls the shared
+    tool spec, so concurrent requests batch together in its ``batcher``.
+    """
+
+    def __init__(
+        self,
+        tool_spec: Optional[ReadingTextOCRToolSpec] = None,
+        address: Optional[Address] = None,
+        authkey: Optional[bytes] = None,
+        batching: Optional[BatchingConfig] = None,
+    ) -> None:
+        """
+        Initialize the OCR server.
+
+        Args:
+            tool_spec: Tool spec serving the requests. Defaults to a new tool
+                spec using the process-wide reader pool and executor, with
+                ``batching``.
+            address: Unix socket path or ``(host, port)`` to listen on.
+                Defaults to ``default_address()``.
+            authkey: Key clients must present. Defaults to
+                ``LLARMY_OCR_AUTHKEY``; Unix socket servers without a key
+                generate one in ``<socket>.key``. Required for TCP addresses.
+            batching: Micro-batching of the default tool spec. Defaults to
+                ``BatchingConfig()``.
+        """
+        self._owns_tool_spec = tool_spec is None
+        self.tool_spec = (
+            tool_spec
+            if tool_spec is not None
+            else ReadingTextOCRToolSpec(
+                batching=batching if batching is not None else BatchingConfig()
+            )
+        )
+        self.address = address if address is not None else default_address()
+        self.authkey = authkey if authkey is not None else _env_authkey()
+        if self.authkey is None and not isinstance(self.address, str):
+            raise ValueError(
+                f"An authkey is required for TCP addresses ({AUTHKEY_ENV})"
+            )
+        self._listener: Optional[Listener] = None
+        self._connections: set[Connection] = set()
+        self._lock = threading.Lock()
+        self._closed = threading.Event()
+
+    @property
+    def listening_address(self) -> Address:
+        """Address the server is bound to, e.g. with the port picked for port 0."""
+        if self._listener is None:
+            raise RuntimeError("The OCR server is not started")
+        return self._listener.address
+
+    def start(self) -> "OCRServer":
+        """
+        Bind the socket and start accepting clients on a background thread.
+
+        Unix sockets are created with mode 0600; without an authkey, a new key
+        is written to ``<socket>.key`` first.
+        """
+        if isinstance(self.address, str):
+            if os.path.lexists(self.address):
+                # Stale socket left behind by a server that was killed
+                os.unlink(self.address)
+            if self.authkey is None:
+                self.authkey = _write_authkey(authkey_path(self.address))
+            # No window in which the socket is accessible to other users
+            umask = os.umask(0o177)
+            try:
+                self._listener = Listener(self.address, authkey=self.authkey)
+            finally:
+                os.umask(umask)
+        else:
+            self._listener = Listener(self.address, authkey=self.authkey)
+        threading.Thread(
+            target=self._accept, name="llarmy-ocr-accept", daemon=True
+        ).start()
+        return self
+
+    def serve_forever(self) -> None:
+        """Start the server and block until it is closed."""
+        if self._listener is None:
+            self.start()
+        self._closed.wait()
+
+    def close(self) -> None:
+        """Stop accepting clients, close open connections and flush batches."""
+        if self._closed.is_set():
+            return
+        self._closed.set()
+        if self._listener is not None:
+            # Closing the socket does not interrupt a blocking accept: connect
+            # once so the accept thread wakes up and sees the server is closed
+            try:
+                Client(self._listener.address, authkey=self.authkey).close()
+            except OSError:
+                pass
+            self._listener.close()
+        with self._lock:
+            connections = list(self._connections)
+        for connection in connections:
+            connection.close()
+        if self._owns_tool_spec:
+            self.tool_spec.close()
+
+    def __enter__(self) -> "OCRServer":
+        return self.start()
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def handle(self, method: str, args: tuple, kwargs: dict[str, Any]) -> Any:
+        """
+        Serve one tool call.
+
+        Args:
+            method: Name of a sync tool of the tool spec.
+            args: Positional arguments of the call.
+            kwargs: Keyword arguments of the call.
+
+        Returns:
+            The tool result.
+
+        Raises:
+            ValueError: If the method is not a tool.
+            TypeError: If the arguments do not match the tool.
+        """
+        if method not in SERVICE_METHODS:
+            raise ValueError(f"Unknown OCR service method: {method}")
+        return getattr(self.tool_spec, method)(*args, **kwargs)
+
+    def _accept(self) -> None:
+        """Accept client connections until the server is closed."""
+        assert self._listener is not None
+        while not self._closed.is_set():
+            try:
+                connection = self._listener.accept()
+            except (OSError, EOFError, AuthenticationError):
+                # Listener closed, or a client failed authentication
+                if self._closed.is_set():
+                    return
+                continue
+            with self._lock:
+                self._connections.add(connection)
+            threading.Thread(
+                target=self._serve, args=(connection,), daemon=True
+            ).start()
+
+    def _serve(self, connection: Connection) -> None:
+        """Answer the requests of one client until it disconnects."""
+        try:
+            while True:
+                try:
+                    method, args, kwargs = connection.recv()
+                except (EOFError, OSError):
+                    return
+                try:
+                    response = ("ok", self.handle(method, args, kwargs))
+                except Exception as e:
+                    response = ("error", f"{type(e).__name__}: {e!s}")
+                connection.send(response)
+        except OSError:
+            return
+        finally:
+            with self._lock:
+                self._connections.discard(connection)
+            connection.close()
+
+
+def _client_path(image_input: Any) -> Any:
+    """Make a relative file path absolute; base64 inputs and handles are kept."""
+    if (
+        not isinstance(image_input, str)
+        or is_base64_input(image_input)
+        or is_image_handle(image_input)
+    ):
+        return image_input
+    return str(Path(image_input).resolve())
+
+
+def _remote_tool(name: str) -> Callable[..., Any]:
+    """Create a client method forwarding a sync tool to the server."""
+
+    @functools.wraps(getattr(ReadingTextOCRToolSpec, name))
+    def tool(self: "RemoteReadingTextOCRToolSpec", *args: Any, **kwargs: Any) -> Any:
+        return self._call_tool(name, args, kwargs)
+
+    return tool
+
+
+def _remote_async_tool(name: str) -> Callable[..., Any]:
+    """Create a client coroutine forwarding a tool to the server from a thread."""
+
+    @functools.wraps(getattr(ReadingTextOCRToolSpec, f"a{name}"))
+    async def tool(
+        self: "RemoteReadingTextOCRToolSpec", *args: Any, **kwargs: Any
+    ) -> Any:
+        return await asyncio.to_thread(self._call_tool, name, args, kwargs)
+
+    return tool
+
+
+class RemoteReadingTextOCRToolSpec(BaseToolSpec):
+    """
+    Reading Text OCR tool spec backed by an ``OCRServer``.
+
+    Exposes the same tools, with the same names, arguments and descriptions,
+    as ``ReadingTextOCRToolSpec``, so agents can use either. Relative image
+    paths are made absolute here, since the server, which runs on the same
+    host, has its own working directory. Frame sequence ids are prefixed with
+    an id of this client, so clients using the same sequence id (or the
+    default one) do not interleave their frames on the server.
+    """
+
+    spec_functions = ReadingTextOCRToolSpec.spec_functions
+
+    def __init__(
+        self,
+        address: Optional[Address] = None,
+        authkey: Optional[bytes] = None,
+        max_connections: int = 8,
+    ) -> None:
+        """
+        Initialize the remote tool spec.
+
+        Args:
+            address: Unix socket path or ``(host, port)`` of the server.
+                Defaults to ``default_address()``.
+            authkey: Key of the server. Defaults to ``LLARMY_OCR_AUTHKEY``,
+                then to the key file next to a Unix socket, read when the
+                first call connects.
+            max_connections: Connections kept open for concurrent calls.
+        """
+        self.address = address if address is not None else default_address()
+        self.authkey = authkey
+        self.max_connections = max_connections
+        self.client_id = secrets.token_hex(8)
+        self._idle: queue.LifoQueue[Connection] = queue.LifoQueue()
+
+    def call(self, method: str, *args: Any, **kwargs: Any) -> Any:
+        """
+        Call a tool on the server.
+
+        Raises:
+            OSError: If the server cannot be reached.
+            AuthenticationError: If the server does not accept the key, or
+                does not know it.
+            OCRServiceError: If the server failed to run the tool.
+        """
+        try:
+            connection = self._idle.get_nowait()
+        except queue.Empty:
+            connection = Client(self.address, authkey=self._get_authkey())
+        try:
+            connection.send((method, args, kwargs))
+            status, result = connection.recv()
+        except (EOFError, OSError):
+            connection.close()
+            raise
+        if self._idle.qsize() < self.max_connections:
+            self._idle.put(connection)
+        else:
+            connection.close()
+        if status != "ok":
+            raise OCRServiceError(result)
+        return result
+
+    def close(self) -> None:
+        """Close the idle connections."""
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+    def _get_authkey(self) -> bytes:
+        """
+        Key of the server; connections are never made without one.
+
+        Raises:
+            OCRServiceError: If no key is given, set or found.
+            PermissionError: If the key file is not private to this user.
+        """
+        if self.authkey is None:
+            self.authkey = _env_authkey()
+        if self.authkey is None and isinstance(self.address, str):
+            self.authkey = _read_authkey(authkey_path(self.address))
+        if self.authkey is None:
+            raise OCRServiceError(
+                f"No authkey for the OCR server at {self.address}: pass one, "
+                f"set {AUTHKEY_ENV} or start the server first"
+            )
+        return self.authkey
+
+    def _call_tool(self, method: str, args: tuple, kwargs: dict[str, Any]) -> Any:
+        """Call a tool, reporting failures the way the local tools do."""
+        try:
+            args, kwargs = self._tool_arguments(method, args, kwargs)
+            return self.call(method, *args, **kwargs)
+        except (OSError, EOFError, AuthenticationError, OCRServiceError) as e:
+            return f"{SERVICE_ERROR}: {e!s}"
+
+    def _tool_arguments(
+        self, method: str, args: tuple, kwargs: dict[str, Any]
+    ) -> tuple[tuple, dict[str, Any]]:
+        """
+        Arguments of a tool call as the server must see them.
+
+        Relative paths are resolved against this process's working directory,
+        and frame sequence ids are made private to this client. Calls whose
+        arguments do not match the tool are sent unchanged, for the server to
+        report.
+        """
+        try:
+            bound = inspect.signature(getattr(ReadingTextOCRToolSpec, method)).bind(
+                None, *args, **kwargs
+            )
+        except TypeError:
+            return args, kwargs
+        if method == "extract_frame_text":
+            bound.apply_defaults()
+            bound.arguments["sequence_id"] = (
+                f"{self.client_id}/{bound.arguments['sequence_id']}"
+            )
+        arguments = bound.arguments
+        for name in ("image_path_or_base64", "document_path_or_base64"):
+            if name in arguments:
+                arguments[name] = _client_path(arguments[name])
+        if isinstance(arguments.get("images_paths_or_base64"), list):
+            arguments["images_paths_or_base64"] = [
+                _client_path(image_input)
+                for image_input in arguments["images_paths_or_base64"]
+            ]
+        return bound.args[1:], bound.kwargs
+
+    register_image = _remote_tool("register_image")
+    extract_text = _remote_tool("extract_text")
+    extract_text_layout = _remote_tool("extract_text_layout")
+    query_text_region = _remote_tool("query_text_region")
+    extract_frame_text = _remote_tool("extract_frame_text")
+    printed_material_extract_text = _remote_tool("printed_material_extract_text")
+    general_purpose_extract_text = _remote_tool("general_purpose_extract_text")
+    printed_material_extract_text_batch = _remote_tool(
+        "printed_material_extract_text_batch"
+    )
+    general_purpose_extract_text_batch = _remote_tool(
+        "general_purpose_extract_text_batch"
+    )
+    printed_document_extract_text = _remote_tool("printed_document_extract_text")
+    general_purpose_document_extract_text = _remote_tool(
+        "general_purpose_document_extract_text"
+    )
+
+    aregister_image = _remote_async_tool("register_image")
+    aextract_text = _remote_async_tool("extract_text")
+    aextract_text_layout = _remote_async_tool("extract_text_layout")
+    aquery_text_region = _remote_async_tool("query_text_region")
+    aextract_frame_text = _remote_async_tool("extract_frame_text")
+    aprinted_material_extract_text = _remote_async_tool("printed_material_extract_text")
+    ageneral_purpose_extract_text = _remote_async_tool("general_purpose_extract_text")
+    aprinted_material_extract_text_batch = _remote_async_tool(
+        "printed_material_extract_text_batch"
+    )
+    ageneral_purpose_extract_text_batch = _remote_async_tool(
+        "general_purpose_extract_text_batch"
+    )
+    aprinted_document_extract_text = _remote_async_tool("printed_document_extract_text")
+    ageneral_purpose_document_extract_text = _remote_async_tool(
+        "general_purpose_document_extract_text"
+    )
+
+
+def main() -> None:
+    """Run an OCR server until interrupted."""
+    parser = argparse.ArgumentParser(description="Serve the Reading Text OCR tools.")
+    parser.add_argument(
+        "--address",
+        help="Unix socket path or host:port (default: a socket in a private "
+        "runtime directory)",
+    )
+    parser.add_argument(
+        "--warmup",
+        nargs="*",
+        default=["en"],
+        metavar="LANGS",
+        help="Comma separated EasyOCR language sets to preload, e.g. en en,es",
+    )
+    parser.add_argument(
+        "--model-dir",
+        help="Load EasyOCR models offline from this directory (see models.py)",
+    )
+    parser.add_argument("--max-batch-size", type=int, default=16)
+    parser.add_argument("--max-batch-delay", type=float, default=0.005, help="Seconds")
+    args = parser.parse_args()
+
+    lang_sets = [langs.split(",") for langs in args.warmup]
+    print("Warming up OCR engines...")
+    if args.model_dir is not None:
+        models = EasyOCRModelManager(args.model_dir, lang_sets)
+        if not models.start():
+            print(f"OCR models not ready: {json.dumps(models.status())}")
+    server = OCRServer(
+        address=None if args.address is None else parse_address(args.address),
+        batching=BatchingConfig(
+            max_batch_size=args.max_batch_size, max_delay=args.max_batch_delay
+        ),
+    )
+    if args.model_dir is None:
+        server.tool_spec.warmup(lang_sets)
+    server.start()
+    print(f"OCR server listening on {server.listening_address}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,377 @@
+"""
+Tesseract backends for the Reading Text OCR equipment.
+
+``pytesseract`` writes every image to a temporary file and forks a new
+``tesseract`` process that reloads its traineddata on each call. When the
+optional ``tesserocr`` bindings are installed, a pool of initialized in-process
+engines per language is used instead, and the subprocess path remains the
+fallback.
+"""
+
+import importlib.util
+import queue
+import tempfile
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Iterator, Optional, Protocol, Union
+
+from PIL import Image
+import pytesseract
+
+TESSERACT_PAGE_SEPARATOR = "\f"
+
+# Columns of tesseract's image_to_data output, in its order
+TESSERACT_DATA_KEYS = (
+    "level",
+    "page_num",
+    "block_num",
+    "par_num",
+    "line_num",
+    "word_num",
+    "left",
+    "top",
+    "width",
+    "height",
+    "conf",
+    "text",
+)
+
+
+class TesseractBackend(Protocol):
+    """Interface shared by the tesseract backends."""
+
+    name: str
+
+    def image_to_string(self, image: Image.Image, lang: str = "eng") -> str:
+        """Run tesseract on a single image."""
+
+    def image_to_string_batch(
+        self,
+        images: list[Image.Image],
+        lang: str = "eng",
+    ) -> list[Union[str, Exception]]:
+        """Run tesseract over many images, reporting errors per image."""
+
+    def image_to_string_with_confidence(
+        self,
+        image: Image.Image,
+        lang: str = "eng",
+    ) -> tuple[str, float]:
+        """Run tesseract and return the text with its mean word confidence."""
+
+    def image_to_data(
+        self,
+        image: Image.Image,
+        lang: str = "eng",
+    ) -> dict[str, list[Any]]:
+        """Run tesseract and return word boxes in ``image_to_data`` dict format."""
+
+
+class PytesseractBackend:
+    """Tesseract through the ``tesseract`` command line, one process per call."""
+
+    name = "pytesseract"
+
+    def image_to_string(self, image: Image.Image, lang: str = "eng") -> str:
+        """Run tesseract on a single image."""
+        return pytesseract.image_to_string(image, lang=lang).strip()
+
+    def image_to_string_batch(
+        self,
+        images: list[Image.Image],
+        lang: str = "eng",
+    ) -> list[Union[str, Exception]]:
+        """
+        Run tesseract over many images in a single process.
+
+        The images are written once to a temporary directory and passed to one
+        tesseract invocation as an image list file, so traineddata is loaded a
+        single time for the whole batch. Pages come back separated by form
+        feeds; if the output cannot be split unambiguously, or the batch run
+        fails, the images are processed one by one instead.
+
+        Args:
+            images: Loaded images.
+            lang: Tesseract language code(s), e.g. ``"eng"`` or ``"eng+spa"``.
+
+        Returns:
+            Extracted text or the raised exception, in input order.
+        """
+        if not images:
+            return []
+
+        pages = None
+        try:
+            with tempfile.TemporaryDirectory(prefix="llarmy_tess_") as tmp_dir:
+                paths = []
+                for index, image in enumerate(images):
+                    path = Path(tmp_dir) / f"{index:06d}.png"
+                    image.save(path, format="PNG")
+                    paths.append(str(path))
+                list_path = Path(tmp_dir) / "images.txt"
+                list_path.write_text("\n".join(paths) + "\n", encoding="utf-8")
+                output = pytesseract.image_to_string(str(list_path), lang=lang)
+            pages = output.split(TESSERACT_PAGE_SEPARATOR)
+            if len(pages) == len(images) + 1 and not pages[-1].strip():
+                pages = pages[:-1]
+        except (OSError, pytesseract.TesseractError):
+            pages = None
+
+        if pages is not None and len(pages) == len(images):
+            return [page.strip() for page in pages]
+        return _per_image(self, images, lang)
+
+    def image_to_string_with_confidence(
+        self,
+        image: Image.Image,
+        lang: str = "eng",
+    ) -> tuple[str, float]:
+        """
+        Run tesseract once and return the text with its mean word confidence.
+
+        The text is rebuilt from ``image_to_data`` so tesseract runs a single
+        time for both outputs.
+        """
+        data = self.image_to_data(image, lang=lang)
+        lines: dict[tuple[int, int, int], list[str]] = {}
+        confidences = []
+        for index, word in enumerate(data["text"]):
+            confidence = float(data["conf"][index])
+            if confidence < 0 or not word.strip():
+                continue
+            line = (
+                data["block_num"][index],
+                data["par_num"][index],
+                data["line_num"][index],
+            )
+            lines.setdefault(line, []).append(word)
+            confidences.append(confidence)
+        text = "\n".join(" ".join(words) for words in lines.values())
+        return text, sum(confidences) / len(confidences) if confidences else 0.0
+
+    def image_to_data(
+        self,
+        image: Image.Image,
+        lang: str = "eng",
+    ) -> dict[str, list[Any]]:
+        """Run tesseract and return word boxes in ``image_to_data`` dict format."""
+        return pytesseract.image_to_data(
+            image, lang=lang, output_type=pytesseract.Output.DICT
+        )
+
+
+class TesserocrBackend:
+    """
+    In-process tesseract through ``tesserocr`` with pooled engines.
+
+    Up to ``max_engines_per_lang`` initialized ``PyTessBaseAPI`` instances are
+    kept per language string; a call borrows one, and waits when all of them
+    are busy. Engine initialization (loading traineddata) happens once per
+    engine instead of once per call.
+    """
+
+    name = "tesserocr"
+
+    def __init__(
+        self,
+        max_engines_per_lang: int = 4,
+        tessdata_path: Optional[str] = None,
+    ) -> None:
+        """
+        Initialize the tesserocr backend.
+
+        Args:
+            max_engines_per_lang: Maximum engines created per language string.
+            tessdata_path: Directory holding the traineddata files. Defaults
+                to the location tesserocr was built with.
+
+        Raises:
+            ImportError: If tesserocr is not installed.
+        """
+        import tesserocr
+
+        if max_engines_per_lang < 1:
+            raise ValueError("max_engines_per_lang must be at least 1")
+        self._tesserocr = tesserocr
+        self.max_engines_per_lang = max_engines_per_lang
+        self.tessdata_path = tessdata_path
+        self._idle: dict[str, queue.LifoQueue[Any]] = {}
+        self._created: dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def image_to_string(self, image: Image.Image, lang: str = "eng") -> str:
+        """Run tesseract on a single image with a pooled engine."""
+        with self._engine(lang) as api:
+            try:
+                api.SetImage(image)
+                return api.GetUTF8Text().strip()
+            except RuntimeError as e:
+                raise pytesseract.TesseractError(-1, str(e)) from e
+            finally:
+                api.Clear()
+
+    def image_to_string_batch(
+        self,
+        images: list[Image.Image],
+        lang: str = "eng",
+    ) -> list[Union[str, Exception]]:
+        """Run tesseract over many images, reusing one pooled engine."""
+        return _per_image(self, images, lang)
+
+    def image_to_string_with_confidence(
+        self,
+        image: Image.Image,
+        lang: str = "eng",
+    ) -> tuple[str, float]:
+        """Run tesseract and return the text with its mean word confidence."""
+        with self._engine(lang) as api:
+            try:
+                api.SetImage(image)
+                return api.GetUTF8Text().strip(), float(api.MeanTextConf())
+            except RuntimeError as e:
+                raise pytesseract.TesseractError(-1, str(e)) from e
+            finally:
+                api.Clear()
+
+    def image_to_data(
+        self,
+        image: Image.Image,
+        lang: str = "eng",
+    ) -> dict[str, list[Any]]:
+        """
+        Run tesseract and return word boxes in ``image_to_data`` dict format.
+
+        Only word rows are produced; block, paragraph and line numbers are
+        counted from the result iterator the way tesseract numbers them.
+        """
+        ril = self._tesserocr.RIL
+        data: dict[str, list[Any]] = {key: [] for key in TESSERACT_DATA_KEYS}
+        block = paragraph = line = word = 0
+        with self._engine(lang) as api:
+            try:
+                api.SetImage(image)
+                api.Recognize()
+                for result in self._tesserocr.iterate_level(
+                    api.GetIterator(), ril.WORD
+                ):
+                    if result.IsAtBeginningOf(ril.BLOCK):
+                        block, paragraph, line = block + 1, 0, 0
+                    if result.IsAtBeginningOf(ril.PARA):
+                        paragraph, line = paragraph + 1, 0
+                    if result.IsAtBeginningOf(ril.TEXTLINE):
+                        line, word = line + 1, 0
+                    word += 1
+                    box = result.BoundingBox(ril.WORD)
+                    if box is None:
+                        continue
+                    left, top, right, bottom = box
+                    row = (5, 1, block, paragraph, line, word, left, top)
+                    for key, value in zip(TESSERACT_DATA_KEYS, row):
+                        data[key].append(value)
+                    data["width"].append(right - left)
+                    data["height"].append(bottom - top)
+                    data["conf"].append(result.Confidence(ril.WORD))
+                    data["text"].append(result.GetUTF8Text(ril.WORD) or "")
+            except RuntimeError as e:
+                raise pytesseract.TesseractError(-1, str(e)) from e
+            finally:
+                api.Clear()
+        return data
+
+    def warmup(self, langs: list[str]) -> None:
+        """Initialize one engine per language ahead of the first call."""
+        for lang in langs:
+            with self._engine(lang):
+                pass
+
+    def close(self) -> None:
+        """End every idle engine."""
+        with self._lock:
+            idle, self._idle = self._idle, {}
+            self._created = {}
+        for engines in idle.values():
+            while not engines.empty():
+                engines.get_nowait().End()
+
+    @contextmanager
+    def _engine(self, lang: str) -> Iterator[Any]:
+        """Borrow an initialized engine for a language."""
+        with self._lock:
+            engines = self._idle.setdefault(lang, queue.LifoQueue())
+            create = engines.empty() and (
+                self._created.get(lang, 0) < self.max_engines_per_lang
+            )
+            if create:
+                self._created[lang] = self._created.get(lang, 0) + 1
+
+        if create:
+            try:
+                api = self._create_engine(lang)
+            except Exception:
+                with self._lock:
+                    self._created[lang] -= 1
+                raise
+        else:
+            api = engines.get()
+        try:
+            yield api
+        finally:
+            engines.put(api)
+
+    def _create_engine(self, lang: str) -> Any:
+        """Create and initialize a tesseract engine."""
+        kwargs = {"lang": lang}
+        if self.tessdata_path is not None:
+            kwargs["path"] = self.tessdata_path
+        try:
+            return self._tesserocr.PyTessBaseAPI(**kwargs)
+        except RuntimeError as e:
+            raise pytesseract.TesseractError(-1, str(e)) from e
+
+
+def _per_image(
+    backend: TesseractBackend,
+    images: list[Image.Image],
+    lang: str,
+) -> list[Union[str, Exception]]:
+    """Run a backend image by image, capturing errors per image."""
+    results: list[Union[str, Exception]] = []
+    for image in images:
+        try:
+            results.append(backend.image_to_string(image, lang=lang))
+        except (OSError, pytesseract.TesseractError) as e:
+            results.append(e)
+    return results
+
+
+def is_tesserocr_available() -> bool:
+    """Whether the optional tesserocr bindings are installed."""
+    return importlib.util.find_spec("tesserocr") is not None
+
+
+_default_backend: Optional[TesseractBackend] = None
+_default_backend_lock = threading.Lock()
+
+
+def get_tesseract_backend() -> TesseractBackend:
+    """
+    Return the process-wide tesseract backend, creating it on first use.
+
+    Uses the in-process tesserocr backend when it is installed, and the
+    pytesseract subprocess backend otherwise.
+    """
+    global _default_backend
+    with _default_backend_lock:
+        if _default_backend is None:
+            _default_backend = (
+                TesserocrBackend() if is_tesserocr_available() else PytesseractBackend()
+            )
+        return _default_backend
+
+
+def set_tesseract_backend(backend: TesseractBackend) -> None:
+    """Replace the process-wide tesseract backend (e.g. to force pytesseract)."""
+    global _default_backend
+    with _default_backend_lock:
+        _default_backend = backend
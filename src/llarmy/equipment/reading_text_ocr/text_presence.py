@@ -0,0 +1,107 @@
+"""
+Cheap text-presence pre-check.
+
+Many images agents look at (photos, diagrams, blank pages) contain no text,
+and the OCR engines spend their full recognition time on them only to return
+nothing. The pre-check decodes a downscaled grayscale copy of the image and
+looks for text-like regions: text strokes produce dense, sharp gray-level
+steps along both axes of small blocks, while blank pages, smooth backgrounds,
+soft photos and straight rules do not. When no block is dense enough,
+recognition is skipped.
+
+The check errs towards running OCR: textured photos may pass it, but an image
+with legible text should not be skipped.
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+from PIL import Image
+
+
+@dataclass(frozen=True)
+class TextPresenceConfig:
+    """
+    Thresholds of the text-presence pre-check.
+
+    Attributes:
+        analysis_side: Longest side of the downscaled copy that is analyzed.
+            JPEGs are decoded at a reduced scale to this size.
+        block_size: Side in pixels of the blocks of the downscaled copy whose
+            edge density is measured.
+        edge_threshold: Gray-level step (0-1) between neighbouring pixels that
+            counts as an edge.
+        min_block_edge_density: Share of edge pixels for a block to count as
+            a text region.
+        min_text_blocks: Text regions needed to run recognition.
+    """
+
+    analysis_side: int = 1024
+    block_size: int = 16
+    edge_threshold: float = 0.12
+    min_block_edge_density: float = 0.03
+    min_text_blocks: int = 1
+
+    def __post_init__(self) -> None:
+        if self.analysis_side < self.block_size or self.block_size < 2:
+            raise ValueError("block_size must be between 2 and analysis_side")
+        if self.min_text_blocks < 1:
+            raise ValueError("min_text_blocks must be at least 1")
+
+
+@dataclass
+class TextPresence:
+    """Outcome of the pre-check for one image."""
+
+    has_text: bool
+    text_blocks: int
+    max_block_edge_density: float
+
+
+def detect_text_presence(
+    image: Image.Image,
+    config: TextPresenceConfig,
+) -> TextPresence:
+    """
+    Look for text-like regions on a downscaled grayscale copy of an image.
+
+    Args:
+        image: Image to check.
+        config: Thresholds of the check.
+
+    Returns:
+        Whether the image may contain text, with the number of text-like
+        blocks and the highest block edge density found.
+    """
+    if image.mode not in ("L", "RGB", "RGBA"):
+        image = image.convert("L")
+    factor = max(1, -(-max(image.size) // config.analysis_side))
+    small = image.reduce(factor) if factor > 1 else image
+    pixels = np.asarray(small.convert("L"), dtype=np.float32) / 255.0
+
+    # Steps across columns and across rows, measured separately: text strokes
+    # run in every direction, while lines, rules and frame borders only produce
+    # steps across one axis.
+    across_columns = np.zeros(pixels.shape, dtype=bool)
+    across_columns[:, 1:] = np.abs(np.diff(pixels, axis=1)) > config.edge_threshold
+    across_rows = np.zeros(pixels.shape, dtype=bool)
+    across_rows[1:, :] = np.abs(np.diff(pixels, axis=0)) > config.edge_threshold
+
+    # Edge density per block; partial blocks at the right and bottom are dropped
+    block = min(config.block_size, small.width, small.height)
+    rows, columns = small.height // block, small.width // block
+
+    def block_density(edges: np.ndarray) -> np.ndarray:
+        blocks = edges[: rows * block, : columns * block].reshape(
+            rows, block, columns, block
+        )
+        return blocks.mean(axis=(1, 3)).ravel()
+
+    density = np.minimum(block_density(across_columns), block_density(across_rows))
+
+    text_blocks = int((density >= config.min_block_edge_density).sum())
+    return TextPresence(
+        has_text=text_blocks >= config.min_text_blocks,
+        text_blocks=text_blocks,
+        max_block_edge_density=float(density.max()),
+    )
@@ -0,0 +1,245 @@
+"""
+Tiled OCR for very large images.
+
+Engineering drawings, posters and panoramic scans are split into overlapping
+tiles that are OCRed in parallel, so the engine's working memory is bounded by
+the tile size and the number of tiles in flight instead of the image size, and
+small text is read at full resolution. Words found twice in the overlap
+between tiles are deduplicated, and the remaining words are arranged back
+into lines in reading order.
+"""
+
+from dataclasses import dataclass
+from typing import Callable, Iterator, Optional, Sequence
+
+import numpy as np
+from PIL import Image
+
+from .documents import ocr_document_pages
+from .layout import OCRLayout
+
+
+@dataclass(frozen=True)
+class TilingConfig:
+    """
+    How large images are split into tiles.
+
+    Attributes:
+        tile_size: Side of the square tiles in pixels.
+        overlap: Pixels shared by neighbouring tiles. Must exceed the size of
+            the largest word so every word lies entirely within some tile.
+        min_side: Images whose longest side is at most this are OCRed whole.
+        max_workers: Threads OCRing tiles in parallel.
+        max_in_flight: Tiles cropped and waiting or being OCRed at once.
+            Defaults to twice the workers.
+        duplicate_overlap: Share of the smaller of two word boxes that must
+            overlap for them to count as the same word.
+    """
+
+    tile_size: int = 2048
+    overlap: int = 256
+    min_side: int = 3072
+    max_workers: Optional[int] = None
+    max_in_flight: Optional[int] = None
+    duplicate_overlap: float = 0.5
+
+    def __post_init__(self) -> None:
+        if not 0 <= self.overlap < self.tile_size:
+            raise ValueError("overlap must be between 0 and tile_size")
+
+
+def tile_boxes(
+    width: int,
+    height: int,
+    tile_size: int,
+    overlap: int,
+) -> list[tuple[int, int, int, int]]:
+    """
+    Split an image into overlapping tiles.
+
+    Returns:
+        ``(left, top, right, bottom)`` tile boxes, row by row. Edge tiles are
+        shifted inwards so every tile has full size when the image allows it.
+    """
+
+    def starts(length: int) -> list[int]:
+        if length <= tile_size:
+            return [0]
+        stride = tile_size - overlap
+        positions = list(range(0, length - tile_size, stride))
+        return [*positions, length - tile_size]
+
+    return [
+        (left, top, min(left + tile_size, width), min(top + tile_size, height))
+        for top in starts(height)
+        for left in starts(width)
+    ]
+
+
+def iter_tiles(
+    image: Image.Image,
+    boxes: list[tuple[int, int, int, int]],
+) -> Iterator[tuple[int, Image.Image]]:
+    """Lazily crop tiles, yielding each tile's index and image."""
+    for index, box in enumerate(boxes):
+        yield index, image.crop(box)
+
+
+def ocr_tiled(
+    image: Image.Image,
+    ocr_tile: Callable[[Image.Image], OCRLayout],
+    config: TilingConfig,
+) -> OCRLayout:
+    """
+    OCR an image tile by tile and merge the results.
+
+    Args:
+        image: Loaded image.
+        ocr_tile: Engine call returning the layout of one tile.
+        config: Tile geometry and parallelism.
+
+    Returns:
+        Layout of the whole image in reading order.
+
+    Raises:
+        Exception: The first error raised while OCRing a tile.
+    """
+    width, height = image.size
+    if max(width, height) <= config.min_side:
+        return ocr_tile(image)
+
+    boxes = tile_boxes(width, height, config.tile_size, config.overlap)
+    tiles: list[tuple[tuple[int, int, int, int], OCRLayout]] = []
+    for index, result in ocr_document_pages(
+        iter_tiles(image, boxes),
+        ocr_tile,
+        max_workers=config.max_workers,
+        max_in_flight=config.max_in_flight,
+    ):
+        if isinstance(result, Exception):
+            raise result
+        tiles.append((boxes[index], result))
+    return merge_tile_layouts(
+        tiles, width, height, config.overlap, config.duplicate_overlap
+    )
+
+
+def merge_tile_layouts(
+    tiles: Sequence[tuple[tuple[int, int, int, int], OCRLayout]],
+    width: int,
+    height: int,
+    overlap: int,
+    duplicate_overlap: float = 0.5,
+) -> OCRLayout:
+    """
+    Merge the layouts of overlapping tiles into the layout of the image.
+
+    Args:
+        tiles: Box of every tile in the image and its layout, in tile
+            coordinates.
+        width: Width of the image.
+        height: Height of the image.
+        overlap: Pixels shared by neighbouring tiles.
+        duplicate_overlap: See ``TilingConfig``.
+
+    Returns:
+        Layout of the whole image in reading order, with words found twice in
+        tile overlaps deduplicated.
+    """
+    words: list[str] = []
+    word_boxes: list[np.ndarray] = []
+    confidences: list[np.ndarray] = []
+    on_seam: list[np.ndarray] = []
+    engine = ""
+    for tile, layout in tiles:
+        engine = layout.engine or engine
+        shifted = layout.boxes + np.array(tile[:2] * 2, dtype=np.int32)
+        words.extend(layout.words)
+        word_boxes.append(shifted)
+        confidences.append(layout.confidences)
+        on_seam.append(_touches_seam(shifted, tile, width, height, overlap))
+
+    if not words:
+        return OCRLayout.empty(width, height, engine)
+    all_boxes = np.concatenate(word_boxes)
+    all_confidences = np.concatenate(confidences)
+    keep = _deduplicate(
+        all_boxes, all_confidences, np.concatenate(on_seam), duplicate_overlap
+    )
+    return OCRLayout.from_boxes(
+        [words[index] for index in keep],
+        all_boxes[keep],
+        all_confidences[keep],
+        width,
+        height,
+        engine,
+    )
+
+
+def _touches_seam(
+    boxes: np.ndarray,
+    tile: tuple[int, int, int, int],
+    width: int,
+    height: int,
+    overlap: int,
+) -> np.ndarray:
+    """
+    Mark words lying within the overlap band of an inner tile edge.
+
+    Such words may be cut by the tile edge; the neighbouring tile sees them
+    whole, so its reading is preferred.
+    """
+    left, top, right, bottom = tile
+    margin = max(overlap // 8, 2)
+    seam = np.zeros(len(boxes), dtype=bool)
+    if left > 0:
+        seam |= boxes[:, 0] <= left + margin
+    if top > 0:
+        seam |= boxes[:, 1] <= top + margin
+    if right < width:
+        seam |= boxes[:, 2] >= right - margin
+    if bottom < height:
+        seam |= boxes[:, 3] >= bottom - margin
+    return seam
+
+
+def _deduplicate(
+    boxes: np.ndarray,
+    confidences: np.ndarray,
+    on_seam: np.ndarray,
+    min_overlap: float,
+) -> list[int]:
+    """
+    Drop words detected twice in tile overlaps.
+
+    Words are visited from the most to the least trusted (whole words before
+    words cut by a seam, then by confidence) and dropped when their box mostly
+    overlaps an already kept word.
+
+    Returns:
+        Indices of the kept words.
+    """
+    boxes = boxes.astype(np.float64)
+    areas = np.maximum((boxes[:, 2] - boxes[:, 0]) * (boxes[:, 3] - boxes[:, 1]), 1.0)
+    order = np.lexsort((-confidences, on_seam))
+    kept: list[int] = []
+    for index in order.tolist():
+        if kept:
+            others = boxes[kept]
+            overlap_width = np.clip(
+                np.minimum(others[:, 2], boxes[index, 2])
+                - np.maximum(others[:, 0], boxes[index, 0]),
+                0,
+                None,
+            )
+            overlap_height = np.clip(
+                np.minimum(others[:, 3], boxes[index, 3])
+                - np.maximum(others[:, 1], boxes[index, 1]),
+                0,
+                None,
+            )
+            smaller = np.minimum(areas[kept], areas[index])
+            if (overlap_width * overlap_height / smaller >= min_overlap).any():
+                continue
+        kept.append(index)
+    return sorted(kept)
@@ -0,0 +1,276 @@
+"""
+OCR worker functions: load image inputs and run the engines on them.
+
+The tool specs call these in process or submit them to the EasyOCR worker
+processes of their executor, and the bulk pipeline runs them in its own worker
+processes. They take image inputs (paths, base64 strings or resolved handles)
+and return plain engine output, leaving result formatting to the callers.
+"""
+
+from functools import partial
+from typing import Any, Callable, Optional, Union
+
+import pytesseract
+from PIL import Image
+
+from .cpu import CPUInferenceConfig, get_cpu_reader_pool
+from .engines import (
+    easyocr_readtext,
+    easyocr_readtext_batch,
+    easyocr_readtext_layout,
+    easyocr_readtext_with_confidence,
+    tesseract_image_to_layout,
+    tesseract_image_to_string,
+    tesseract_image_to_string_batch,
+    tesseract_image_to_string_with_confidence,
+)
+from .images import load_image_from_input, load_images_from_inputs
+from .instrumentation import ocr_stage
+from .layout import OCRLayout
+from .preprocessing import (
+    PreprocessingConfig,
+    preprocess_image,
+    preprocess_image_with_transform,
+)
+from .readers import EasyOCRReaderPool, get_reader_pool
+from .routing import EASYOCR, TESSERACT, EngineRouter, to_tesseract_lang
+from .tesseract_backends import TesseractBackend
+from .tiling import TilingConfig, ocr_tiled
+
+# Reader pool argument of the EasyOCR worker functions
+ReaderPoolArg = Union[EasyOCRReaderPool, CPUInferenceConfig, None]
+
+
+def prepare_image(
+    image: Image.Image,
+    preprocessing: Optional[PreprocessingConfig],
+) -> Image.Image:
+    """Apply the configured preprocessing, if any."""
+    if preprocessing is None:
+        return image
+    with ocr_stage("preprocess", width=image.width, height=image.height):
+        return preprocess_image(image, preprocessing)
+
+
+def resolve_reader_pool(reader_pool: ReaderPoolArg) -> EasyOCRReaderPool:
+    """Reader pool of a worker call: given, built from a CPU config or default."""
+    if isinstance(reader_pool, CPUInferenceConfig):
+        return get_cpu_reader_pool(reader_pool)
+    return reader_pool if reader_pool is not None else get_reader_pool()
+
+
+def needs_tiling(image: Image.Image, tiling: Optional[TilingConfig]) -> bool:
+    """Whether an image is large enough to be OCRed in tiles."""
+    return tiling is not None and max(image.size) > tiling.min_side
+
+
+def general_purpose_ocr(
+    image_input: str,
+    lang_list: list[str],
+    reader_pool: ReaderPoolArg = None,
+    target_side: Optional[int] = None,
+    preprocessing: Optional[PreprocessingConfig] = None,
+    tiling: Optional[TilingConfig] = None,
+) -> str:
+    """Load an image and run EasyOCR on it. Runs in OCR worker processes."""
+    image = load_image_from_input(image_input, target_side=target_side)
+    image = prepare_image(image, preprocessing)
+    with resolve_reader_pool(reader_pool).lease(lang_list) as reader:
+        if tiling is not None and needs_tiling(image, tiling):
+            layout = ocr_tiled(image, partial(easyocr_readtext_layout, reader), tiling)
+            return layout.text
+        return easyocr_readtext(reader, image)
+
+
+def printed_material_ocr(
+    image_input: str,
+    lang: str = "eng",
+    target_side: Optional[int] = None,
+    backend: Optional[TesseractBackend] = None,
+    preprocessing: Optional[PreprocessingConfig] = None,
+) -> str:
+    """Load an image and run tesseract on it."""
+    image = load_image_from_input(image_input, target_side=target_side)
+    return tesseract_image_to_string(
+        prepare_image(image, preprocessing), lang=lang, backend=backend
+    )
+
+
+def general_purpose_ocr_batch(
+    image_inputs: list[str],
+    lang_list: list[str],
+    reader_pool: ReaderPoolArg = None,
+    max_decode_workers: Optional[int] = None,
+    target_side: Optional[int] = None,
+    preprocessing: Optional[PreprocessingConfig] = None,
+    tiling: Optional[TilingConfig] = None,
+) -> list[Union[str, Exception]]:
+    """
+    Load many images and run batched EasyOCR. Runs in OCR worker processes.
+
+    Images large enough for tiling are OCRed tile by tile, the others in
+    batches.
+    """
+    images: list[Union[Image.Image, Exception]] = [
+        (
+            prepare_image(image, preprocessing)
+            if isinstance(image, Image.Image)
+            else image
+        )
+        for image in load_images_from_inputs(
+            image_inputs, max_workers=max_decode_workers, target_side=target_side
+        )
+    ]
+    if not any(isinstance(image, Image.Image) for image in images):
+        return [image for image in images if isinstance(image, Exception)]
+    batched = [
+        image
+        for image in images
+        if isinstance(image, Image.Image) and not needs_tiling(image, tiling)
+    ]
+    with resolve_reader_pool(reader_pool).lease(lang_list) as reader:
+        texts = iter(easyocr_readtext_batch(reader, batched))
+
+        results: list[Union[str, Exception]] = []
+        for image in images:
+            if isinstance(image, Exception):
+                results.append(image)
+            elif tiling is not None and needs_tiling(image, tiling):
+                try:
+                    tiled = ocr_tiled(
+                        image, partial(easyocr_readtext_layout, reader), tiling
+                    )
+                    results.append(tiled.text)
+                except Exception as e:
+                    results.append(e)
+            else:
+                results.append(next(texts))
+    return results
+
+
+def printed_material_ocr_batch(
+    image_inputs: list[str],
+    lang: str = "eng",
+    max_decode_workers: Optional[int] = None,
+    target_side: Optional[int] = None,
+    backend: Optional[TesseractBackend] = None,
+    preprocessing: Optional[PreprocessingConfig] = None,
+) -> list[Union[str, Exception]]:
+    """Load many images and run tesseract on them in one process."""
+    images = load_images_from_inputs(
+        image_inputs, max_workers=max_decode_workers, target_side=target_side
+    )
+    loaded = [
+        prepare_image(image, preprocessing)
+        for image in images
+        if isinstance(image, Image.Image)
+    ]
+    texts = iter(tesseract_image_to_string_batch(loaded, lang=lang, backend=backend))
+    return [image if isinstance(image, Exception) else next(texts) for image in images]
+
+
+def routed_ocr(
+    image_input: str,
+    lang_list: list[str],
+    router: EngineRouter,
+    reader_pool: ReaderPoolArg = None,
+    target_side: Optional[int] = None,
+    backend: Optional[TesseractBackend] = None,
+    preprocessing: Optional[PreprocessingConfig] = None,
+) -> dict[str, Any]:
+    """
+    Load an image, pick its engine and run OCR, escalating if needed.
+
+    Returns:
+        Extracted ``text``, the ``engine`` that produced it, its mean
+        ``confidence`` (0-100) and the engine it was ``escalated_from``, if any.
+    """
+    image = load_image_from_input(image_input, target_side=target_side)
+    image.load()
+    # Route on the original image: binarization makes everything look printed
+    with ocr_stage("route") as attributes:
+        engine = attributes["engine"] = router.route(image)
+    image = prepare_image(image, preprocessing)
+    escalated_from = None
+    text, confidence = "", 0.0
+    if engine == TESSERACT:
+        try:
+            text, confidence = tesseract_image_to_string_with_confidence(
+                image, lang=to_tesseract_lang(lang_list), backend=backend
+            )
+            low_confidence = not text or confidence < router.escalation_confidence
+        except (OSError, pytesseract.TesseractError):
+            # Tesseract missing or failing on this image: EasyOCR can still try
+            if not router.escalate:
+                raise
+            low_confidence = True
+        if router.escalate and low_confidence:
+            engine, escalated_from = EASYOCR, TESSERACT
+    if engine == EASYOCR:
+        with resolve_reader_pool(reader_pool).lease(lang_list) as reader:
+            text, confidence = easyocr_readtext_with_confidence(reader, image)
+    return {
+        "text": text,
+        "engine": engine,
+        "confidence": round(confidence, 1),
+        "escalated_from": escalated_from,
+    }
+
+
+def structured_ocr(
+    image_input: str,
+    lang_list: list[str],
+    router: EngineRouter,
+    reader_pool: ReaderPoolArg = None,
+    target_side: Optional[int] = None,
+    backend: Optional[TesseractBackend] = None,
+    preprocessing: Optional[PreprocessingConfig] = None,
+    tiling: Optional[TilingConfig] = None,
+) -> OCRLayout:
+    """
+    Load an image and run routed OCR keeping word boxes and confidences.
+
+    Engine choice and escalation follow ``routed_ocr``, and large images are
+    OCRed in tiles when tiling is configured. Boxes are reported in the
+    coordinates of the loaded image, before preprocessing.
+    """
+    image = load_image_from_input(image_input, target_side=target_side)
+    image.load()
+    width, height = image.size
+    with ocr_stage("route") as attributes:
+        engine = attributes["engine"] = router.route(image)
+    transform = None
+    if preprocessing is not None:
+        with ocr_stage("preprocess", width=width, height=height):
+            image, transform = preprocess_image_with_transform(image, preprocessing)
+
+    def run(ocr_image: Callable[[Image.Image], OCRLayout]) -> OCRLayout:
+        if tiling is not None and needs_tiling(image, tiling):
+            return ocr_tiled(image, ocr_image, tiling)
+        return ocr_image(image)
+
+    layout = None
+    if engine == TESSERACT:
+        try:
+            layout = run(
+                partial(
+                    tesseract_image_to_layout,
+                    lang=to_tesseract_lang(lang_list),
+                    backend=backend,
+                )
+            )
+        except (OSError, pytesseract.TesseractError):
+            # Tesseract missing or failing on this image: EasyOCR can still try
+            if not router.escalate:
+                raise
+        else:
+            if router.escalate and (
+                layout.mean_confidence < router.escalation_confidence
+            ):
+                layout = None
+    if layout is None:
+        with resolve_reader_pool(reader_pool).lease(lang_list) as reader:
+            layout = run(partial(easyocr_readtext_layout, reader))
+
+    boxes = layout.boxes if transform is None else transform.to_original(layout.boxes)
+    return layout.with_boxes(boxes, width, height)
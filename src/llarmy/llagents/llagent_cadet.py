@@ -1,24 +1,246 @@
-"""LLAgent Cadet - Basic agent with OCR capabilities."""
+"""
+LLAgent Cadet - Basic agent with OCR capabilities.
 
-from llama_index.llms.openai import OpenAI
-from llama_index.core.agent import FunctionCallingAgentWorker, AgentRunner
-from llarmy.equipment.reading_text_ocr import ReadingTextOCRToolSpec
+Use ``create_cadet_agent`` to build a cadet. Nothing is constructed at import
+time: the OCR tools are built once per process on first use and shared by
+every cadet, so their reader pools, tesseract engines and caches are shared
+too, and a cadet only owns its conversation state.
 
+Function calling cadets run the tool calls of one step concurrently. Pass a
+``ToolCallMemo`` to also coalesce and reuse identical tool calls.
+"""
 
-ocr_tool = ReadingTextOCRToolSpec()
-ocr_tool_list = ReadingTextOCRToolSpec().to_tool_list()
-llm = OpenAI(model="gpt-3.5-turbo")
+import queue
+import re
+import threading
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Any, Iterator, Optional, Sequence
 
-agent_worker = FunctionCallingAgentWorker.from_tools(
-    tools=list(ocr_tool_list),
-    llm=llm,
-    verbose=True,
+from llama_index.core.agent import AgentRunner, ReActAgentWorker
+from llama_index.core.llms import LLM
+from llama_index.core.llms.function_calling import FunctionCallingLLM
+from llama_index.core.tools import BaseTool, ToolOutput
+
+from llarmy.llagents.tool_calls import (
+    DEFAULT_TOOL_CALL_TTL,
+    ConcurrentFunctionCallingAgentWorker,
+    ToolCallMemo,
+    memoize_tools,
 )
 
-agent_cadet = AgentRunner(agent_worker)
+if TYPE_CHECKING:
+    from llarmy.equipment.reading_text_ocr import ReadingTextOCRToolSpec
 
-response = agent_cadet.query(
-    "What is the text in the non printed material image located at ./image_7_vw.jpg ? "
-    "Please, any text extracted from the tool try to do your own interpretation "
-    "based on the output of the OCR",
-)
+DEFAULT_CADET_MODEL = "gpt-3.5-turbo"
+
+# Error responses of the OCR tools, e.g. "Reading Text Error: OCR queue is full"
+OCR_ERROR_PATTERN = re.compile(r"Error(?: \([^)]*\))?: ")
+
+
+def is_cacheable_ocr_output(output: ToolOutput) -> bool:
+    """Whether a tool output may be reused: OCR errors can be transient."""
+    return not output.is_error and OCR_ERROR_PATTERN.search(output.content) is None
+
+
+def create_cadet_tool_memo(
+    ttl: Optional[float] = DEFAULT_TOOL_CALL_TTL,
+) -> ToolCallMemo:
+    """
+    Create a memo for the tool calls of one cadet session.
+
+    Args:
+        ttl: Seconds a tool result is reused.
+    """
+    return ToolCallMemo(ttl=ttl, should_cache=is_cacheable_ocr_output)
+
+
+def create_cadet_agent(
+    llm: Optional[LLM] = None,
+    tools: Optional[Sequence[BaseTool]] = None,
+    verbose: bool = False,
+    tool_memo: Optional[ToolCallMemo] = None,
+    **worker_kwargs: Any,
+) -> AgentRunner:
+    """
+    Create a cadet agent.
+
+    Args:
+        llm: Any LlamaIndex LLM. Defaults to the process-wide OpenAI LLM using
+            ``DEFAULT_CADET_MODEL``. LLMs without function calling support
+            (e.g. local models or ``MockLLM``) get a ReAct agent instead.
+        tools: Tools the cadet can use. Defaults to the process-wide OCR tools.
+        verbose: Print the agent's reasoning steps.
+        tool_memo: Memo coalescing identical tool calls in progress and
+            reusing their results, e.g. ``create_cadet_tool_memo()``. Use one
+            memo per session. Disabled by default.
+        **worker_kwargs: Extra arguments for the agent worker, e.g.
+            ``max_function_calls`` or ``max_iterations``.
+
+    Returns:
+        The cadet agent.
+    """
+    llm = llm if llm is not None else get_default_llm()
+    tools = list(tools if tools is not None else get_cadet_tools())
+    if tool_memo is not None:
+        tools = memoize_tools(tools, tool_memo)
+    if isinstance(llm, FunctionCallingLLM) and llm.metadata.is_function_calling_model:
+        agent_worker: Any = ConcurrentFunctionCallingAgentWorker.from_tools(
+            tools=tools, llm=llm, verbose=verbose, **worker_kwargs
+        )
+    else:
+        agent_worker = ReActAgentWorker.from_tools(
+            tools=tools, llm=llm, verbose=verbose, **worker_kwargs
+        )
+    # delete_task_on_finish would fail: AgentRunner reads the task back after
+    # deleting it. Pooled cadets drop their finished tasks when reset instead
+    return AgentRunner(agent_worker)
+
+
+class CadetAgentPool:
+    """
+    Pool of cadet agents sharing one LLM and one set of tools.
+
+    Up to ``max_agents`` cadets are created on demand; a request borrows one,
+    and waits when all of them are busy. Borrowed cadets are reset when they
+    are returned, so conversations do not leak between requests. With
+    ``tool_call_ttl`` set, every cadet memoizes its tool calls for the length
+    of a borrow.
+    """
+
+    def __init__(
+        self,
+        max_agents: int = 8,
+        llm: Optional[LLM] = None,
+        tools: Optional[Sequence[BaseTool]] = None,
+        tool_call_ttl: Optional[float] = None,
+        **agent_kwargs: Any,
+    ) -> None:
+        """
+        Initialize the cadet pool.
+
+        Args:
+            max_agents: Maximum number of cadets created.
+            llm: LLM shared by the cadets, see ``create_cadet_agent``.
+            tools: Tools shared by the cadets, see ``create_cadet_agent``.
+            tool_call_ttl: Seconds each cadet reuses identical tool calls,
+                see ``create_cadet_tool_memo``. Disabled by default.
+            **agent_kwargs: Extra arguments for ``create_cadet_agent``.
+        """
+        if max_agents < 1:
+            raise ValueError("max_agents must be at least 1")
+        self.max_agents = max_agents
+        self.llm = llm
+        self.tools = tools
+        self.tool_call_ttl = tool_call_ttl
+        self.agent_kwargs = agent_kwargs
+        self._idle: queue.LifoQueue[tuple[AgentRunner, Optional[ToolCallMemo]]] = (
+            queue.LifoQueue()
+        )
+        self._created = 0
+        self._lock = threading.Lock()
+
+    @property
+    def created(self) -> int:
+        """Number of cadets created so far."""
+        return self._created
+
+    @contextmanager
+    def agent(self, timeout: Optional[float] = None) -> Iterator[AgentRunner]:
+        """
+        Borrow a cadet for one conversation.
+
+        Args:
+            timeout: Seconds to wait for a free cadet. ``None`` waits
+                indefinitely.
+
+        Raises:
+            queue.Empty: If no cadet becomes free within ``timeout``.
+        """
+        with self._lock:
+            create = self._idle.empty() and self._created < self.max_agents
+            if create:
+                self._created += 1
+
+        if create:
+            try:
+                memo = (
+                    None
+                    if self.tool_call_ttl is None
+                    else create_cadet_tool_memo(self.tool_call_ttl)
+                )
+                agent = create_cadet_agent(
+                    llm=self.llm, tools=self.tools, tool_memo=memo, **self.agent_kwargs
+                )
+            except Exception:
+                with self._lock:
+                    self._created -= 1
+                raise
+        else:
+            agent, memo = self._idle.get(timeout=timeout)
+        try:
+            yield agent
+        finally:
+            agent.reset()
+            if memo is not None:
+                memo.clear()
+            self._idle.put((agent, memo))
+
+
+_default_llm: Optional[LLM] = None
+_default_tool_spec: Optional["ReadingTextOCRToolSpec"] = None
+_default_tools: Optional[list[BaseTool]] = None
+_defaults_lock = threading.Lock()
+
+
+def get_default_llm() -> LLM:
+    """Return the process-wide cadet LLM, creating it on first use."""
+    global _default_llm
+    with _defaults_lock:
+        if _default_llm is None:
+            from llama_index.llms.openai import OpenAI
+
+            _default_llm = OpenAI(model=DEFAULT_CADET_MODEL)
+        return _default_llm
+
+
+def set_default_llm(llm: LLM) -> None:
+    """Replace the process-wide cadet LLM (e.g. with a local model)."""
+    global _default_llm
+    with _defaults_lock:
+        _default_llm = llm
+
+
+def get_cadet_tool_spec() -> "ReadingTextOCRToolSpec":
+    """Return the process-wide OCR tool spec shared by the cadets."""
+    global _default_tool_spec
+    with _defaults_lock:
+        if _default_tool_spec is None:
+            from llarmy.equipment.reading_text_ocr import ReadingTextOCRToolSpec
+
+            _default_tool_spec = ReadingTextOCRToolSpec()
+        return _default_tool_spec
+
+
+def get_cadet_tools() -> list[BaseTool]:
+    """Return the process-wide OCR tools shared by the cadets."""
+    global _default_tools
+    tool_spec = get_cadet_tool_spec()
+    with _defaults_lock:
+        if _default_tools is None:
+            _default_tools = list(tool_spec.to_tool_list())
+        return _default_tools
+
+
+def main() -> None:
+    """Ask a cadet to read an example image."""
+    agent_cadet = create_cadet_agent(verbose=True)
+    response = agent_cadet.query(
+        "What is the text in the non printed material image located at "
+        "./image_7_vw.jpg ? Please, any text extracted from the tool try to do "
+        "your own interpretation based on the output of the OCR",
+    )
+    print(response)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,235 @@
+"""
+Tool call memoization and deduplication for llarmy agents.
+
+LLMs often repeat a tool call within one task (the same image, the same
+languages), and the parallel function calls of one step can duplicate each
+other. Tools wrapped with ``memoize_tools`` share a ``ToolCallMemo``: identical
+calls in flight are coalesced into one, and results are reused for ``ttl``
+seconds. Only wrap tools without side effects, such as the OCR tools.
+
+``ConcurrentFunctionCallingAgentWorker`` runs the tool calls of one LLM step
+concurrently, also when the agent is used synchronously.
+"""
+
+import asyncio
+import json
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Hashable, Optional, Sequence
+
+from llama_index.core.agent import FunctionCallingAgentWorker
+from llama_index.core.agent.types import Task, TaskStep, TaskStepOutput
+from llama_index.core.async_utils import asyncio_run
+from llama_index.core.tools import BaseTool, ToolMetadata, ToolOutput
+from llama_index.core.tools.types import AsyncBaseTool, adapt_to_async_tool
+
+DEFAULT_TOOL_CALL_TTL = 300.0
+
+
+def _is_successful(output: ToolOutput) -> bool:
+    """Default memo filter: every output that is not an error."""
+    return not output.is_error
+
+
+class ToolCallMemo:
+    """
+    Results of recent tool calls, with single-flight for calls in progress.
+
+    Thread-safe, and shared between sync and async callers. Calls that raise
+    and outputs rejected by ``should_cache`` are not remembered, so the next
+    identical call runs again.
+    """
+
+    def __init__(
+        self,
+        ttl: Optional[float] = DEFAULT_TOOL_CALL_TTL,
+        max_entries: int = 256,
+        should_cache: Callable[[ToolOutput], bool] = _is_successful,
+    ) -> None:
+        """
+        Initialize the memo.
+
+        Args:
+            ttl: Seconds a result is reused. ``None`` keeps results until they
+                are evicted or the memo is cleared.
+            max_entries: Results kept at most; least recently used go first.
+            should_cache: Whether an output may be reused, e.g. to skip
+                transient error messages.
+        """
+        if max_entries < 1:
+            raise ValueError("max_entries must be at least 1")
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.should_cache = should_cache
+        self._results: OrderedDict[Hashable, tuple[ToolOutput, float]] = OrderedDict()
+        self._in_flight: dict[Hashable, Future[ToolOutput]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    def call(self, key: Hashable, fn: Callable[[], ToolOutput]) -> ToolOutput:
+        """
+        Return the remembered output of a call, or run it.
+
+        Args:
+            key: Identity of the call, e.g. the tool name and arguments.
+            fn: Runs the call.
+        """
+        future, owner = self._claim(key)
+        if not owner:
+            return future.result()
+        try:
+            output = fn()
+        except BaseException as e:
+            self._finish(key, future, error=e)
+            raise
+        self._finish(key, future, output=output)
+        return output
+
+    async def acall(
+        self, key: Hashable, fn: Callable[[], Awaitable[ToolOutput]]
+    ) -> ToolOutput:
+        """Async version of call."""
+        future, owner = self._claim(key)
+        if not owner:
+            return await asyncio.wrap_future(future)
+        try:
+            output = await fn()
+        except BaseException as e:
+            self._finish(key, future, error=e)
+            raise
+        self._finish(key, future, output=output)
+        return output
+
+    def clear(self) -> None:
+        """Forget the remembered results. Calls in progress are unaffected."""
+        with self._lock:
+            self._results.clear()
+
+    @property
+    def stats(self) -> dict[str, int]:
+        """Call counters for monitoring."""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+                "entries": len(self._results),
+            }
+
+    def _claim(self, key: Hashable) -> tuple["Future[ToolOutput]", bool]:
+        """Future of a call, and whether the caller has to run it."""
+        future: Future[ToolOutput]
+        with self._lock:
+            entry = self._results.get(key)
+            if entry is not None and entry[1] > time.monotonic():
+                self._results.move_to_end(key)
+                self.hits += 1
+                future = Future()
+                future.set_result(entry[0])
+                return future, False
+            in_flight = self._in_flight.get(key)
+            if in_flight is not None:
+                self.coalesced += 1
+                return in_flight, False
+            self.misses += 1
+            future = self._in_flight[key] = Future()
+            return future, True
+
+    def _finish(
+        self,
+        key: Hashable,
+        future: "Future[ToolOutput]",
+        output: Optional[ToolOutput] = None,
+        error: Optional[BaseException] = None,
+    ) -> None:
+        """Remember a finished call and hand its outcome to waiting callers."""
+        with self._lock:
+            self._in_flight.pop(key, None)
+            if output is not None and self.should_cache(output):
+                expires = (
+                    float("inf") if self.ttl is None else time.monotonic() + self.ttl
+                )
+                self._results[key] = (output, expires)
+                self._results.move_to_end(key)
+                while len(self._results) > self.max_entries:
+                    self._results.popitem(last=False)
+        if error is not None:
+            future.set_exception(error)
+        elif output is not None:
+            future.set_result(output)
+
+
+class MemoizedTool(AsyncBaseTool):
+    """Tool whose calls go through a ``ToolCallMemo``."""
+
+    def __init__(self, tool: BaseTool, memo: ToolCallMemo) -> None:
+        """
+        Wrap a tool.
+
+        Args:
+            tool: Tool without side effects.
+            memo: Memo shared by the tools of a task or session.
+        """
+        self.tool = tool
+        self.memo = memo
+
+    @property
+    def metadata(self) -> ToolMetadata:
+        """Metadata of the wrapped tool."""
+        return self.tool.metadata
+
+    def call(self, *args: Any, **kwargs: Any) -> ToolOutput:
+        """Call the wrapped tool, or reuse an identical call."""
+        return self.memo.call(
+            self._key(args, kwargs), lambda: self.tool(*args, **kwargs)
+        )
+
+    async def acall(self, *args: Any, **kwargs: Any) -> ToolOutput:
+        """Async version of call."""
+        async_tool = adapt_to_async_tool(self.tool)
+        return await self.memo.acall(
+            self._key(args, kwargs), lambda: async_tool.acall(*args, **kwargs)
+        )
+
+    def _key(self, args: tuple[Any, ...], kwargs: dict[str, Any]) -> Hashable:
+        """Identity of a call: the tool name and its JSON-encoded arguments."""
+        arguments = json.dumps(
+            {"args": args, "kwargs": kwargs}, sort_keys=True, default=repr
+        )
+        return (self.metadata.name, arguments)
+
+
+def memoize_tools(
+    tools: Sequence[BaseTool], memo: Optional[ToolCallMemo] = None
+) -> list[BaseTool]:
+    """
+    Wrap tools so their calls are memoized and deduplicated.
+
+    Args:
+        tools: Tools without side effects.
+        memo: Memo shared by the wrapped tools. Defaults to a new memo, so use
+            one call per task or session.
+
+    Returns:
+        The wrapped tools, in order.
+    """
+    memo = memo if memo is not None else ToolCallMemo()
+    return [MemoizedTool(tool, memo) for tool in tools]
+
+
+class ConcurrentFunctionCallingAgentWorker(FunctionCallingAgentWorker):
+    """
+    Function calling agent worker running the tool calls of a step concurrently.
+
+    The async step already gathers the tool calls of a step; synchronous steps
+    run the async step on an event loop instead of calling the tools one by
+    one.
+    """
+
+    def run_step(self, step: TaskStep, task: Task, **kwargs: Any) -> TaskStepOutput:
+        """Run step, calling its tools concurrently."""
+        return asyncio_run(self.arun_step(step, task, **kwargs))
@@ -0,0 +1,162 @@
+"""Tests for the cadet agent factory."""
+
+import subprocess
+import sys
+import threading
+from typing import Any
+
+from llama_index.core.agent import AgentRunner, ReActAgentWorker
+from llama_index.core.llms import (
+    ChatMessage,
+    ChatResponse,
+    LLMMetadata,
+    MessageRole,
+    MockLLM,
+)
+from llama_index.core.llms.function_calling import FunctionCallingLLM
+from llama_index.core.llms.llm import ToolSelection
+from llama_index.core.tools import FunctionTool, ToolOutput
+
+from llarmy.llagents.llagent_cadet import (
+    CadetAgentPool,
+    create_cadet_agent,
+    create_cadet_tool_memo,
+    get_cadet_tools,
+)
+
+
+def test_import_has_no_side_effects() -> None:
+    """Importing the module builds no tools, LLM client or agent."""
+    code = (
+        "import sys\n"
+        "import llarmy.llagents.llagent_cadet as cadet\n"
+        "assert cadet._default_tool_spec is None\n"
+        "assert cadet._default_llm is None\n"
+        "assert 'llama_index.llms.openai' not in sys.modules\n"
+    )
+    subprocess.run([sys.executable, "-c", code], check=True)
+
+
+def test_cadets_share_tools_and_fall_back_to_react() -> None:
+    """Cadets reuse the process-wide tools; non function calling LLMs use ReAct."""
+    first = create_cadet_agent(llm=MockLLM())
+    second = create_cadet_agent(llm=MockLLM())
+
+    assert isinstance(first, AgentRunner)
+    assert isinstance(first.agent_worker, ReActAgentWorker)
+    assert get_cadet_tools() is get_cadet_tools()
+    first_tools = first.agent_worker._get_tools("")
+    second_tools = second.agent_worker._get_tools("")
+    assert [id(tool) for tool in first_tools] == [id(tool) for tool in second_tools]
+
+
+def test_cadet_pool_reuses_agents() -> None:
+    """Returned cadets are reset and handed out again."""
+    pool = CadetAgentPool(max_agents=2, llm=MockLLM())
+
+    with pool.agent() as first:
+        pass
+    with pool.agent() as second:
+        pass
+
+    assert second is first
+    assert pool.created == 1
+
+
+class ScriptedFunctionCallingLLM(MockLLM, FunctionCallingLLM):
+    """Function calling LLM asking for the given tool calls, then answering."""
+
+    tool_calls: list = []
+
+    @property
+    def metadata(self) -> LLMMetadata:
+        return LLMMetadata(is_function_calling_model=True)
+
+    def _prepare_chat_with_tools(self, tools: Any, **kwargs: Any) -> dict:
+        return {"messages": kwargs["chat_history"]}
+
+    def chat(self, messages: Any, **kwargs: Any) -> ChatResponse:
+        answered = any(message.role == MessageRole.TOOL for message in messages)
+        return ChatResponse(
+            message=ChatMessage(
+                role=MessageRole.ASSISTANT,
+                content="done" if answered else "",
+                additional_kwargs={"calls": [] if answered else self.tool_calls},
+            )
+        )
+
+    async def achat(self, messages: Any, **kwargs: Any) -> ChatResponse:
+        return self.chat(messages, **kwargs)
+
+    def get_tool_calls_from_response(
+        self, response: Any, error_on_no_tool_call: bool = True, **kwargs: Any
+    ) -> list:
+        return response.message.additional_kwargs["calls"]
+
+
+def test_cadet_chats_with_an_offline_llm() -> None:
+    """A cadet answers consecutive chats end to end without network access."""
+
+    def read(image: str) -> str:
+        """Read an image."""
+        return f"text of {image}"
+
+    llm = ScriptedFunctionCallingLLM()
+    llm.tool_calls = [
+        ToolSelection(tool_id="0", tool_name="read", tool_kwargs={"image": "a.png"})
+    ]
+    cadet = create_cadet_agent(llm=llm, tools=[FunctionTool.from_defaults(fn=read)])
+
+    first = cadet.chat("What does the image say?")
+    second = cadet.chat("And now?")
+
+    assert str(first) == "done"
+    assert str(second) == "done"
+    assert [source.content for source in first.sources] == ["text of a.png"]
+
+
+def test_cadet_memoizes_and_runs_step_tool_calls_concurrently() -> None:
+    """Duplicate calls of a step run once, distinct ones run at the same time."""
+    barrier = threading.Barrier(2, timeout=5)
+    calls = []
+
+    def read(image: str) -> str:
+        """Read an image."""
+        calls.append(image)
+        barrier.wait()
+        return f"text of {image}"
+
+    llm = ScriptedFunctionCallingLLM()
+    llm.tool_calls = [
+        ToolSelection(
+            tool_id=str(index), tool_name="read", tool_kwargs={"image": image}
+        )
+        for index, image in enumerate(["a.png", "b.png", "a.png"])
+    ]
+    memo = create_cadet_tool_memo()
+    cadet = create_cadet_agent(
+        llm=llm, tools=[FunctionTool.from_defaults(fn=read)], tool_memo=memo
+    )
+    response = cadet.chat("What do the images say?")
+
+    assert str(response) == "done"
+    assert sorted(calls) == ["a.png", "b.png"]
+    assert [source.content for source in response.sources].count("text of a.png") == 2
+    assert memo.stats["misses"] == 2
+    assert memo.stats["hits"] + memo.stats["coalesced"] == 1
+
+
+def test_tool_call_memo_skips_errors_and_expired_results() -> None:
+    """OCR error messages and expired results are not reused."""
+    memo = create_cadet_tool_memo(ttl=0)
+    outputs = iter(["Reading Text Error: OCR queue is full", "text", "text again"])
+
+    def call() -> ToolOutput:
+        return ToolOutput(
+            content=next(outputs), tool_name="read", raw_input={}, raw_output=None
+        )
+
+    assert memo.call("key", call).content.startswith("Reading Text Error")
+    assert memo.call("key", call).content == "text"
+    assert memo.call("key", call).content == "text again"
+    assert memo.stats == {"hits": 0, "misses": 3, "coalesced": 0, "entries": 1}
@@ -0,0 +1,1366 @@
+"""Tests for the reading text OCR equipment."""
+
+import asyncio
+import base64
+import concurrent.futures
+import dataclasses
+import io
+import json
+import os
+import subprocess
+import sys
+import threading
+import types
+from pathlib import Path
+from typing import Any, Callable
+
+import pytest
+import pytesseract
+import numpy as np
+from PIL import Image, ImageDraw
+
+from llarmy.equipment.reading_text_ocr import (
+    BatchingConfig,
+    CPUInferenceConfig,
+    EasyOCRModelManager,
+    EasyOCRReaderPool,
+    FrameSequenceConfig,
+    ImageStore,
+    OCRBusyError,
+    OCRExecutor,
+    OCRLayout,
+    OCRMemoryBudgetError,
+    OCRModelUnavailableError,
+    OCRResultCache,
+    OCRServer,
+    OCRStageTimer,
+    ReadingTextOCRToolSpec,
+    RemoteReadingTextOCRToolSpec,
+    TextPresenceConfig,
+    TilingConfig,
+    get_image_store,
+    get_ocr_executor,
+    set_ocr_executor,
+    use_image_store,
+)
+from llarmy.equipment.reading_text_ocr import cpu, models, pipeline, readers, workers
+from llarmy.equipment.reading_text_ocr.batching import MicroBatcher
+from llarmy.equipment.reading_text_ocr.instrumentation import (
+    dispatcher,
+    instrumentation_enabled,
+)
+from llarmy.equipment.reading_text_ocr.images import (
+    image_input_digest,
+    image_to_array,
+    load_image_from_input,
+)
+from llarmy.equipment.reading_text_ocr.pipeline import (
+    JSONLResultWriter,
+    OCRPipeline,
+    iter_image_inputs,
+)
+from llarmy.equipment.reading_text_ocr.preprocessing import (
+    PreprocessingConfig,
+    estimate_skew_angle,
+    estimate_text_height,
+    ink_mask,
+    otsu_threshold,
+    preprocess_image,
+)
+from llarmy.equipment.reading_text_ocr.readers import (
+    configure_reader_pool,
+    estimate_reader_memory,
+    get_reader_pool,
+    normalize_lang_list,
+    set_reader_pool,
+)
+from llarmy.equipment.reading_text_ocr.routing import (
+    EASYOCR,
+    TESSERACT,
+    EngineRouter,
+    profile_image,
+)
+from llarmy.equipment.reading_text_ocr.tesseract_backends import TesserocrBackend
+from llarmy.equipment.reading_text_ocr.tiling import ocr_tiled, tile_boxes
+
+
+class FakeReader:
+    """Stand-in for ``easyocr.Reader`` that records its languages."""
+
+    def __init__(self, lang_key: tuple[str, ...]) -> None:
+        self.lang_key = lang_key
+
+
+def test_normalize_lang_list() -> None:
+    """Language sets are sorted, deduplicated and default to English."""
+    assert normalize_lang_list(["es", "en", "es"]) == ("en", "es")
+    assert normalize_lang_list([]) == ("en",)
+
+
+def test_reader_pool_reuses_and_evicts() -> None:
+    """Readers are shared per language set and evicted in LRU order."""
+    pool = EasyOCRReaderPool(max_readers=2, reader_factory=FakeReader)
+
+    reader = pool.get(["en", "es"])
+    assert pool.get(["es", "en"]) is reader
+    pool.get(["fr"])
+    pool.get(["en", "es"])
+    pool.get(["de"])
+
+    assert pool.loaded_lang_sets == [("en", "es"), ("de",)]
+    assert pool.loads == 3
+    assert pool.evictions == 1
+
+
+def test_reader_pool_memory_cap() -> None:
+    """The memory cap evicts older readers but keeps the newest one."""
+    pool = EasyOCRReaderPool(
+        max_readers=10,
+        max_memory_bytes=150,
+        reader_factory=FakeReader,
+        memory_estimator=lambda reader: 100,
+    )
+    pool.warmup([["en"], ["es"]])
+
+    assert pool.loaded_lang_sets == [("es",)]
+    assert pool.memory_bytes == 100
+
+
+def test_reader_pool_admits_language_sets_within_budget() -> None:
+    """New language sets wait for leased readers and are rejected on timeout."""
+    pool = EasyOCRReaderPool(
+        max_memory_bytes=250,
+        reader_factory=FakeReader,
+        memory_estimator=lambda reader: 100,
+        default_reader_bytes=100,
+        admission_timeout=0,
+    )
+    loaded = []
+    with pool.lease(["es"]):
+        with pool.lease(["en"]):
+            with pytest.raises(OCRMemoryBudgetError, match="memory budget of"):
+                pool.get(["fr"])
+
+            pool.admission_timeout = 5
+            waiting = threading.Thread(target=lambda: loaded.append(pool.get(["fr"])))
+            waiting.start()
+            while not pool.usage["admission_waits"]:
+                threading.Event().wait(0.01)
+            assert pool.loaded_lang_sets == [("es",), ("en",)]
+        waiting.join()
+
+        usage = pool.usage
+    assert loaded and pool.loaded_lang_sets == [("es",), ("fr",)]
+    assert usage["used_bytes"] == 200 and usage["reserved_bytes"] == 0
+    assert usage["lang_sets"] == {
+        "es": {"memory_bytes": 100, "leases": 1},
+        "fr": {"memory_bytes": 100, "leases": 0},
+    }
+    assert usage["rejections"] == 1 and usage["evictions"] == 1
+
+
+def test_reader_memory_counts_onnx_detectors() -> None:
+    """Models without torch tensors count their own memory estimate."""
+
+    class Parameter:
+        def numel(self) -> int:
+            return 10
+
+        def element_size(self) -> int:
+            return 4
+
+    class Recognizer:
+        def parameters(self) -> list:
+            return [Parameter(), Parameter()]
+
+        def buffers(self) -> list:
+            return [Parameter()]
+
+    reader = types.SimpleNamespace(
+        detector=types.SimpleNamespace(memory_bytes=1000), recognizer=Recognizer()
+    )
+
+    assert estimate_reader_memory(reader) == 1120
+
+
+def test_reader_pool_builds_once_under_concurrency() -> None:
+    """Concurrent first requests for a language set share a single build."""
+    built = []
+    gate = threading.Event()
+
+    def slow_factory(lang_key: tuple[str, ...]) -> FakeReader:
+        gate.wait(1)
+        built.append(lang_key)
+        return FakeReader(lang_key)
+
+    pool = EasyOCRReaderPool(reader_factory=slow_factory)
+    threads = [threading.Thread(target=pool.get, args=(["en"],)) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    gate.set()
+    for thread in threads:
+        thread.join()
+
+    assert built == [("en",)]
+
+
+class FakeBatchReader(FakeReader):
+    """Fake reader whose batched recognizer echoes each image width."""
+
+    def readtext_batched(self, images: list) -> list:
+        return [[(None, f"w{image.shape[1]}", 1.0)] for image in images]
+
+
+def test_general_purpose_batch_keeps_order_and_errors(tmp_path: Path) -> None:
+    """Batch results come back in input order with per-image errors."""
+    paths = []
+    for width in (30, 40, 30):
+        path = tmp_path / f"{width}_{len(paths)}.png"
+        Image.new("RGB", (width, 20), "white").save(path)
+        paths.append(str(path))
+    paths.insert(1, str(tmp_path / "missing.png"))
+
+    pool = EasyOCRReaderPool(reader_factory=FakeBatchReader)
+    results = ReadingTextOCRToolSpec(
+        reader_pool=pool
+    ).general_purpose_extract_text_batch(paths, ["en"])
+
+    assert results[0] == "Extracted text: w30\n"
+    assert results[1].startswith("General Purpose Reading Text Module Error")
+    assert results[2] == "Extracted text: w40\n"
+    assert results[3] == "Extracted text: w30\n"
+
+
+def test_async_general_purpose_runs_off_loop(tmp_path: Path) -> None:
+    """The async tool offloads EasyOCR to the executor threads."""
+    path = tmp_path / "image.png"
+    Image.new("RGB", (30, 20), "white").save(path)
+
+    class ThreadReader(FakeReader):
+        def readtext(self, image: object) -> list:
+            return [(None, threading.current_thread().name, 1.0)]
+
+    spec = ReadingTextOCRToolSpec(
+        reader_pool=EasyOCRReaderPool(reader_factory=ThreadReader),
+        executor=OCRExecutor(max_easyocr_workers=0),
+    )
+    result = asyncio.run(spec.ageneral_purpose_extract_text(str(path), ["en"]))
+
+    assert result.startswith("Extracted text: llarmy-ocr")
+    spec.executor.shutdown()
+
+
+def test_executor_rejects_when_queue_is_full() -> None:
+    """Calls beyond max_pending fail with OCRBusyError after the timeout."""
+    executor = OCRExecutor(max_pending=1, queue_timeout=0.05)
+    release = threading.Event()
+
+    async def run() -> list:
+        return await asyncio.gather(
+            executor.run_tesseract(release.wait, 1),
+            executor.run_tesseract(release.wait, 1),
+            return_exceptions=True,
+        )
+
+    loop = asyncio.new_event_loop()
+    loop.call_later(0.2, release.set)
+    try:
+        first, second = loop.run_until_complete(run())
+    finally:
+        loop.close()
+        executor.shutdown()
+
+    assert first is True
+    assert isinstance(second, OCRBusyError)
+
+
+def test_result_cache_is_content_addressed(tmp_path: Path) -> None:
+    """Identical image content is only OCRed once, whatever its path."""
+    calls = []
+
+    class CountingReader(FakeReader):
+        def readtext(self, image: object) -> list:
+            calls.append(image)
+            return [(None, "hello", 1.0)]
+
+    for name in ("a.png", "b.png"):
+        Image.new("RGB", (30, 20), "white").save(tmp_path / name)
+    cache = OCRResultCache()
+    spec = ReadingTextOCRToolSpec(
+        reader_pool=EasyOCRReaderPool(reader_factory=CountingReader), cache=cache
+    )
+
+    first = spec.general_purpose_extract_text(str(tmp_path / "a.png"), ["en"])
+    second = spec.general_purpose_extract_text(str(tmp_path / "b.png"), ["en"])
+    spec.general_purpose_extract_text(str(tmp_path / "b.png"), ["es"])
+
+    assert first == second == "Extracted text: hello\n"
+    assert len(calls) == 2
+    assert cache.stats["hits"] == 1
+    assert cache.stats["misses"] == 2
+
+
+def test_result_cache_disk_tier_persists_and_evicts(tmp_path: Path) -> None:
+    """The SQLite tier survives a new cache instance and respects its budget."""
+    db_path = tmp_path / "ocr.sqlite"
+    cache = OCRResultCache(disk_path=db_path, max_disk_bytes=30)
+    cache.set("old", "x" * 10)
+    cache.set("new", "y" * 10)
+    cache.close()
+
+    reopened = OCRResultCache(disk_path=db_path, max_disk_bytes=30)
+    reopened.set("newest", "z" * 10)
+
+    assert reopened.get("newest") == "z" * 10
+    assert reopened.get("old") is None
+    assert reopened.stats["disk_entries"] == 2
+    reopened.close()
+
+
+def test_load_image_from_base64_and_path_agree(tmp_path: Path) -> None:
+    """Streaming base64 decoding and memory-mapped files yield the same image."""
+    buffer = io.BytesIO()
+    Image.new("RGB", (64, 48), "red").save(buffer, format="PNG")
+    path = tmp_path / "image.png"
+    path.write_bytes(buffer.getvalue())
+    encoded = base64.b64encode(buffer.getvalue()).decode()
+
+    from_base64 = load_image_from_input(f"data:image/png;base64,{encoded}")
+    from_path = load_image_from_input(str(path))
+
+    assert from_base64.tobytes() == from_path.tobytes()
+    assert image_input_digest(encoded) == image_input_digest(str(path))
+
+
+def test_tools_report_missing_files_as_errors(tmp_path: Path) -> None:
+    """Every single-image tool answers a missing file with an error message."""
+    missing = str(tmp_path / "missing.png")
+    spec = ReadingTextOCRToolSpec(
+        reader_pool=EasyOCRReaderPool(reader_factory=FakeBatchReader),
+        executor=OCRExecutor(max_easyocr_workers=0),
+    )
+
+    async def call_async_tools() -> list[str]:
+        return [
+            await spec.ageneral_purpose_extract_text(missing, ["en"]),
+            await spec.aprinted_material_extract_text(missing),
+            await spec.aextract_text(missing),
+        ]
+
+    results = [
+        spec.general_purpose_extract_text(missing, ["en"]),
+        spec.printed_material_extract_text(missing),
+        spec.extract_text(missing),
+        *asyncio.run(call_async_tools()),
+    ]
+    spec.executor.shutdown()
+
+    prefixes = [
+        "General Purpose Reading Text Module Error (EasyOCR): ",
+        "Reading Printed Material Text Error (tesseract): ",
+        "Reading Text Error: ",
+    ] * 2
+    for result, prefix in zip(results, prefixes):
+        assert result.startswith(prefix) and "missing.png" in result
+
+
+def test_image_handles_stand_in_for_base64(tmp_path: Path) -> None:
+    """Registered base64 images are decoded once and usable by handle."""
+    buffer = io.BytesIO()
+    Image.new("RGB", (30, 20), "white").save(buffer, format="PNG")
+    encoded = base64.b64encode(buffer.getvalue()).decode()
+    store = ImageStore(max_decoded_images=1)
+    spec = ReadingTextOCRToolSpec(
+        reader_pool=EasyOCRReaderPool(reader_factory=FakeBatchReader),
+        image_store=store,
+    )
+    handle = spec.register_image(encoded)
+
+    assert handle.startswith("img-") and len(handle) == 20
+    assert spec.register_image(f"data:image/png;base64,{encoded}") == handle
+    assert store.path(handle).read_bytes() == buffer.getvalue()
+    with use_image_store(store):
+        assert image_input_digest(handle) == image_input_digest(encoded)
+    assert (
+        spec.general_purpose_extract_text_batch([handle, handle], ["en"])
+        == ["Extracted text: w30\n"] * 2
+    )
+    # Both batch items may miss when they are decoded at the same time
+    assert store.stats["misses"] + store.stats["hits"] == 2
+    assert store.stats["decoded_images"] == 1
+    assert spec.general_purpose_extract_text_batch(["img-0000000000000000"], ["en"])[
+        0
+    ].startswith("General Purpose Reading Text Module Error")
+    assert spec.register_image(str(tmp_path / "missing.png")).startswith(
+        "Reading Text Error"
+    )
+
+    directory = store.path(handle).parent
+    store.close()
+    assert handle not in store and not directory.exists()
+
+
+def test_image_handles_are_scoped_to_their_tool_spec() -> None:
+    """Each tool spec owns its store; handles of another spec are unknown."""
+    buffer = io.BytesIO()
+    Image.new("RGB", (30, 20), "white").save(buffer, format="PNG")
+    encoded = base64.b64encode(buffer.getvalue()).decode()
+    reader_pool = EasyOCRReaderPool(reader_factory=FakeBatchReader)
+    executor = OCRExecutor(max_easyocr_workers=0)
+    spec = ReadingTextOCRToolSpec(reader_pool=reader_pool, executor=executor)
+    other = ReadingTextOCRToolSpec(reader_pool=reader_pool, executor=executor)
+    handle = spec.register_image(encoded)
+
+    assert handle not in get_image_store()
+    assert spec.general_purpose_extract_text_batch([handle], ["en"]) == [
+        "Extracted text: w30\n"
+    ]
+    # The async tool runs EasyOCR on an executor thread
+    assert asyncio.run(spec.ageneral_purpose_extract_text_batch([handle], ["en"])) == [
+        "Extracted text: w30\n"
+    ]
+    assert other.general_purpose_extract_text_batch([handle], ["en"])[0].startswith(
+        "General Purpose Reading Text Module Error (EasyOCR): Unknown image handle"
+    )
+
+    directory = spec.image_store.path(handle).parent
+    spec.close()
+    executor.shutdown()
+    assert not directory.exists()
+
+
+def test_image_store_evicts_least_recently_used_images() -> None:
+    """Registered images beyond the limit are forgotten and their files deleted."""
+    store = ImageStore(max_images=2)
+    handles, paths = [], []
+    for width in (10, 20, 30):
+        buffer = io.BytesIO()
+        Image.new("RGB", (width, 10), "white").save(buffer, format="PNG")
+        handles.append(store.register(base64.b64encode(buffer.getvalue()).decode()))
+        paths.append(store.path(handles[-1]))
+        if width == 20:
+            # Touching the first image keeps it over the second
+            store.path(handles[0])
+
+    assert handles[0] in store and handles[2] in store
+    assert handles[1] not in store and not paths[1].exists()
+    assert len(store) == 2
+    store.close()
+
+
+def test_image_handles_of_changed_files_are_stale(tmp_path: Path) -> None:
+    """A handle registered from a path is dropped once the file changes."""
+    path = tmp_path / "page.png"
+    Image.new("RGB", (30, 20), "white").save(path)
+    store = ImageStore()
+    handle = store.register(str(path))
+    assert store.load(handle).size == (30, 20)
+
+    Image.new("RGB", (40, 20), "white").save(path)
+    os.utime(path, ns=(0, 0))
+    with pytest.raises(FileNotFoundError, match="changed since it was registered"):
+        store.load(handle)
+    assert handle not in store and store.stats["decoded_images"] == 0
+    assert store.register(str(path)) != handle
+    assert path.exists()
+    store.close()
+
+
+def test_image_to_array_is_read_only() -> None:
+    """Engines get read-only grayscale or RGB arrays."""
+    array = image_to_array(Image.new("RGBA", (3, 2), (1, 2, 3, 4)))
+
+    assert array.shape == (2, 3, 3) and array.dtype == np.uint8
+    assert not array.flags.writeable
+    assert image_to_array(Image.new("L", (3, 2))).shape == (2, 3)
+
+
+def test_load_image_drafts_large_jpegs(tmp_path: Path) -> None:
+    """JPEGs are decoded at a reduced scale that still covers the target side."""
+    path = tmp_path / "photo.jpg"
+    Image.new("RGB", (4000, 3000), "white").save(path, format="JPEG")
+
+    image = load_image_from_input(str(path), target_side=1000)
+
+    assert image.size == (1000, 750)
+
+
+def test_document_pages_are_streamed_in_order(tmp_path: Path) -> None:
+    """Every frame of a multi-page TIFF is OCRed and reported by page number."""
+    path = tmp_path / "scan.tiff"
+    frames = [Image.new("RGB", (20 + 10 * index, 20), "white") for index in range(5)]
+    frames[0].save(path, save_all=True, append_images=frames[1:])
+
+    class WidthReader(FakeReader):
+        def readtext(self, image: object) -> list:
+            return [(None, f"w{image.shape[1]}", 1.0)]
+
+    spec = ReadingTextOCRToolSpec(
+        reader_pool=EasyOCRReaderPool(reader_factory=WidthReader), max_page_workers=2
+    )
+    pages = list(spec.iter_document_text(str(path), engine="easyocr", lang=["en"]))
+    text = spec.general_purpose_document_extract_text(
+        str(path), ["en"], start_page=2, max_pages=2
+    )
+
+    assert pages == [(1, "w20"), (2, "w30"), (3, "w40"), (4, "w50"), (5, "w60")]
+    assert text.splitlines() == [
+        "Pages 2-3 of 5 (call again with start_page=4 for the rest)",
+        "Page 2: Extracted text: w30",
+        "Page 3: Extracted text: w40",
+    ]
+
+
+def test_tesserocr_backend_reuses_engines(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Engines are initialized once per language and reused across calls."""
+    created = []
+
+    class FakeAPI:
+        def __init__(self, lang: str) -> None:
+            created.append(lang)
+
+        def SetImage(self, image: Image.Image) -> None:
+            self.size = image.size
+
+        def GetUTF8Text(self) -> str:
+            return f"{self.size[0]}x{self.size[1]}\n"
+
+        def Clear(self) -> None:
+            pass
+
+    monkeypatch.setitem(
+        sys.modules, "tesserocr", types.SimpleNamespace(PyTessBaseAPI=FakeAPI)
+    )
+    backend = TesserocrBackend()
+    images = [Image.new("L", (10 * n, 10), "white") for n in range(1, 4)]
+
+    assert backend.image_to_string_batch(images, lang="eng") == [
+        "10x10",
+        "20x10",
+        "30x10",
+    ]
+    assert backend.image_to_string(images[0], lang="spa") == "10x10"
+    assert created == ["eng", "spa"]
+
+
+class FakeTesseractBackend:
+    """Tesseract backend stand-in returning a fixed confidence."""
+
+    name = "fake"
+
+    def __init__(self, confidence: float) -> None:
+        self.confidence = confidence
+
+    def image_to_string_with_confidence(
+        self, image: Image.Image, lang: str = "eng"
+    ) -> tuple[str, float]:
+        return f"printed {lang}", self.confidence
+
+
+def _printed_page(path: Path) -> str:
+    image = Image.new("RGB", (1200, 900), "white")
+    draw = ImageDraw.Draw(image)
+    for line in range(14):
+        draw.text(
+            (40, 30 + 60 * line), "The quick brown fox " * 3, fill="black", font_size=32
+        )
+    image.save(path)
+    return str(path)
+
+
+@pytest.mark.parametrize(
+    ("confidence", "expected"),
+    [
+        (90.0, "Extracted text: printed eng+spa\nEngine: tesseract (confidence 90)\n"),
+        (
+            20.0,
+            "Extracted text: photo\nEngine: easyocr (confidence 50), "
+            "used after low confidence from tesseract\n",
+        ),
+    ],
+)
+def test_extract_text_routes_and_escalates(
+    tmp_path: Path, confidence: float, expected: str
+) -> None:
+    """Printed pages go to tesseract and escalate to EasyOCR on low confidence."""
+
+    class PhotoReader(FakeReader):
+        def readtext(self, image: object) -> list:
+            return [(None, "photo", 0.5)]
+
+    spec = ReadingTextOCRToolSpec(
+        reader_pool=EasyOCRReaderPool(reader_factory=PhotoReader),
+        tesseract_backend=FakeTesseractBackend(confidence),
+    )
+
+    result = spec.extract_text(_printed_page(tmp_path / "page.png"), ["es", "en"])
+
+    assert result == expected
+
+
+def test_router_sends_skewed_pages_to_easyocr(tmp_path: Path) -> None:
+    """Skewed text goes to EasyOCR and tesseract errors surface without escalation."""
+    page = Image.open(_printed_page(tmp_path / "page.png"))
+    router = EngineRouter()
+    straight = profile_image(page)
+    skewed = profile_image(page.rotate(5, fillcolor="white"))
+
+    assert straight.skew_angle == 0 and router.choose(straight) == TESSERACT
+    assert skewed.skew_angle == pytest.approx(-5, abs=1)
+    assert router.choose(dataclasses.replace(straight, skew_angle=3.0)) == EASYOCR
+
+    class FailingTesseractBackend(FakeTesseractBackend):
+        def __init__(self, error: Exception) -> None:
+            self.error = error
+
+        def image_to_string_with_confidence(
+            self, image: Image.Image, lang: str = "eng"
+        ) -> tuple[str, float]:
+            raise self.error
+
+    page_path = str(tmp_path / "page.png")
+    for error in (
+        OSError("tesseract is not installed"),
+        pytesseract.TesseractError(1, "Invalid resolution"),
+    ):
+        spec = ReadingTextOCRToolSpec(
+            reader_pool=EasyOCRReaderPool(reader_factory=FakeReader),
+            tesseract_backend=FailingTesseractBackend(error),
+            router=EngineRouter(escalate=False),
+        )
+        assert spec.extract_text(page_path, ["en"]) == f"Reading Text Error: {error}"
+
+
+def _large_page() -> Image.Image:
+    image = Image.new("RGB", (4000, 3000), "white")
+    draw = ImageDraw.Draw(image)
+    for line in range(10):
+        draw.text(
+            (800, 600 + 120 * line), "Quick brown fox", fill="black", font_size=96
+        )
+    return image
+
+
+def test_preprocessing_crops_and_scales_to_text_height() -> None:
+    """Large pages are cropped to the text and scaled to the target height."""
+    config = PreprocessingConfig(target_text_height=40)
+
+    result = preprocess_image(_large_page(), config)
+
+    pixels = np.asarray(result)
+    text_height = estimate_text_height(ink_mask(pixels, otsu_threshold(pixels)))
+    assert result.mode == "L"
+    assert max(result.size) < 1000
+    assert text_height is not None and abs(text_height - 40) <= 4
+
+
+def test_preprocessing_deskews_rotated_text() -> None:
+    """The skew estimate undoes a small rotation."""
+    rotated = _large_page().rotate(7, fillcolor="white").convert("L").reduce(4)
+    pixels = np.asarray(rotated)
+
+    angle = estimate_skew_angle(ink_mask(pixels, otsu_threshold(pixels)))
+
+    assert angle == pytest.approx(-7, abs=0.5)
+
+
+# Cold start budget for importing the package, generous for slow CI machines
+IMPORT_BUDGET_SECONDS = 1.0
+
+
+def test_package_import_is_lazy() -> None:
+    """Importing the package loads neither the engines nor llama-index."""
+    code = (
+        "import sys, time\n"
+        "start = time.perf_counter()\n"
+        "import llarmy.equipment.reading_text_ocr as ocr\n"
+        "elapsed = time.perf_counter() - start\n"
+        "heavy = ('easyocr', 'torch', 'cv2', 'llama_index', 'numpy')\n"
+        "print(elapsed, *sorted(m for m in heavy if m in sys.modules))\n"
+        "ocr.OCRResultCache\n"
+        "assert 'easyocr' not in sys.modules\n"
+    )
+    output = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    ).stdout.split()
+
+    assert output[1:] == []
+    assert float(output[0]) < IMPORT_BUDGET_SECONDS
+
+
+def _detection(left: int, top: int, right: int, bottom: int, text: str) -> tuple:
+    corners = [[left, top], [right, top], [right, bottom], [left, bottom]]
+    return corners, text, 0.9
+
+
+def test_layout_groups_easyocr_detections_in_reading_order() -> None:
+    """Detections become lines and blocks, and regions select their words."""
+    layout = OCRLayout.from_easyocr(
+        [
+            _detection(300, 10, 400, 40, "world"),
+            _detection(10, 12, 200, 42, "Hello"),
+            _detection(10, 120, 120, 150, "Total"),
+            _detection(140, 122, 200, 152, "12.50"),
+        ],
+        width=500,
+        height=200,
+    )
+
+    assert layout.text == "Hello world\n\nTotal 12.50"
+    assert layout.lines()[0].box == (10, 10, 400, 42)
+    assert layout.region(130, 100, 500, 200).words == ["12.50"]
+    assert OCRLayout.from_dict(layout.to_dict()).text == layout.text
+
+
+def test_query_text_region_reuses_layout(tmp_path: Path) -> None:
+    """Region queries on an image that was already read do not rerun OCR."""
+    calls = []
+
+    class DetailReader(FakeReader):
+        def readtext(self, image: object) -> list:
+            calls.append(image)
+            return [
+                _detection(10, 10, 190, 40, "Invoice"),
+                _detection(10, 160, 90, 190, "Total"),
+                _detection(110, 160, 190, 190, "42"),
+            ]
+
+    path = tmp_path / "photo.png"
+    Image.effect_noise((200, 200), 80).save(path)
+    spec = ReadingTextOCRToolSpec(
+        reader_pool=EasyOCRReaderPool(reader_factory=DetailReader)
+    )
+
+    summary = spec.extract_text_layout(str(path))
+    region = spec.query_text_region(str(path), 0.0, 0.75, 1.0, 1.0)
+
+    assert summary.startswith("Engine: easyocr\n[0.050, 0.050, 0.950, 0.200] (90)")
+    assert region == "[0.050, 0.800, 0.950, 0.950] (90) Total 42\n"
+    assert len(calls) == 1
+
+
+def _ocr_gray_levels(tile: Image.Image) -> OCRLayout:
+    """Fake engine reading every gray level as one word, cut at tile edges."""
+    pixels = np.asarray(tile)
+    words, boxes, confidences = [], [], []
+    for level in np.unique(pixels[pixels < 255]).tolist():
+        rows, columns = np.nonzero(pixels == level)
+        box = [columns.min(), rows.min(), columns.max() + 1, rows.max() + 1]
+        cut = box[0] == 0 or box[2] == tile.width
+        words.append(f"w{level}" + ("-cut" if cut else ""))
+        boxes.append(box)
+        confidences.append(50.0 if cut else 90.0)
+    return OCRLayout.from_boxes(words, boxes, confidences, *tile.size)
+
+
+def test_tiled_ocr_deduplicates_overlaps_in_reading_order() -> None:
+    """Words on tile seams are read once, whole, and in reading order."""
+    image = Image.new("L", (5000, 1000), 255)
+    draw = ImageDraw.Draw(image)
+    lefts = [100, 1800, 2000, 2980, 4800]
+    for row, top in enumerate((200, 600)):
+        for column, left in enumerate(lefts):
+            level = 10 * row + column + 1
+            draw.rectangle((left, top, left + 99, top + 29), fill=level)
+    config = TilingConfig(tile_size=2048, overlap=256, min_side=3000, max_workers=2)
+
+    layout = ocr_tiled(image, _ocr_gray_levels, config)
+
+    assert len(tile_boxes(5000, 1000, 2048, 256)) == 3
+    assert layout.text == "w1 w2 w3 w4 w5\n\nw11 w12 w13 w14 w15"
+    assert layout.lines()[0].box == (100, 200, 4900, 230)
+
+
+def test_frame_sequence_rereads_only_changed_tiles(tmp_path: Path) -> None:
+    """Unchanged tiles reuse their words and the result lists text changes."""
+    tiles_read = []
+
+    class GrayLevelReader(FakeReader):
+        def readtext(self, image: np.ndarray) -> list:
+            tiles_read.append(image.shape)
+            pixels = image[..., 0] if image.ndim == 3 else image
+            detections = []
+            for level in np.unique(pixels[pixels < 255]).tolist():
+                rows, columns = np.nonzero(pixels == level)
+                detections.append(
+                    _detection(
+                        int(columns.min()),
+                        int(rows.min()),
+                        int(columns.max()) + 1,
+                        int(rows.max()) + 1,
+                        f"g{level}",
+                    )
+                )
+            return detections
+
+    reader_pool = EasyOCRReaderPool(reader_factory=GrayLevelReader)
+    leases = []
+    lease = reader_pool.lease
+
+    def counting_lease(lang_list: list[str]) -> Any:
+        leases.append(lang_list)
+        return lease(lang_list)
+
+    reader_pool.lease = counting_lease
+    spec = ReadingTextOCRToolSpec(
+        reader_pool=reader_pool,
+        frame_sequences=FrameSequenceConfig(tile_size=256, overlap=32),
+    )
+    frame = Image.new("RGB", (600, 400), "white")
+    ImageDraw.Draw(frame).rectangle((20, 20, 100, 50), fill=(40, 40, 40))
+    frames = [frame, frame.copy(), frame.copy()]
+    ImageDraw.Draw(frames[2]).rectangle((420, 300, 480, 330), fill=(80, 80, 80))
+    results = []
+    for index, image in enumerate(frames):
+        path = tmp_path / f"frame{index}.png"
+        image.save(path)
+        results.append(spec.extract_frame_text(str(path), "screen"))
+
+    assert results[0] == "Frame 0: 6 of 6 regions changed\n+ g40\n"
+    assert results[1] == "Frame 1: 0 of 6 regions changed\nNo text changes\n"
+    assert results[2] == "Frame 2: 2 of 6 regions changed\n+ g80\n"
+    assert len(tiles_read) == 8
+    # The unchanged frame is answered without leasing the reader
+    assert len(leases) == 2
+    assert spec.extract_frame_text(str(tmp_path / "frame0.png"), "other").startswith(
+        "Frame 0: 6 of 6"
+    )
+
+
+def test_ocr_server_batches_requests_across_clients(tmp_path: Path) -> None:
+    """Concurrent remote calls share one batched engine call on the server."""
+    paths = []
+    for index in range(4):
+        path = tmp_path / f"{index}.png"
+        Image.new("RGB", (30 + 10 * (index % 2), 20), "white").save(path)
+        paths.append(str(path))
+    batches = []
+
+    class CountingReader(FakeBatchReader):
+        def readtext_batched(self, images: list) -> list:
+            batches.append(len(images))
+            return super().readtext_batched(images)
+
+    spec = ReadingTextOCRToolSpec(
+        reader_pool=EasyOCRReaderPool(reader_factory=CountingReader),
+        batching=BatchingConfig(max_batch_size=4, max_delay=0.5),
+    )
+    address = str(tmp_path / "ocr.sock")
+    with OCRServer(spec, address):
+        # Socket and generated key are private to the user from the start
+        assert (tmp_path / "ocr.sock").stat().st_mode & 0o777 == 0o600
+        assert (tmp_path / "ocr.sock.key").stat().st_mode & 0o777 == 0o600
+        intruder = RemoteReadingTextOCRToolSpec(address, authkey=b"guess")
+        assert intruder.general_purpose_extract_text(paths[0], ["en"]).startswith(
+            "OCR Service Error"
+        )
+        clients = [RemoteReadingTextOCRToolSpec(address) for _ in paths]
+        results = [""] * len(paths)
+
+        def call(index: int) -> None:
+            results[index] = clients[index].general_purpose_extract_text(
+                paths[index], ["en"]
+            )
+
+        threads = [threading.Thread(target=call, args=(i,)) for i in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        missing = clients[0].general_purpose_extract_text(
+            str(tmp_path / "missing.png"), ["en"]
+        )
+        with pytest.raises(RuntimeError, match="Unknown OCR service method"):
+            clients[0].call("warmup", [["en"]])
+
+    assert results == [f"Extracted text: w{30 + 10 * (i % 2)}\n" for i in range(4)]
+    assert missing.startswith("General Purpose Reading Text Module Error (EasyOCR)")
+    # One batch of four requests, recognized in one call per image size
+    assert batches == [2, 2]
+    assert spec.batcher is not None
+    assert spec.batcher.stats["batch_sizes"] == {4: 1, 1: 1}
+    assert [
+        (t.metadata.name, t.metadata.description, t.metadata.get_parameters_dict())
+        for t in clients[0].to_tool_list()
+    ] == [
+        (t.metadata.name, t.metadata.description, t.metadata.get_parameters_dict())
+        for t in spec.to_tool_list()
+    ]
+
+
+def test_remote_tools_resolve_paths_and_scope_frame_sequences(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Clients send absolute paths and frame sequences private to them."""
+    calls = []
+
+    def record(method: str) -> Callable[..., str]:
+        def tool(*args: Any, **kwargs: Any) -> str:
+            calls.append((method, args, kwargs))
+            return "ok"
+
+        return tool
+
+    spec = ReadingTextOCRToolSpec(reader_pool=EasyOCRReaderPool())
+    for method in ("extract_frame_text", "general_purpose_extract_text_batch"):
+        monkeypatch.setattr(spec, method, record(method))
+    monkeypatch.chdir(tmp_path)
+    address = str(tmp_path / "ocr.sock")
+    with OCRServer(spec, address):
+        first = RemoteReadingTextOCRToolSpec(address)
+        second = RemoteReadingTextOCRToolSpec(address)
+        first.extract_frame_text("frame.png")
+        second.extract_frame_text("frame.png", lang_list=["en"])
+        first.extract_frame_text("frame.png", sequence_id="screen")
+        first.general_purpose_extract_text_batch(
+            ["page.png", "img-0123456789abcdef", "iVBORw0KGgo="], ["en"]
+        )
+        first.close()
+        second.close()
+
+    frame = str(tmp_path / "frame.png")
+    assert calls[:3] == [
+        ("extract_frame_text", (frame, f"{first.client_id}/default", None), {}),
+        ("extract_frame_text", (frame, f"{second.client_id}/default", ["en"]), {}),
+        ("extract_frame_text", (frame, f"{first.client_id}/screen", None), {}),
+    ]
+    assert first.client_id != second.client_id
+    assert calls[3][1][0] == [
+        str(tmp_path / "page.png"),
+        "img-0123456789abcdef",
+        "iVBORw0KGgo=",
+    ]
+
+
+def test_micro_batcher_groups_by_key_and_grows_while_busy() -> None:
+    """Requests wait for a free worker in growing batches, grouped by key."""
+    release = threading.Event()
+    calls = []
+
+    def run_batch(key: object, items: list) -> list:
+        calls.append((key, items))
+        if len(calls) == 1:
+            release.wait(5)
+        return [
+            ValueError(item) if item == "bad" else f"{key}:{item}" for item in items
+        ]
+
+    batcher = MicroBatcher(run_batch, BatchingConfig(max_batch_size=8, max_delay=0))
+    first = batcher.submit("en", "a")
+    while not calls:
+        threading.Event().wait(0.01)
+    # The only worker is busy: these requests accumulate into one batch per key
+    futures = [
+        batcher.submit(key, item)
+        for key, item in [("en", "b"), ("es", "c"), ("en", "bad"), ("en", "d")]
+    ]
+    release.set()
+    batcher.close()
+
+    assert first.result() == "en:a"
+    assert [f.result() for f in futures if f is not futures[2]] == [
+        "en:b",
+        "es:c",
+        "en:d",
+    ]
+    with pytest.raises(ValueError, match="bad"):
+        futures[2].result()
+    assert sorted((key, len(items)) for key, items in calls[1:]) == [
+        ("en", 3),
+        ("es", 1),
+    ]
+    assert batcher.stats["batches"] == 3
+    assert batcher.stats["mean_batch_size"] == 5 / 3
+
+
+def test_stage_timer_records_tool_call_stages(tmp_path: Path) -> None:
+    """An attached handler receives per-stage timings and attributes."""
+    path = tmp_path / "image.png"
+    Image.new("RGB", (30, 20), "white").save(path)
+
+    class TextReader(FakeReader):
+        def readtext(self, image: object) -> list:
+            return [(None, "hello", 0.9)]
+
+    spec = ReadingTextOCRToolSpec(
+        reader_pool=EasyOCRReaderPool(reader_factory=TextReader),
+        cache=OCRResultCache(),
+    )
+    assert not instrumentation_enabled()
+    timer = OCRStageTimer()
+    dispatcher.add_event_handler(timer)
+    try:
+        for _ in range(2):
+            result = spec.general_purpose_extract_text(str(path), ["en"])
+    finally:
+        dispatcher.event_handlers.remove(timer)
+
+    assert result == "Extracted text: hello\n"
+    summary = timer.summary()
+    assert summary["cache_lookup"]["hits"] == 1
+    assert summary["cache_lookup"]["misses"] == 1
+    assert summary["reader_load"]["count"] == 1
+    assert summary["decode"]["bytes"] == path.stat().st_size
+    assert summary["decode"]["width"] == 30
+    assert summary["easyocr"]["images"] == 1
+    assert all(totals["seconds"] >= 0 for totals in summary.values())
+    assert not instrumentation_enabled()
+
+
+def test_text_presence_precheck_skips_recognition(tmp_path: Path) -> None:
+    """Images without text regions are answered without running the engines."""
+    blank = tmp_path / "blank.png"
+    Image.new("RGB", (1600, 1200), (230, 235, 240)).save(blank)
+    text = tmp_path / "text.png"
+    image = Image.new("RGB", (1600, 1200), "white")
+    ImageDraw.Draw(image).text((40, 500), "Total: 42", fill="black", font_size=24)
+    image.save(text)
+    calls = []
+
+    class CountingReader(FakeBatchReader):
+        def readtext(self, image: object) -> list:
+            calls.append(image)
+            return [(None, "Total: 42", 0.9)]
+
+    spec = ReadingTextOCRToolSpec(
+        reader_pool=EasyOCRReaderPool(reader_factory=CountingReader),
+        tesseract_backend=FakeTesseractBackend(90.0),
+        text_presence=TextPresenceConfig(),
+    )
+
+    skipped = spec.general_purpose_extract_text(str(blank), ["en"])
+    assert skipped.startswith("No text found in the image (recognition skipped")
+    assert spec.printed_material_extract_text(str(blank)) == skipped
+    assert spec.extract_text(str(blank), ["en"]) == skipped
+    assert not calls
+    assert spec.general_purpose_extract_text(str(text), ["en"]) == (
+        "Extracted text: Total: 42\n"
+    )
+    assert len(calls) == 1
+    batch = spec.general_purpose_extract_text_batch([str(blank), str(text)], ["en"])
+    assert batch == [skipped, "Extracted text: w1600\n"]
+
+
+def test_model_manager_verifies_and_preloads_offline(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Readers load from the local directory only, for configured languages."""
+    (tmp_path / "craft_mlt_25k.pth").write_bytes(b"detector")
+    (tmp_path / "latin_g2.pth").write_bytes(b"recognizer")
+    EasyOCRModelManager.write_manifest(tmp_path)
+    built = []
+
+    def build_reader(lang_key: tuple, **reader_kwargs: object) -> FakeReader:
+        built.append((lang_key, reader_kwargs))
+        return FakeReader(lang_key)
+
+    monkeypatch.setattr(models, "_build_easyocr_reader", build_reader)
+    previous_pool, previous_executor = get_reader_pool(), get_ocr_executor()
+    manager = EasyOCRModelManager(tmp_path, [["es", "en"], ["en"]])
+    try:
+        assert manager.start(OCRExecutor(max_easyocr_workers=0))
+        assert get_reader_pool() is manager.reader_pool
+    finally:
+        set_reader_pool(previous_pool)
+        set_ocr_executor(previous_executor)
+
+    assert [lang_key for lang_key, _ in built] == [("en", "es"), ("en",)]
+    assert built[0][1]["model_storage_directory"] == str(tmp_path)
+    assert built[0][1]["download_enabled"] is False
+    assert manager.status()["lang_sets"] == {"en,es": "ready", "en": "ready"}
+    with pytest.raises(OCRModelUnavailableError, match="not preloaded"):
+        manager.reader_pool.get(["fr"])
+    image = tmp_path / "page.png"
+    Image.new("RGB", (64, 32), "white").save(image)
+    spec = ReadingTextOCRToolSpec(
+        reader_pool=manager.reader_pool, executor=OCRExecutor(max_easyocr_workers=0)
+    )
+    unavailable = "Language set fr is not preloaded"
+    assert unavailable in spec.general_purpose_extract_text(str(image), ["fr"])
+    assert unavailable in asyncio.run(
+        spec.ageneral_purpose_extract_text(str(image), ["fr"])
+    )
+    assert (
+        unavailable in spec.general_purpose_extract_text_batch([str(image)], ["fr"])[0]
+    )
+
+    (tmp_path / "latin_g2.pth").write_bytes(b"corrupted")
+    (tmp_path / "craft_mlt_25k.pth").unlink()
+    assert manager.verify() == [
+        "Model file craft_mlt_25k.pth is missing",
+        "Model file latin_g2.pth does not match its checksum",
+    ]
+    assert not manager.ready
+
+
+def test_cpu_inference_builds_cpu_readers_in_workers(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """The CPU config builds quantized CPU readers, also in worker processes."""
+    built = []
+
+    class DBNetReader(FakeBatchReader):
+        detect_network = "dbnet18"
+
+    def build_reader(lang_key: tuple, **reader_kwargs: object) -> FakeReader:
+        built.append(reader_kwargs)
+        return DBNetReader(lang_key)
+
+    monkeypatch.setattr(cpu, "_cpu_reader_pools", {})
+    monkeypatch.setattr(
+        readers, "_default_pool", EasyOCRReaderPool(reader_factory=build_reader)
+    )
+    config = CPUInferenceConfig()
+    spec = ReadingTextOCRToolSpec(
+        cpu_inference=config, executor=OCRExecutor(max_easyocr_workers=1)
+    )
+
+    assert spec.reader_pool is cpu.get_cpu_reader_pool(CPUInferenceConfig())
+    assert spec._easyocr_worker_args() == (config,)
+    assert spec.reader_pool.get(["en"]).lang_key == ("en",)
+    assert built == [{"gpu": False, "quantize": True}]
+    with pytest.raises(ValueError, match="does not support dbnet18"):
+        cpu.get_cpu_reader_pool(CPUInferenceConfig(backend="onnx")).get(["en"])
+    with pytest.raises(ValueError, match="backend must be one of"):
+        CPUInferenceConfig(backend="tensorrt")
+    with pytest.raises(ValueError, match="not both"):
+        ReadingTextOCRToolSpec(reader_pool=EasyOCRReaderPool(), cpu_inference=config)
+
+
+def test_structured_ocr_builds_cpu_readers_in_workers(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Structured OCR worker calls take the CPU config like the other workers."""
+    built = []
+
+    class DetailReader(FakeReader):
+        def readtext(self, image: object) -> list:
+            return [_detection(10, 10, 190, 40, "Invoice")]
+
+    def build_reader(lang_key: tuple, **reader_kwargs: object) -> FakeReader:
+        built.append(reader_kwargs)
+        return DetailReader(lang_key)
+
+    monkeypatch.setattr(cpu, "_cpu_reader_pools", {})
+    monkeypatch.setattr(
+        readers, "_default_pool", EasyOCRReaderPool(reader_factory=build_reader)
+    )
+    path = tmp_path / "photo.png"
+    Image.effect_noise((200, 200), 80).save(path)
+
+    layout = workers.structured_ocr(
+        str(path), ["en"], EngineRouter(), CPUInferenceConfig()
+    )
+
+    assert layout.text == "Invoice"
+    assert built == [{"gpu": False, "quantize": True}]
+
+
+class FakeTensor:
+    """Stand-in for a CPU torch tensor."""
+
+    def __init__(self, values: list[float]) -> None:
+        self.values = np.array(values, dtype=np.float32)
+
+    def detach(self) -> "FakeTensor":
+        return self
+
+    def cpu(self) -> "FakeTensor":
+        return self
+
+    def numpy(self) -> np.ndarray:
+        return self.values
+
+
+def test_onnx_exports_are_keyed_on_the_detector_weights() -> None:
+    """Detectors with other weights do not share a cached export."""
+
+    class FakeDetector:
+        def __init__(self, weight: float) -> None:
+            self.weight = weight
+
+        def state_dict(self) -> dict:
+            return {"conv.weight": FakeTensor([self.weight, 1.0])}
+
+    first = cpu.detector_digest(FakeDetector(0.5))
+
+    assert first == cpu.detector_digest(FakeDetector(0.5))
+    assert first != cpu.detector_digest(FakeDetector(0.25))
+    assert len(first) == 16
+
+
+def test_cpu_reader_pools_follow_the_memory_budget(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """CPU pools take the budget and admission limits of the process-wide pool."""
+    monkeypatch.setattr(cpu, "_cpu_reader_pools", {})
+    monkeypatch.setattr(readers, "_default_pool", None)
+    configure_reader_pool(
+        max_memory_bytes=150,
+        reader_factory=lambda lang_key, **kwargs: FakeReader(lang_key),
+        memory_estimator=lambda reader: 100,
+        default_reader_bytes=100,
+        admission_timeout=0,
+    )
+    pool = cpu.get_cpu_reader_pool(CPUInferenceConfig())
+
+    assert pool.usage["budget_bytes"] == 150
+    with pool.lease(["en"]):
+        with pytest.raises(OCRMemoryBudgetError, match="memory budget of"):
+            pool.get(["fr"])
+    assert pool.get(["fr"]).lang_key == ("fr",)
+    assert pool.loaded_lang_sets == [("fr",)]
+
+
+def test_cpu_reader_pools_follow_the_model_manager(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """CPU readers load from the manager's local files, in its strict mode."""
+    built = []
+
+    def build_reader(lang_key: tuple, **reader_kwargs: object) -> FakeReader:
+        built.append(reader_kwargs)
+        return FakeReader(lang_key)
+
+    monkeypatch.setattr(models, "_build_easyocr_reader", build_reader)
+    monkeypatch.setattr(cpu, "_cpu_reader_pools", {})
+    monkeypatch.setattr(readers, "_default_pool", None)
+    cpu_pool = cpu.get_cpu_reader_pool(CPUInferenceConfig())
+    manager = EasyOCRModelManager(tmp_path, [["en"]])
+    set_reader_pool(manager.reader_pool)
+    pool = cpu.get_cpu_reader_pool(CPUInferenceConfig())
+
+    assert pool is not cpu_pool
+    assert pool.get(["en"]).lang_key == ("en",)
+    assert built[0]["model_storage_directory"] == str(tmp_path)
+    assert built[0]["download_enabled"] is False
+    assert built[0]["gpu"] is False
+    with pytest.raises(OCRModelUnavailableError, match="not preloaded"):
+        pool.get(["fr"])
+
+
+def test_pipeline_resumes_from_its_jsonl_output(tmp_path: Path) -> None:
+    """Inputs with a result are skipped and a cut-off last line is dropped."""
+    images = tmp_path / "images"
+    (images / "nested").mkdir(parents=True)
+    for name in ("b.png", "a.jpg", "nested/c.png", "notes.txt"):
+        (images / name).write_bytes(b"not an image")
+    manifest = tmp_path / "manifest.jsonl"
+    manifest.write_text('{"path": "images/a.jpg"}\n\n{"path": "extra.png"}\n')
+
+    inputs = list(iter_image_inputs([images, manifest]))
+    assert inputs == [
+        str(images / "a.jpg"),
+        str(images / "b.png"),
+        str(images / "nested" / "c.png"),
+        str(images / "a.jpg"),
+        str(tmp_path / "extra.png"),
+    ]
+
+    output = tmp_path / "ocr.jsonl"
+    done = {"path": str(images / "a.jpg"), "text": "a", "engine": "easyocr"}
+    output.write_text(json.dumps(done) + '\n{"path": "cut')
+    stats = OCRPipeline(workers=1, batch_size=2).run(inputs, JSONLResultWriter(output))
+
+    records = [json.loads(line) for line in output.read_text().splitlines()]
+    assert stats["processed"] == 3 and stats["errors"] == 3
+    assert stats["skipped"] == 2
+    assert records[0] == done
+    assert sorted(record["path"] for record in records[1:]) == sorted(
+        inputs[1:3] + inputs[4:]
+    )
+    assert all(record["error"] for record in records[1:])
+
+
+def test_pipeline_retries_transient_errors(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Busy engines are retried, then left unrecorded for the next run."""
+    attempts: dict[str, int] = {}
+
+    def ocr_batch(image_inputs: list[str], *args: object) -> tuple[list, list]:
+        records, retries = [], []
+        for path in image_inputs:
+            attempts[path] = attempts.get(path, 0) + 1
+            if path == "busy.png" or (path == "flaky.png" and attempts[path] == 1):
+                retries.append(path)
+            else:
+                records.append(
+                    {"path": path, "text": "ok", "engine": "easyocr", "error": None}
+                )
+        return records, retries
+
+    class InlinePool(concurrent.futures.ThreadPoolExecutor):
+        def __init__(self, max_workers: int, mp_context: object) -> None:
+            super().__init__(max_workers)
+
+    monkeypatch.setattr(pipeline, "_ocr_batch", ocr_batch)
+    monkeypatch.setattr(pipeline, "ProcessPoolExecutor", InlinePool)
+    output = tmp_path / "ocr.jsonl"
+
+    stats = OCRPipeline(workers=2, batch_size=3, max_retries=2).run(
+        ["a.png", "flaky.png", "busy.png"], JSONLResultWriter(output)
+    )
+
+    records = [json.loads(line) for line in output.read_text().splitlines()]
+    assert attempts == {"a.png": 1, "flaky.png": 2, "busy.png": 3}
+    assert sorted(record["path"] for record in records) == ["a.png", "flaky.png"]
+    assert stats["processed"] == 2 and stats["errors"] == 0
+    assert stats["unfinished"] == 1
+
+
+def _crashing_ocr_batch(image_inputs: list[str], *args: object) -> tuple[list, list]:
+    """Pipeline worker stand-in whose process dies on ``crash.png``."""
+    if "crash.png" in image_inputs:
+        os._exit(1)
+    records = [
+        {"path": path, "text": "ok", "engine": "easyocr", "error": None}
+        for path in image_inputs
+    ]
+    return records, []
+
+
+def test_pipeline_restarts_its_pool_when_a_worker_dies(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Batches of a dead worker are retried on a new pool and never recorded."""
+    monkeypatch.setattr(pipeline, "_ocr_batch", _crashing_ocr_batch)
+    output = tmp_path / "ocr.jsonl"
+
+    stats = OCRPipeline(
+        workers=1, batch_size=1, max_pending_batches=1, max_retries=1
+    ).run(["a.png", "crash.png", "b.png"], JSONLResultWriter(output))
+
+    records = [json.loads(line) for line in output.read_text().splitlines()]
+    assert [record["path"] for record in records] == ["a.png", "b.png"]
+    assert stats["processed"] == 2 and stats["errors"] == 0
+    assert stats["unfinished"] == 1
+
+
+def test_pipeline_worker_classifies_transient_errors(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Memory budget errors are retried, missing models are recorded."""
+
+    def failing_batch(error: Exception) -> Callable[..., list]:
+        def ocr_batch(*args: object) -> list:
+            raise error
+
+        return ocr_batch
+
+    args = ("easyocr", ["en"], None, None, None, None, None)
+    monkeypatch.setattr(
+        pipeline,
+        "general_purpose_ocr_batch",
+        failing_batch(OCRMemoryBudgetError("over budget")),
+    )
+    assert pipeline._ocr_batch(["a.png"], *args) == ([], ["a.png"])
+
+    monkeypatch.setattr(
+        pipeline,
+        "general_purpose_ocr_batch",
+        failing_batch(OCRModelUnavailableError("fr is not preloaded")),
+    )
+    records, retries = pipeline._ocr_batch(["a.png"], *args)
+    assert retries == []
+    assert records[0]["error"] == "OCRModelUnavailableError: fr is not preloaded"